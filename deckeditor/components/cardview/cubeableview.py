@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 import typing as t
 from abc import abstractmethod
+from concurrent.futures import CancelledError
 
 from cubeclient.models import CubeRelease
 from magiccube.collections.cubeable import Cubeable
@@ -10,7 +11,7 @@ from magiccube.collections.nodecollection import ConstrainedNode
 from magiccube.laps.tickets.ticket import Ticket
 from magiccube.laps.traps.trap import Trap
 from magiccube.laps.traps.tree.printingtree import AllNode, AnyNode, PrintingNode
-from mtgimg.interface import ImageRequest
+from mtgimg.interface import ImageRequest, SizeSlug
 from mtgorp.models.interfaces import Card, Cardboard, Printing
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import pyqtSignal
@@ -18,12 +19,15 @@ from PyQt5.QtCore import pyqtSignal
 from deckeditor.components.cardview.focuscard import Focusable, FocusEvent
 from deckeditor.components.settings import settings
 from deckeditor.context.context import Context
+from deckeditor.utils.executors import PriorityClass
 from deckeditor.utils.images import ScaledImageLabel
 
 
 class CubeableImageView(ScaledImageLabel):
     _image_ready = QtCore.pyqtSignal(ImageRequest, QtGui.QPixmap)
 
+    PREVIEW_SIZE_SLUGS = (SizeSlug.MEDIUM, SizeSlug.SMALL, SizeSlug.THUMBNAIL)
+
     def __init__(self, cubeable_view: CubeableView):
         super().__init__()
 
@@ -62,14 +66,33 @@ class CubeableImageView(ScaledImageLabel):
         if image_request == self._image_request:
             return
 
+        if self._image_request is not None:
+            Context.image_scheduler.abandon(self._image_request)
+
         self._image_request = image_request
 
-        promise = Context.pixmap_loader.get_pixmap(image_request=image_request)
+        promise = Context.image_scheduler.load(image_request, PriorityClass.FOCUS)
 
         if promise.is_pending:
-            self.setPixmap(Context.pixmap_loader.get_default_pixmap())
+            self.setPixmap(self._cached_preview(pictureable, focus_event.back))
 
-        promise.then(lambda pixmap: self._image_ready.emit(image_request, pixmap)).catch(logging.warning)
+        promise.then(lambda pixmap: self._on_image_loaded(image_request, pixmap)).catch(self._on_image_failed)
+
+    @staticmethod
+    def _on_image_failed(exception: Exception) -> None:
+        if not isinstance(exception, CancelledError):
+            logging.warning(exception)
+
+    def _cached_preview(self, pictureable: t.Any, back: bool) -> QtGui.QPixmap:
+        for size_slug in self.PREVIEW_SIZE_SLUGS:
+            pixmap = Context.pixmap_loader.memory_cache.get(ImageRequest(pictureable, back=back, size_slug=size_slug))
+            if pixmap is not None:
+                return pixmap
+        return Context.pixmap_loader.get_default_pixmap()
+
+    def _on_image_loaded(self, image_request: ImageRequest, pixmap: QtGui.QPixmap) -> None:
+        if image_request == self._image_request:
+            self._image_ready.emit(image_request, pixmap)
 
 
 class CubeableTextView(QtWidgets.QStackedWidget):
@@ -437,7 +460,11 @@ class TextImageCubeableView(QtWidgets.QWidget):
         layout.addWidget(self._image_view)
         layout.addWidget(self._text_view)
 
-        self._text_view.new_focus_card.connect(self._image_view.set_cubeable)
+        self._text_view.new_focus_card.connect(self._on_text_focus_card)
+
+    def _on_text_focus_card(self, focus_event: FocusEvent) -> None:
+        Context.focus_dispatcher.reset()
+        self._image_view.set_cubeable(focus_event)
 
 
 class CubeableView(QtWidgets.QWidget):
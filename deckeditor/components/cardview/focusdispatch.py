@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import typing as t
+
+from magiccube.laps.traps.trap import Trap
+from PyQt5 import QtCore
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from deckeditor.components.cardview.focuscard import FocusEvent
+
+
+class FocusDispatcher(QObject):
+    focus_changed = pyqtSignal(FocusEvent)
+
+    def __init__(self, interval: int = 16, parent: t.Optional[QObject] = None):
+        super().__init__(parent)
+        self._pending: t.Optional[FocusEvent] = None
+        self._last_key: t.Optional[t.Tuple[t.Any, ...]] = None
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._dispatch)
+
+    @staticmethod
+    def _event_key(focus_event: FocusEvent) -> t.Tuple[t.Any, ...]:
+        if isinstance(focus_event.focusable, Trap):
+            return (
+                focus_event.focusable,
+                focus_event.back,
+                focus_event.release_id,
+                focus_event.size,
+                focus_event.position,
+                int(focus_event.modifiers or 0),
+            )
+        return focus_event.focusable, focus_event.back, focus_event.release_id
+
+    def submit(self, focus_event: FocusEvent) -> None:
+        self._pending = focus_event
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def reset(self) -> None:
+        self._last_key = None
+
+    def _dispatch(self) -> None:
+        focus_event, self._pending = self._pending, None
+        if focus_event is None:
+            return
+
+        key = self._event_key(focus_event)
+        if key == self._last_key:
+            return
+
+        self._last_key = key
+        self.focus_changed.emit(focus_event)
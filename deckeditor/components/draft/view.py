@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import datetime
+import itertools
 import logging
 import threading
 import time
@@ -77,7 +78,27 @@ class _DraftClient(DraftClient):
     def _received_booster(self, pick_point: PickPoint, timeout: t.Optional[float], began_at: float) -> None:
         self._draft_model._on_received_booster(pick_point, timeout, began_at)
 
+    def _queued_boosters(self, booster_tracker: BoosterTracker) -> t.Iterator[DraftBooster]:
+        current = self.history.current
+        if current is None or Context.cube_api_client is None:
+            return
+
+        lap = len(self.draft_configuration.drafters)
+        for offset in range(booster_tracker[Context.cube_api_client.user]):
+            index = current.global_pick_number - lap + offset
+            if index < 0:
+                continue
+            try:
+                pick_point = self.history[index]
+            except IndexError:
+                return
+            if pick_point.round == current.round:
+                yield pick_point.booster
+
     def _on_boosters_changed(self, booster_tracker: BoosterTracker) -> None:
+        Context.image_prefetcher.prefetch_cubeables(
+            itertools.chain.from_iterable(booster.cubeables for booster in self._queued_boosters(booster_tracker))
+        )
         self._draft_model.boosters_changed.emit(booster_tracker)
 
     def _picked(self, pick_point: PickPoint) -> None:
@@ -1,12 +1,16 @@
+import itertools
 import os
 import pickle
 import sys
-import threading
+import time
 import typing as t
+from concurrent.futures import Future
+from concurrent.futures.thread import ThreadPoolExecutor
 from pickle import UnpicklingError
 
 from cubeclient.models import LimitedDeck
 from magiccube.collections.cube import Cube
+from magiccube.collections.cubeable import Cubeable
 from magiccube.collections.infinites import Infinites
 from mtgorp.models.serilization.serializeable import SerializationException
 from PyQt5 import QtCore, QtGui, QtWidgets
@@ -17,7 +21,15 @@ from deckeditor import paths
 from deckeditor.application.embargo import restart
 from deckeditor.components.draft.view import DraftModel, DraftView
 from deckeditor.components.editables.editor import Editor, TabMeta
+from deckeditor.components.editables.journal import SessionJournal
+from deckeditor.components.editables.session import SessionWriter
+from deckeditor.components.editables.tabloader import (
+    CardStreamer,
+    TabMaterializer,
+    decode_tab,
+)
 from deckeditor.components.settings import settings
+from deckeditor.components.views.cubeedit.graphical.sceneexport import export_scenes
 from deckeditor.components.views.editables.deck import DeckView
 from deckeditor.components.views.editables.editable import Editable, Tab, TabType
 from deckeditor.components.views.editables.multicubesview import MultiCubesView
@@ -64,6 +76,10 @@ def load_editable(serialized: t.Mapping[str, t.Any], undo_stack: t.Optional[QUnd
 class EditorTab(Tab):
     editable_loaded = pyqtSignal(Editable)
 
+    _decoded = pyqtSignal(object)
+
+    _decode_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tab_decoding")
+
     def __init__(
         self,
         editable: t.Union[Editable, t.Mapping[str, t.Any]],
@@ -71,9 +87,8 @@ class EditorTab(Tab):
     ) -> None:
         super().__init__(Context.get_undo_stack() if undo_stack is None else undo_stack)
 
-        self._loading_lock = threading.Lock()
-        self._loading_event = threading.Event()
-        self._loading = False
+        self._decoding: t.Optional[Future] = None
+        self._materializer: t.Optional[TabMaterializer] = None
 
         if isinstance(editable, Editable):
             self._editable = editable
@@ -85,34 +100,85 @@ class EditorTab(Tab):
         self._layout = QtWidgets.QVBoxLayout(self)
         self._layout.setContentsMargins(0, 0, 0, 0)
 
-        self._loading_label = None
+        self._loading_widget = None
+        self._loading_progress = None
+
+        self.editable_loaded.connect(self._on_loaded)
+        self._decoded.connect(self._on_decoded, QtCore.Qt.QueuedConnection)
 
         if self._editable is None:
-            self._loading_label = QtWidgets.QLabel("Loading...")
-            self._loading_label.setAlignment(QtCore.Qt.AlignCenter)
-            self._layout.addWidget(self._loading_label)
-            self.editable_loaded.connect(self._on_loaded)
+            self._show_loading_widget()
         else:
             self._layout.addWidget(self._editable)
             self._editable.tab = self
             self._editable.show()
 
+    def _show_loading_widget(self) -> None:
+        self._loading_widget = QtWidgets.QWidget()
+        loading_layout = QtWidgets.QVBoxLayout(self._loading_widget)
+        loading_layout.addStretch()
+        loading_label = QtWidgets.QLabel("Loading...")
+        loading_label.setAlignment(QtCore.Qt.AlignCenter)
+        loading_layout.addWidget(loading_label)
+        self._loading_progress = QtWidgets.QProgressBar()
+        self._loading_progress.setRange(0, 0)
+        self._loading_progress.setMaximumWidth(400)
+        loading_layout.addWidget(self._loading_progress, alignment=QtCore.Qt.AlignHCenter)
+        loading_layout.addStretch()
+        self._layout.addWidget(self._loading_widget)
+
     def _on_loaded(self, editable: Editable):
         self._serialized = None
-        self._layout.removeWidget(self._loading_label)
-        self._loading_label.deleteLater()
-        self._loading_label = None
+        self._layout.removeWidget(self._loading_widget)
+        self._loading_widget.deleteLater()
+        self._loading_widget = None
+        self._loading_progress = None
         self._layout.addWidget(self._editable)
 
     def load(self) -> None:
-        if self._editable:
+        if self._editable is not None or self._decoding is not None or self._materializer is not None:
             return
 
-        with self._loading_lock:
-            if self._loading:
-                return
-            self._loading = True
+        self._decoding = self._decode_executor.submit(decode_tab, self._serialized)
+        self._decoding.add_done_callback(self._decoded.emit)
+
+    def _on_decoded(self, future: Future) -> None:
+        if future is not self._decoding:
+            return
+        self._decoding = None
+        self._materialize(future)
+
+    def _materialize(self, future: Future, synchronous: bool = False) -> None:
+        try:
+            decoded = future.result()
+        except Exception:
+            if Context.debug:
+                import traceback
+
+                traceback.print_exc()
+            decoded = None
+
+        if decoded is None:
+            self._load()
+            return
+
+        self._materializer = TabMaterializer(decoded, self._undo_stack, parent=self)
+        self._materializer.progress.connect(self._on_progress)
+        self._materializer.finished.connect(self._set_editable)
+        self._materializer.failed.connect(self._on_materialize_failed)
 
+        if synchronous:
+            self._materializer.finish()
+        else:
+            self._materializer.start()
+
+    def _on_progress(self, done: int, total: int) -> None:
+        if self._loading_progress is not None:
+            self._loading_progress.setRange(0, total)
+            self._loading_progress.setValue(done)
+
+    def _on_materialize_failed(self, message: str) -> None:
+        self._materializer = None
         self._load()
 
     @property
@@ -122,22 +188,28 @@ class EditorTab(Tab):
         return self._undo_stack
 
     def _load(self) -> None:
-        with self._loading_lock:
-            try:
-                self._editable = load_editable(self._serialized, self._undo_stack)
-            except Exception:
-                if Context.debug:
-                    import traceback
+        try:
+            editable = load_editable(self._serialized, self._undo_stack)
+        except Exception:
+            if Context.debug:
+                import traceback
+
+                traceback.print_exc()
+            Context.notification_message.emit("Failed loading tab")
+            editable = DeckView(DeckModel(), self._undo_stack)
 
-                    traceback.print_exc()
-                Context.notification_message.emit("Failed loading tab")
-                self._editable = DeckView(DeckModel(), self._undo_stack)
+        self._set_editable(editable)
 
-            self._editable.tab = self
+    def _set_editable(self, editable: Editable) -> None:
+        if self._editable is not None:
+            return
+
+        self._decoding = None
+        self._materializer = None
 
-            self._loading = False
-            self._loading_event.set()
-            self.editable_loaded.emit(self._editable)
+        self._editable = editable
+        self._editable.tab = self
+        self.editable_loaded.emit(self._editable)
 
     @property
     def loaded(self) -> bool:
@@ -146,11 +218,42 @@ class EditorTab(Tab):
     @property
     def editable(self) -> Editable:
         if self._editable is None:
-            self.load()
-            self._loading_event.wait()
+            if self._materializer is not None:
+                self._materializer.finish()
+            elif self._decoding is not None:
+                future, self._decoding = self._decoding, None
+                self._materialize(future, synchronous=True)
+            else:
+                self._load()
 
         return self._editable
 
+    @property
+    def card_count(self) -> int:
+        if isinstance(self._editable, MultiCubesView):
+            return sum(view.cube_scene.card_count for view in self._editable.cube_views)
+        return 0
+
+    @property
+    def can_hibernate(self) -> bool:
+        return (
+            self._editable is not None
+            and self._editable.tab_type in (TabType.DECK, TabType.POOL)
+            and not self._undo_stack.count()
+        )
+
+    def hibernate(self, state: t.Mapping[str, t.Any]) -> None:
+        editable, self._editable = self._editable, None
+        self._serialized = state
+
+        self._layout.removeWidget(editable)
+        editable.close()
+        editable.tab = None
+        editable.setParent(None)
+        editable.deleteLater()
+
+        self._show_loading_widget()
+
     def persist(self) -> t.Any:
         if self._editable is not None:
             return self._editable.persist()
@@ -169,6 +272,10 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
 
     new_remote_deck = pyqtSignal(object)
 
+    _tab_model_read = pyqtSignal(object, object, object)
+
+    _open_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="file_open")
+
     def __init__(self, parent: QtWidgets.QWidget = None):
         super().__init__(parent)
 
@@ -176,6 +283,23 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
         self._new_decks = 0
 
         self._metas: t.MutableMapping[Tab, TabMeta] = {}
+        self._journal = SessionJournal(self._get_journal_path(), self)
+        self._session_writer = SessionWriter(self._journal, self)
+
+        self._checkpoint_timer = QtCore.QTimer(self)
+        self._checkpoint_timer.setSingleShot(True)
+        self._checkpoint_timer.setInterval(5000)
+        self._checkpoint_timer.timeout.connect(lambda: self.save_session(wait=False))
+        self._journal.checkpoint_needed.connect(self._on_checkpoint_needed)
+
+        self._active_tab: t.Optional[Tab] = None
+        self._last_active: t.MutableMapping[Tab, float] = {}
+        self._streaming: t.Set[Tab] = set()
+
+        self._hibernation_timer = QtCore.QTimer(self)
+        self._hibernation_timer.setInterval(30000)
+        self._hibernation_timer.timeout.connect(self.hibernate_inactive_tabs)
+        self._hibernation_timer.start()
 
         self.setMovable(True)
         self.setContentsMargins(1, 2, 1, 1)
@@ -194,6 +318,7 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
         self._create_action("Go to last tab", self.go_to_last_tab, "Alt+9")
 
         self.new_remote_deck.connect(self.new_limited_deck)
+        self._tab_model_read.connect(self._on_tab_model_read, QtCore.Qt.QueuedConnection)
 
     def _get_go_to_tab(self, idx: int) -> t.Callable[[], None]:
         return lambda: self.setCurrentIndex(idx)
@@ -207,10 +332,44 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
             return tab.editable
 
     def _on_current_changed(self, idx: int) -> None:
+        now = time.monotonic()
+        if self._active_tab in self._metas:
+            self._last_active[self._active_tab] = now
+
         tab: Tab = self.widget(idx)
+        self._active_tab = tab
         if tab:
+            self._last_active[tab] = now
             tab.load()
             Context.undo_group.setActiveStack(tab.undo_stack)
+            self.hibernate_inactive_tabs()
+
+    def hibernate_tab(self, tab: EditorTab) -> None:
+        if tab is self.currentWidget() or tab in self._streaming or not tab.can_hibernate:
+            return
+        tab.hibernate(self._session_writer.hibernate(tab))
+
+    def hibernate_inactive_tabs(self) -> None:
+        idle_limit = settings.HIBERNATE_TABS_AFTER.get_value() * 60
+        card_budget = settings.HIBERNATION_CARD_BUDGET.get_value()
+        if not idle_limit and not card_budget:
+            return
+
+        now = time.monotonic()
+        current_tab = self.currentWidget()
+        if current_tab is not None:
+            self._last_active[current_tab] = now
+
+        loaded_cards = sum(tab.card_count for tab in self._metas if tab.loaded)
+
+        for tab in sorted(self._metas, key=lambda _tab: self._last_active.get(_tab, 0)):
+            if tab is current_tab or tab in self._streaming or not tab.can_hibernate:
+                continue
+            if (idle_limit and now - self._last_active.get(tab, 0) >= idle_limit) or (
+                card_budget and loaded_cards > card_budget
+            ):
+                loaded_cards -= tab.card_count
+                self.hibernate_tab(tab)
 
     def new_draft(self, draft_id: str) -> None:
         for editable, meta in self._metas.items():
@@ -243,6 +402,8 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
                 self.setCurrentWidget(tab)
                 return
 
+        Context.image_prefetcher.prefetch_cubeables(pool)
+
         tab = self.add_editable(
             PoolView(
                 PoolModel(
@@ -272,6 +433,8 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
         if self._check_for_key(key):
             return
 
+        Context.image_prefetcher.prefetch_cubeables(itertools.chain(deck.deck.maindeck, deck.deck.sideboard))
+
         tab = self.add_editable(
             DeckView(
                 DeckModel(
@@ -305,23 +468,23 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
     def _get_session_path(cls) -> str:
         return paths.DEBUG_SESSION_PATH if Context.debug else paths.SESSION_PATH
 
-    def save_session(self) -> None:
-        with open(self._get_session_path(), "wb") as session_file:
-            tabs = []
-            drafts = {}
-            for tab, meta in self._metas.items():
-                if tab.tab_type == TabType.DRAFT:
-                    drafts[meta.key] = tab.persist()
-                else:
-                    tabs.append((tab.persist(), meta))
-            pickle.dump(
-                {
-                    "tabs": tabs,
-                    "drafts": drafts,
-                    "current_tab_index": self.currentIndex(),
-                },
-                session_file,
-            )
+    @classmethod
+    def _get_journal_path(cls) -> str:
+        return paths.DEBUG_JOURNAL_PATH if Context.debug else paths.JOURNAL_PATH
+
+    def _on_checkpoint_needed(self, tab: Tab) -> None:
+        if not self._checkpoint_timer.isActive():
+            self._checkpoint_timer.start()
+
+    def save_session(self, wait: bool = True) -> None:
+        session = self._session_writer.snapshot(
+            self._metas.items(),
+            self.currentIndex(),
+            force=wait,
+        )
+        self._session_writer.write(self._get_session_path(), session)
+        if wait:
+            self._session_writer.flush()
 
     def load_session(self) -> None:
         try:
@@ -334,10 +497,19 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
                 Context.notification_message.emit("Failed loading previous session")
                 return
 
+            generations = previous_session.get("generations", {})
+
             for state, meta in previous_session["tabs"]:
-                self.load_file(state, meta)
+                self.load_file(self._journal.recover(state, meta.key, generations.get(meta.key)), meta)
+
+            Context.saved_drafts = {
+                key: self._journal.recover(state, key, generations.get(key))
+                for key, state in previous_session.get("drafts", {}).items()
+            }
 
-            Context.saved_drafts = previous_session.get("drafts", {})
+            self._journal.remove_orphans(
+                set(generations) | set(Context.saved_drafts) | {meta.key for meta in self._metas.values()}
+            )
 
         except Exception:
             if Context.debug:
@@ -374,6 +546,8 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
         )
         self.addTab(tab, meta.truncated_name)
         self._metas[tab] = meta
+        self._last_active[tab] = time.monotonic()
+        self._session_writer.track(tab, meta.key)
         return tab
 
     def new_deck(self, model: DeckModel) -> Tab:
@@ -393,6 +567,10 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
             for cube_view in editable.cube_views:
                 cube_view.cube_scene.get_default_sort().redo()
 
+        self._fit_opened_view(editable)
+
+    @staticmethod
+    def _fit_opened_view(editable: Editable) -> None:
         for cube_view in editable.cube_views:
             cube_view.cube_image_view.fit_cards()
 
@@ -410,8 +588,6 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
         name, extension = os.path.splitext(file_name)
         extension = extension[1:]
         meta = TabMeta(file_name, path)
-        editable = None
-
         if extension.lower() == "embd":
             with open(path, "rb") as f:
                 try:
@@ -427,51 +603,93 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
                     raise FileOpenException("corrupt file")
 
         else:
-            with open(path, "r") as f:
-                try:
-                    serializer: TabModelSerializer[t.Union[Deck, Pool]] = TabModelSerializer.extension_to_serializer[
-                        (extension, target)
-                    ]
-                except KeyError:
-                    raise FileOpenException('unsupported file type "{}"'.format(extension))
-
-                try:
-                    tab_model = serializer.deserialize(f.read())
-                except SerializationException:
-                    raise FileOpenException()
+            try:
+                serializer: TabModelSerializer[t.Union[Deck, Pool]] = TabModelSerializer.extension_to_serializer[
+                    (extension, target)
+                ]
+            except KeyError:
+                raise FileOpenException('unsupported file type "{}"'.format(extension))
 
             if target == Deck:
-                editable = DeckView(
-                    DeckModel(
-                        list(map(PhysicalCard.from_cubeable, tab_model.maindeck)),
-                        list(map(PhysicalCard.from_cubeable, tab_model.sideboard)),
-                    ),
-                    Context.get_undo_stack(),
-                )
+                editable = DeckView(DeckModel(), Context.get_undo_stack())
 
             elif target == Pool:
-                editable = PoolView(
-                    PoolModel(
-                        list(map(PhysicalCard.from_cubeable, tab_model)),
-                    ),
-                    Context.get_undo_stack(),
-                )
+                editable = PoolView(PoolModel(), Context.get_undo_stack())
 
             else:
                 raise FileOpenException('invalid load target "{}"'.format(target))
 
             tab = self.add_editable(editable, meta)
+            self._open_executor.submit(self._read_tab_model, path, serializer, target).add_done_callback(
+                lambda future: self._tab_model_read.emit(tab, target, future)
+            )
 
         self.setCurrentWidget(tab)
 
-        if editable is not None:
-            self._sort_opened_view(editable)
-
         if not Context.main_window.isActiveWindow() and Context.settings.value("focus_on_open_file", True, bool):
             Context.main_window.raise_()
             Context.main_window.show()
             Context.main_window.activateWindow()
 
+    @staticmethod
+    def _read_tab_model(
+        path: str,
+        serializer: t.Type[TabModelSerializer],
+        target: t.Type[TabModel],
+    ) -> t.Tuple[t.List[Cubeable], ...]:
+        with open(path, "r") as f:
+            tab_model = serializer.deserialize(f.read())
+        if target == Deck:
+            return list(tab_model.maindeck), list(tab_model.sideboard)
+        return (list(tab_model),)
+
+    def _on_tab_model_read(self, tab: Tab, target: t.Type[TabModel], future: Future) -> None:
+        meta = self._metas.get(tab)
+        if meta is None:
+            return
+
+        try:
+            cubeables = future.result()
+        except FileNotFoundError:
+            Context.notification_message.emit("File not found")
+            self.close_tab(tab)
+            return
+        except (OSError, SerializationException) as e:
+            Context.notification_message.emit(f"Failed opening {meta.truncated_name}: {e}")
+            self.close_tab(tab)
+            return
+
+        editable = tab.editable
+
+        if target == Deck:
+            scenes = tuple(zip((editable.deck_model.maindeck, editable.deck_model.sideboard), cubeables))
+        else:
+            scenes = tuple(zip((editable.pool_model.pool,), cubeables))
+
+        Context.image_prefetcher.prefetch_cubeables(
+            itertools.chain.from_iterable(cubeables for _, cubeables in scenes)
+        )
+
+        def _on_progress(placed: int, total: int) -> None:
+            self.setTabText(self.indexOf(tab), f"{meta.truncated_name} ({placed * 100 // max(total, 1)}%)")
+
+        def _on_finished(_) -> None:
+            self._streaming.discard(tab)
+            self.setTabText(self.indexOf(tab), meta.truncated_name)
+            self._fit_opened_view(editable)
+
+        def _on_failed(message: str) -> None:
+            self._streaming.discard(tab)
+            self.setTabText(self.indexOf(tab), meta.truncated_name)
+            Context.notification_message.emit(f"Failed opening {meta.truncated_name}: {message}")
+
+        streamer = CardStreamer(scenes, sort=settings.AUTO_SORT_NON_EMB_FILES_ON_OPEN.get_value(), parent=tab)
+        streamer.progress.connect(_on_progress)
+        streamer.finished.connect(_on_finished)
+        streamer.failed.connect(_on_failed)
+        self._streaming.add(tab)
+        streamer.start()
+
     def save_tab_at_path(self, tab: Tab, path: str, clear_undo: bool = True) -> None:
         extension = os.path.splitext(path)[-1][1:]
 
@@ -594,8 +812,19 @@ class EditablesTabs(QtWidgets.QTabWidget, Editor, WithActions):
             with open(file_names[0], "w") as f:
                 f.write(serializer.serialize(current_tab.editable.pool_model.as_deck()))
 
+    def export_image(self) -> None:
+        current_tab = self.currentWidget()
+
+        if not current_tab or not current_tab.loaded or not isinstance(current_tab.editable, MultiCubesView):
+            return
+
+        export_scenes([view.cube_scene for view in current_tab.editable.cube_views], self)
+
     def close_tab(self, tab: Tab) -> None:
         del self._metas[tab]
+        self._last_active.pop(tab, None)
+        self._streaming.discard(tab)
+        self._session_writer.untrack(tab)
 
         if tab.loaded:
             tab.editable.close()
@@ -0,0 +1,412 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import pickle
+import struct
+import time
+import typing as t
+import zlib
+from collections import defaultdict
+from concurrent.futures.thread import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from deckeditor.components.views.editables.editable import Editable, Tab, TabType
+from deckeditor.models.cubes.alignment.aligner import Aligner
+from deckeditor.models.cubes.alignment.stackinggrid import StackingGrid
+from deckeditor.models.cubes.cubescene import CubeScene
+from deckeditor.models.cubes.physicalcard import PhysicalCard
+from deckeditor.models.cubes.scenecolumns import (
+    aligned_cards,
+    is_plain_printing,
+    supports_columns,
+)
+from deckeditor.serialization import columnar
+from deckeditor.serialization.columnar import (
+    NO_VALUE,
+    ColumnarFormatError,
+    SceneColumns,
+)
+from deckeditor.utils.files import write_atomic
+
+
+JOURNAL_VERSION = 2
+JOURNAL_EXTENSION = ".jnl"
+
+_FRAME = struct.Struct("<II")
+
+_MODEL_PATHS = {
+    TabType.DECK: ("deck_model",),
+    TabType.POOL: ("pool_model",),
+    TabType.DRAFT: ("pool_view", "pool_model"),
+}
+
+Row = t.Tuple[int, int, int, int, t.Optional[int], t.Optional[t.Mapping[str, t.Any]]]
+Segment = t.Tuple[int, int, int, t.Tuple[int, ...]]
+Record = t.Tuple[str, t.Tuple[int, ...], t.Tuple[t.Tuple[int, Row], ...], t.Tuple[Segment, ...]]
+
+
+def get_model_blob(state: t.Mapping[str, t.Any]) -> t.Optional[bytes]:
+    path = _MODEL_PATHS.get(state.get("tab_type"))
+    if path is None:
+        return None
+    for key in path:
+        state = state[key]
+    return state
+
+
+def with_model_blob(state: t.Mapping[str, t.Any], blob: bytes) -> t.Mapping[str, t.Any]:
+    def _replace(_state: t.Mapping[str, t.Any], path: t.Sequence[str]) -> t.Mapping[str, t.Any]:
+        key, *remaining = path
+        return {**_state, key: _replace(_state[key], remaining) if remaining else blob}
+
+    return _replace(state, _MODEL_PATHS[state["tab_type"]])
+
+
+def _frame(value: t.Any) -> bytes:
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_journal(path: str) -> t.Optional[t.Tuple[t.Mapping[str, t.Any], t.List[Record]]]:
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+
+    frames = []
+    offset = 0
+    while offset + _FRAME.size <= len(data):
+        length, crc = _FRAME.unpack_from(data, offset)
+        start = offset + _FRAME.size
+        payload = data[start : start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        frames.append(pickle.loads(payload))
+        offset = start + length
+
+    if not frames or not isinstance(frames[0], dict) or frames[0].get("version") != JOURNAL_VERSION:
+        return None
+
+    header, *records = frames
+    return header, records
+
+
+def _scene_rows(columns: SceneColumns) -> t.Dict[int, Row]:
+    return {
+        card_id: (
+            printing_id,
+            x,
+            y,
+            position,
+            release_id if release_id != NO_VALUE else None,
+            columns.values[value_index] if value_index != NO_VALUE else None,
+        )
+        for card_id, (printing_id, x, y, position, release_id, value_index) in enumerate(
+            zip(
+                columns.printing_ids,
+                columns.stacker_x,
+                columns.stacker_y,
+                columns.positions,
+                columns.release_ids,
+                columns.value_indexes,
+            )
+        )
+    }
+
+
+def _columns_from_rows(base: SceneColumns, rows: t.Mapping[int, Row]) -> SceneColumns:
+    columns = SceneColumns(
+        scene_type=base.scene_type,
+        mode=base.mode,
+        aligner_type=base.aligner_type,
+        aligner_state=base.aligner_state,
+        side_table=base.side_table,
+    )
+    for printing_id, x, y, position, release_id, values in sorted(rows.values(), key=lambda row: row[1:4]):
+        value_index = NO_VALUE
+        if values:
+            value_index = len(columns.values)
+            columns.values.append(values)
+        columns.append(printing_id, x, y, position, release_id, value_index)
+    return columns
+
+
+def replay(blob: bytes, records: t.Iterable[Record]) -> bytes:
+    document = columnar.loads(blob)
+    rows = {name: _scene_rows(columns) for name, columns in document.scenes.items() if columns.legacy is None}
+
+    for scene_name, removed, added, segments in records:
+        scene_rows = rows[scene_name]
+        for card_id in removed:
+            scene_rows.pop(card_id, None)
+        scene_rows.update(added)
+        for x, y, start, card_ids in segments:
+            for position, card_id in enumerate(card_ids, start):
+                printing_id, _, _, _, release_id, values = scene_rows[card_id]
+                scene_rows[card_id] = (printing_id, x, y, position, release_id, values)
+
+    for name, scene_rows in rows.items():
+        document.scenes[name] = _columns_from_rows(document.scenes[name], scene_rows)
+
+    return columnar.dumps(document)
+
+
+class _CheckpointRequired(Exception):
+    pass
+
+
+class _SceneBaseline(object):
+    def __init__(self, scene: CubeScene):
+        self.scene = scene
+        self.aligner: Aligner = scene.aligner
+        self.options = dict(self.aligner.options)
+        self.ids: t.Dict[PhysicalCard, int] = {}
+        self.stackers: t.Dict[t.Tuple[int, int], t.List[PhysicalCard]] = defaultdict(list)
+        self.touched: t.Dict[t.Tuple[int, int], int] = {}
+
+        for card, x, y, _ in aligned_cards(self.aligner):
+            self.stackers[x, y].append(card)
+            if is_plain_printing(card):
+                self.ids[card] = len(self.ids)
+
+        self.next_id = len(self.ids)
+        self.aligner.layout_tracker = self._track
+
+    def close(self) -> None:
+        if self.aligner.layout_tracker == self._track:
+            self.aligner.layout_tracker = None
+
+    def _track(self, x: int, y: int, from_index: int) -> None:
+        self.touched[x, y] = min(self.touched.get((x, y), from_index), from_index)
+
+    def _stacker_cards(self, x: int, y: int) -> t.List[PhysicalCard]:
+        if isinstance(self.aligner, StackingGrid):
+            return self.aligner.stacker_map.get_stacker(x, y).cards
+        return self.aligner.cards
+
+    def changes(self) -> t.Tuple[t.Tuple[int, ...], t.Tuple[t.Tuple[int, Row], ...], t.Tuple[Segment, ...]]:
+        aligner = self.scene.aligner
+        if aligner is not self.aligner or dict(aligner.options) != self.options:
+            raise _CheckpointRequired()
+
+        touched, self.touched = self.touched, {}
+        previous_cards = set()
+        current_cards = set()
+        changed = []
+
+        for (x, y), start in touched.items():
+            previous = self.stackers[x, y]
+            current = self._stacker_cards(x, y)
+            if previous[start:] == current[start:]:
+                continue
+            if not all(map(is_plain_printing, itertools.chain(previous[start:], current[start:]))):
+                raise _CheckpointRequired()
+            previous_cards.update(previous[start:])
+            current_cards.update(current[start:])
+            self.stackers[x, y] = list(current)
+            changed.append((x, y, start, current[start:]))
+
+        removed = tuple(sorted(self.ids.pop(card) for card in previous_cards - current_cards))
+
+        added = []
+        segments = []
+        for x, y, start, cards in changed:
+            for position, card in enumerate(cards, start):
+                if card not in self.ids:
+                    card_id = self.ids[card] = self.next_id
+                    self.next_id += 1
+                    added.append((card_id, self._row(card, x, y, position)))
+            segments.append((x, y, start, tuple(self.ids[card] for card in cards)))
+
+        return removed, tuple(added), tuple(segments)
+
+    @staticmethod
+    def _row(card: PhysicalCard, x: int, y: int, position: int) -> Row:
+        return card.cubeable.id, x, y, position, card.release_id, dict(card.values) if card.values else None
+
+
+class _TabJournal(object):
+    def __init__(self, path: str, generation: int, scenes: t.Mapping[str, CubeScene]):
+        self.path = path
+        self.generation = generation
+        self.baselines = {name: _SceneBaseline(scene) for name, scene in scenes.items()}
+        self.broken = False
+
+    def close(self) -> None:
+        for baseline in self.baselines.values():
+            baseline.close()
+
+    def records(self) -> t.List[Record]:
+        records = []
+        for name, baseline in self.baselines.items():
+            removed, added, segments = baseline.changes()
+            if segments:
+                records.append((name, removed, added, segments))
+        return records
+
+
+def _named_scenes(editable: Editable) -> t.Optional[t.Mapping[str, CubeScene]]:
+    model = getattr(editable, "pool_model", None)
+    if model is None:
+        model = getattr(editable, "deck_model", None)
+    if model is None:
+        return None
+    scenes = model.named_scenes
+    if not all(supports_columns(scene.aligner) for scene in scenes.values()):
+        return None
+    return scenes
+
+
+class SessionJournal(QObject):
+    checkpoint_needed = pyqtSignal(object)
+
+    def __init__(self, directory: str, parent: t.Optional[QObject] = None):
+        super().__init__(parent)
+        self._directory = directory
+        os.makedirs(self._directory, exist_ok=True)
+
+        self._journals: t.Dict[Tab, _TabJournal] = {}
+        self._files: t.Dict[str, t.BinaryIO] = {}
+        self._pending: t.Set[Tab] = set()
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session_journal")
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._flush)
+
+    def journal_path(self, key: str) -> str:
+        return os.path.join(self._directory, key + JOURNAL_EXTENSION)
+
+    def rebase(self, tab: Tab, key: str, blob: t.Union[bytes, columnar.DocumentSnapshot, None]) -> t.Optional[int]:
+        self._pending.discard(tab)
+        if not tab.loaded:
+            return None
+
+        scenes = _named_scenes(tab.editable)
+        if scenes is None or not columnar.is_columnar(blob):
+            self.detach(tab)
+            return None
+
+        previous = self._journals.get(tab)
+        if previous is not None:
+            previous.close()
+
+        path = self.journal_path(key)
+        journal = self._journals[tab] = _TabJournal(path, time.time_ns(), scenes)
+        self._submit(
+            self._io_rebase,
+            path,
+            {
+                "version": JOURNAL_VERSION,
+                "key": key,
+                "generation": journal.generation,
+                "base": blob,
+            },
+        )
+        return journal.generation
+
+    def detach(self, tab: Tab) -> None:
+        self._pending.discard(tab)
+        journal = self._journals.pop(tab, None)
+        if journal is not None:
+            journal.close()
+            self._submit(self._io_remove, journal.path)
+
+    def release(self, tab: Tab) -> None:
+        self._pending.discard(tab)
+        journal = self._journals.pop(tab, None)
+        if journal is not None:
+            journal.close()
+
+    def touch(self, tab: Tab) -> None:
+        if tab in self._journals:
+            self._pending.add(tab)
+            self._timer.start()
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, set()
+        for tab in pending:
+            journal = self._journals.get(tab)
+            if journal is None or journal.broken:
+                continue
+            try:
+                records = journal.records()
+            except _CheckpointRequired:
+                journal.broken = True
+                self.checkpoint_needed.emit(tab)
+                continue
+            if records:
+                self._submit(self._io_append, journal.path, b"".join(map(_frame, records)))
+
+    def _submit(self, f: t.Callable[..., None], *args) -> None:
+        try:
+            self._executor.submit(f, *args)
+        except RuntimeError:
+            pass
+
+    def _io_rebase(self, path: str, header: t.Mapping[str, t.Any]) -> None:
+        self._io_close(path)
+        try:
+            write_atomic(path, _frame(header))
+            self._files[path] = open(path, "ab")
+        except OSError as e:
+            logging.warning(f"failed writing journal {path}: {e}")
+
+    def _io_append(self, path: str, data: bytes) -> None:
+        f = self._files.get(path)
+        if f is None:
+            return
+        try:
+            f.write(data)
+            f.flush()
+        except OSError as e:
+            logging.warning(f"failed appending to journal {path}: {e}")
+
+    def _io_close(self, path: str) -> None:
+        f = self._files.pop(path, None)
+        if f is not None:
+            f.close()
+
+    def _io_remove(self, path: str) -> None:
+        self._io_close(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.warning(f"failed removing journal {path}: {e}")
+
+    def recover(self, state: t.Mapping[str, t.Any], key: str, generation: t.Optional[int]) -> t.Mapping[str, t.Any]:
+        blob = get_model_blob(state)
+        if blob is None:
+            return state
+
+        try:
+            journal = read_journal(self.journal_path(key))
+            if journal is None:
+                return state
+
+            header, records = journal
+            if generation is not None and header["generation"] < generation:
+                return state
+
+            base = blob if header["generation"] == generation else header["base"]
+            if not records and base is blob:
+                return state
+
+            return with_model_blob(state, replay(base, records))
+        except (ColumnarFormatError, pickle.UnpicklingError, EOFError, KeyError, ValueError) as e:
+            logging.warning(f"failed replaying journal for {key}: {e}")
+            return state
+
+    def remove_orphans(self, keys: t.AbstractSet[str]) -> None:
+        for file_name in os.listdir(self._directory):
+            key, extension = os.path.splitext(file_name)
+            if extension == JOURNAL_EXTENSION and key not in keys:
+                self._submit(self._io_remove, os.path.join(self._directory, file_name))
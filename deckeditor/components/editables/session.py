@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import logging
+import pickle
+import threading
+import typing as t
+from concurrent.futures import Future
+from concurrent.futures.thread import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject
+
+from deckeditor.components.editables.editor import TabMeta
+from deckeditor.components.editables.journal import SessionJournal, get_model_blob
+from deckeditor.components.views.cubeedit.cubeview import CubeView
+from deckeditor.components.views.editables.editable import Editable, Tab, TabType
+from deckeditor.utils.files import write_atomic
+
+
+class SessionWriter(QObject):
+    def __init__(self, journal: SessionJournal, parent: t.Optional[QObject] = None):
+        super().__init__(parent)
+        self._journal = journal
+        self._states: t.Dict[Tab, t.Any] = {}
+        self._keys: t.Dict[Tab, str] = {}
+        self._generations: t.Dict[Tab, int] = {}
+        self._dirty: t.Set[Tab] = set()
+        self._tracked: t.Set[Tab] = set()
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session_writer")
+        self._lock = threading.Lock()
+        self._pending: t.Optional[t.Tuple[str, t.Mapping[str, t.Any]]] = None
+        self._future: t.Optional[Future] = None
+
+    def is_dirty(self, tab: Tab) -> bool:
+        return tab in self._dirty or tab not in self._states
+
+    def mark_dirty(self, tab: Tab) -> None:
+        self._dirty.add(tab)
+        self._journal.touch(tab)
+
+    def track(self, tab: Tab, key: str) -> None:
+        if tab in self._tracked:
+            return
+        self._tracked.add(tab)
+        self._keys[tab] = key
+
+        tab.undo_stack.indexChanged.connect(lambda _: self.mark_dirty(tab))
+
+        tab.editable_loaded.connect(lambda editable: self._track_editable(tab, editable))
+        if tab.loaded:
+            self._track_editable(tab, tab.editable)
+        else:
+            self._states[tab] = tab.persist()
+
+    def _track_editable(self, tab: Tab, editable: Editable) -> None:
+        self._dirty.add(tab)
+        state = self._states.get(tab)
+        if state is not None:
+            self._journal.rebase(tab, self._keys[tab], get_model_blob(state))
+        for cube_view in editable.findChildren(CubeView):
+            cube_view.cube_scene.content_changed.connect(lambda _: self.mark_dirty(tab))
+            cube_view.cube_scene.aligner_changed.connect(lambda _: self.mark_dirty(tab))
+
+    def untrack(self, tab: Tab) -> None:
+        self._tracked.discard(tab)
+        self._dirty.discard(tab)
+        self._states.pop(tab, None)
+        self._keys.pop(tab, None)
+        self._generations.pop(tab, None)
+        self._journal.detach(tab)
+
+    def hibernate(self, tab: Tab) -> t.Any:
+        state = self._state(tab, False)
+        self._journal.release(tab)
+        return state
+
+    def _state(self, tab: Tab, force: bool) -> t.Any:
+        if force or self.is_dirty(tab):
+            self._states[tab] = state = tab.persist()
+            self._dirty.discard(tab)
+            generation = self._journal.rebase(tab, self._keys[tab], get_model_blob(state))
+            if generation is None:
+                self._generations.pop(tab, None)
+            else:
+                self._generations[tab] = generation
+        return self._states[tab]
+
+    def snapshot(
+        self,
+        tabs: t.Iterable[t.Tuple[Tab, TabMeta]],
+        current_tab_index: int,
+        force: bool = False,
+    ) -> t.Mapping[str, t.Any]:
+        session_tabs = []
+        drafts = {}
+        generations = {}
+        seen = set()
+
+        for tab, meta in tabs:
+            seen.add(tab)
+            if tab.tab_type == TabType.DRAFT:
+                drafts[meta.key] = self._state(tab, force)
+            else:
+                session_tabs.append((self._state(tab, force), meta))
+            if tab in self._generations:
+                generations[meta.key] = self._generations[tab]
+
+        for tab in set(self._states) - seen:
+            self.untrack(tab)
+
+        return {
+            "tabs": session_tabs,
+            "drafts": drafts,
+            "generations": generations,
+            "current_tab_index": current_tab_index,
+        }
+
+    def write(self, path: str, session: t.Mapping[str, t.Any]) -> Future:
+        with self._lock:
+            replaced = self._pending is not None
+            self._pending = (path, session)
+            if not replaced:
+                self._future = self._executor.submit(self._write_pending)
+            return self._future
+
+    def _write_pending(self) -> None:
+        with self._lock:
+            path, session = self._pending
+            self._pending = None
+        try:
+            write_atomic(path, pickle.dumps(session))
+        except (OSError, pickle.PicklingError) as e:
+            logging.warning(f"failed writing session: {e}")
+            raise
+
+    def flush(self) -> None:
+        with self._lock:
+            future = self._future
+        if future is not None:
+            try:
+                future.result()
+            except (OSError, pickle.PicklingError):
+                pass
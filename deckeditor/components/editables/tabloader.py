@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import time
+import typing as t
+from abc import abstractmethod
+from dataclasses import dataclass
+
+from magiccube.collections.cubeable import Cubeable
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QUndoStack
+
+from deckeditor.components.views.editables.deck import DeckView
+from deckeditor.components.views.editables.editable import TabType
+from deckeditor.components.views.editables.pool import PoolView
+from deckeditor.models.cubes.alignment.stackinggrid import StackingGrid
+from deckeditor.models.cubes.cubescene import CubeScene
+from deckeditor.models.cubes.physicalcard import PhysicalCard
+from deckeditor.models.cubes.scenecolumns import (
+    CardRow,
+    Placement,
+    inflate_row,
+    resolve_rows,
+)
+from deckeditor.models.deck import DeckModel, PoolModel
+from deckeditor.serialization import columnar
+from deckeditor.serialization.columnar import ColumnarDocument
+
+
+_MODEL_KEYS = {
+    TabType.DECK: "deck_model",
+    TabType.POOL: "pool_model",
+}
+
+
+@dataclass
+class DecodedTab(object):
+    serialized: t.Mapping[str, t.Any]
+    document: ColumnarDocument
+    rows: t.Dict[str, t.List[CardRow]]
+
+    @property
+    def tab_type(self) -> TabType:
+        return self.serialized["tab_type"]
+
+    @property
+    def card_count(self) -> int:
+        return sum(map(len, self.rows.values()))
+
+
+def decode_tab(serialized: t.Mapping[str, t.Any]) -> t.Optional[DecodedTab]:
+    model_key = _MODEL_KEYS.get(serialized["tab_type"])
+    if model_key is None or not columnar.is_columnar(serialized[model_key]):
+        return None
+
+    document = columnar.loads(serialized[model_key])
+    return DecodedTab(
+        serialized,
+        document,
+        {name: resolve_rows(columns) for name, columns in document.scenes.items()},
+    )
+
+
+class TimeSlicedTask(QObject):
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, frame_budget: float = 0.008, parent: t.Optional[QObject] = None):
+        super().__init__(parent)
+        self._frame_budget = frame_budget
+
+        self._steps = self._run_steps()
+        self._done = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._process)
+
+    def start(self) -> None:
+        self._timer.start()
+
+    def finish(self) -> None:
+        self._timer.stop()
+        self._run(None)
+
+    def _process(self) -> None:
+        if not self._run(time.perf_counter() + self._frame_budget):
+            self._timer.start()
+
+    def _run(self, deadline: t.Optional[float]) -> bool:
+        if self._done:
+            return True
+        try:
+            while deadline is None or time.perf_counter() < deadline:
+                next(self._steps)
+        except StopIteration:
+            self._done = True
+        except Exception as e:
+            self._done = True
+            self.failed.emit(str(e))
+        return self._done
+
+    @abstractmethod
+    def _run_steps(self) -> t.Iterator[None]:
+        pass
+
+
+class TabMaterializer(TimeSlicedTask):
+    def __init__(
+        self,
+        decoded: DecodedTab,
+        undo_stack: QUndoStack,
+        frame_budget: float = 0.008,
+        parent: t.Optional[QObject] = None,
+    ):
+        self._decoded = decoded
+        self._undo_stack = undo_stack
+        super().__init__(frame_budget, parent)
+
+    def _run_steps(self) -> t.Iterator[None]:
+        total = self._decoded.card_count
+        created = 0
+        placements: t.Dict[str, t.List[Placement]] = {}
+
+        for name, rows in self._decoded.rows.items():
+            placements[name] = scene_placements = []
+            for row in rows:
+                scene_placements.append(inflate_row(row))
+                created += 1
+                if not created % 32:
+                    self.progress.emit(created, total)
+                    yield
+
+        self.progress.emit(total, total)
+        yield
+
+        serialized = self._decoded.serialized
+        if self._decoded.tab_type == TabType.POOL:
+            editable = PoolView.load(
+                serialized,
+                self._undo_stack,
+                pool_model=PoolModel.from_columns(self._decoded.document, placements),
+            )
+        else:
+            editable = DeckView.load(
+                serialized,
+                self._undo_stack,
+                deck_model=DeckModel.from_columns(self._decoded.document, placements),
+            )
+
+        self.finished.emit(editable)
+
+
+class CardStreamer(TimeSlicedTask):
+    def __init__(
+        self,
+        scenes: t.Sequence[t.Tuple[CubeScene, t.Sequence[Cubeable]]],
+        sort: bool = False,
+        batch_size: int = 64,
+        frame_budget: float = 0.008,
+        parent: t.Optional[QObject] = None,
+    ):
+        self._scenes = scenes
+        self._sort = sort
+        self._batch_size = batch_size
+        super().__init__(frame_budget, parent)
+
+    def _run_steps(self) -> t.Iterator[None]:
+        total = sum(len(cubeables) for _, cubeables in self._scenes)
+        placed = 0
+
+        for scene, cubeables in self._scenes:
+            if self._sort and isinstance(scene.aligner, StackingGrid):
+                cards = []
+                for offset in range(0, len(cubeables), self._batch_size):
+                    cards.extend(map(PhysicalCard.from_cubeable, cubeables[offset : offset + self._batch_size]))
+                    yield
+
+                grid = scene.aligner.headless_grid()
+                grid.add_cards(cards).redo()
+                grid.sort(scene.get_default_sort_macro(), cards).redo()
+                yield
+
+                added = set(cards)
+                for x, y, stacker in grid.stackers():
+                    stacker_cards = [card for card in stacker if card in added]
+                    if not stacker_cards:
+                        continue
+                    scene.add_physical_cards(*stacker_cards)
+                    scene.aligner.get_card_stacker_at_index(x, y).add_cards(stacker_cards)
+                    placed += len(stacker_cards)
+                    self.progress.emit(placed, total)
+                    yield
+
+                continue
+
+            for offset in range(0, len(cubeables), self._batch_size):
+                batch = cubeables[offset : offset + self._batch_size]
+                scene.place_physical_cards(list(map(PhysicalCard.from_cubeable, batch)))
+                placed += len(batch)
+                self.progress.emit(placed, total)
+                yield
+
+            if self._sort:
+                scene.get_default_sort().redo()
+                yield
+
+        self.finished.emit(None)
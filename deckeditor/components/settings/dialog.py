@@ -67,6 +67,19 @@ class SettingsDialog(SingleInstanceDialog):
                         settings.LAZY_TABS,
                         "Don't load editor tabs before they receive focus.",
                     ),
+                    IntegerSettingEditor(
+                        settings.HIBERNATE_TABS_AFTER,
+                        "Unload deck and pool tabs that haven't been focused for this many minutes, 0 to disable. "
+                        "Undo history of hibernated tabs is lost.",
+                        min_value=0,
+                        max_value=1440,
+                    ),
+                    IntegerSettingEditor(
+                        settings.HIBERNATION_CARD_BUDGET,
+                        "Unload the least recently focused tabs while more cards than this are loaded, 0 to disable.",
+                        min_value=0,
+                        max_value=100000,
+                    ),
                 ),
                 (),
             ),
@@ -193,6 +206,26 @@ class SettingsDialog(SingleInstanceDialog):
                         min_value=0,
                         max_value=1024,
                     ),
+                    IntegerSettingEditor(
+                        settings.IMAGE_MEMORY_CACHE_SIZE,
+                        "Memory budget for decoded images, split between image sizes.",
+                        min_value=16,
+                        max_value=8192,
+                    ),
+                    BooleanSettingEditor(
+                        settings.IMAGE_DISK_CACHE,
+                        "Keep scaled images on disk between sessions.",
+                    ),
+                    IntegerSettingEditor(
+                        settings.IMAGE_DISK_CACHE_SIZE,
+                        "Max size of the persistent image cache, least recently used images are removed first.",
+                        min_value=16,
+                        max_value=65536,
+                    ),
+                    BooleanSettingEditor(
+                        settings.IMAGE_PREFETCH,
+                        "Load images of boosters, opened files and cards next to the hovered card ahead of time.",
+                    ),
                     BooleanSettingEditor(
                         settings.REMOTE_IMAGES,
                         "Get images from server instead of generating locally.",
@@ -201,6 +234,10 @@ class SettingsDialog(SingleInstanceDialog):
                         settings.REMOTE_IMAGE_URL,
                         "Where to get remote images from.",
                     ),
+                    BooleanSettingEditor(
+                        settings.REMOTE_IMAGE_BATCHING,
+                        "Fetch remote images in batches over a single connection when the server supports it.",
+                    ),
                     BooleanSettingEditor(
                         settings.ALLOW_LOCAL_IMAGE_FALLBACK,
                         "Generate images locally if they are unavailable remotely.",
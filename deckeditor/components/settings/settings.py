@@ -97,6 +97,8 @@ class JsonSetting(Setting[t.Mapping[str, t.Any]]):
 DEFAULT_CARD_VIEW_TYPE = StringSetting("default_card_view_type", "Default card view", "image")
 FRAMELESS = BooleanSetting("frameless", "Frameless", True, requires_restart=True)
 LAZY_TABS = BooleanSetting("lazy_tabs", "Lazy Tabs", True, requires_restart=True)
+HIBERNATE_TABS_AFTER = IntegerSetting("hibernate_tabs_after", "Hibernate inactive tabs after (minutes)", 30)
+HIBERNATION_CARD_BUDGET = IntegerSetting("hibernation_card_budget", "Loaded cards before hibernating tabs", 5000)
 
 DEFAULT_CUBEVIEW_HEADER_HIDDEN = BooleanSetting("default_cubeview_header_hidden", "Header collapsed by default", True)
 IMAGE_VIEW_SCROLL_DEFAULT_ZOOM = BooleanSetting("image_view_scroll_default_zoom", "Zoom with scroll wheel", True)
@@ -127,10 +129,21 @@ PICK_ON_DOUBLE_CLICK = BooleanSetting("pick_on_double_click", "Double click pick
 GHOST_CARDS = BooleanSetting("ghost_cards", "Ghost cards", True)
 
 IMAGE_CACHE_SIZE = IntegerSetting("image_cache_size", "Image cache size", 64, requires_restart=True)
+IMAGE_MEMORY_CACHE_SIZE = IntegerSetting(
+    "image_memory_cache_size", "Image memory cache size (MB)", 512, requires_restart=True
+)
+IMAGE_DISK_CACHE = BooleanSetting("image_disk_cache", "Persistent image cache", True, requires_restart=True)
+IMAGE_DISK_CACHE_SIZE = IntegerSetting(
+    "image_disk_cache_size", "Persistent image cache size (MB)", 1024, requires_restart=True
+)
+IMAGE_PREFETCH = BooleanSetting("image_prefetch", "Prefetch images", True)
 REMOTE_IMAGES = BooleanSetting("remote_images", "Remote images", False, requires_restart=True)
 REMOTE_IMAGE_URL = StringSetting(
     "remote_image_url", "Remote images url", "https://prohunterdogkeeper.dk", requires_restart=True
 )
+REMOTE_IMAGE_BATCHING = BooleanSetting(
+    "remote_image_batching", "Batch remote image requests", False, requires_restart=True
+)
 ALLOW_LOCAL_IMAGE_FALLBACK = BooleanSetting(
     "allow_local_image_fallback", "Allow local fallback", True, requires_restart=True
 )
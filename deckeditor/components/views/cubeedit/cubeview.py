@@ -80,13 +80,13 @@ class SelectionIndicator(QtWidgets.QLabel):
         self._reset_text()
 
         self._scene.selectionChanged.connect(self._reset_text)
-        self._scene.changed.connect(self._reset_text)
+        self._scene.content_changed.connect(self._reset_text)
 
     def _reset_text(self, *args, **kwargs) -> None:
         self.setText(
             "{}/{}".format(
-                len(self._scene.selectedItems()),
-                len(self._scene.items()),
+                self._scene.selected_count,
+                self._scene.card_count,
             )
         )
 
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import functools
+import itertools
 import operator
 import typing as t
 
-from magiccube.collections.cube import Cube
+from lru import LRU
 from magiccube.collections.delta import CubeDeltaOperation
+from mtgimg.interface import ImageRequest
 from mtgorp.models.interfaces import Printing
-from mtgorp.models.serilization.strategies.picklestrategy import PickleStrategy
 from mtgorp.tools.parsing.exceptions import ParseException
 from mtgorp.tools.search.extraction import PrintingStrategy
 from mtgorp.tools.search.pattern import Criteria
@@ -19,9 +20,11 @@ from yeetlong.multiset import Multiset
 
 from deckeditor.components.cardview.focuscard import FocusEvent
 from deckeditor.components.settings import settings
+from deckeditor.components.views.cubeedit.graphical.sceneexport import export_scenes
 from deckeditor.context.context import Context
 from deckeditor.models.cubes.cubescene import CubeScene
 from deckeditor.models.cubes.physicalcard import PhysicalAllCard, PhysicalCard
+from deckeditor.serialization import clipboard
 from deckeditor.sorting import sorting
 from deckeditor.sorting.sorting import (
     SortDimension,
@@ -35,6 +38,13 @@ from deckeditor.utils.transform import transform_factory
 from deckeditor.utils.undo import CommandPackage
 
 
+_SEARCH_MATCH_CACHE: t.MutableMapping[t.Tuple[str, Printing], bool] = LRU(1 << 14)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+
 class QueryEdit(QtWidgets.QLineEdit):
     def keyPressEvent(self, key_press: QtGui.QKeyEvent):
         if key_press.key() == QtCore.Qt.Key_Return or key_press.key() == QtCore.Qt.Key_Enter:
@@ -63,7 +73,8 @@ class SearchSelectionDialog(QtWidgets.QDialog):
 
     def compile(self):
         try:
-            self.parent().search_select.emit(Context.search_pattern_parser.parse_criteria(self._query_edit.text()))
+            query = normalize_query(self._query_edit.text())
+            self.parent().search_select.emit(query, Context.search_pattern_parser.parse_criteria(query))
             self.accept()
         except ParseException as e:
             self._error_label.setText(str(e))
@@ -72,7 +83,7 @@ class SearchSelectionDialog(QtWidgets.QDialog):
 
 
 class CubeImageView(QtWidgets.QGraphicsView, WithActions):
-    search_select = QtCore.pyqtSignal(Criteria)
+    search_select = QtCore.pyqtSignal(str, Criteria)
     card_double_clicked = QtCore.pyqtSignal(PhysicalCard, int)
 
     def __init__(self, undo_stack: QUndoStack, scene: CubeScene):
@@ -83,6 +94,7 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
 
         self.setAlignment(QtCore.Qt.AlignTop | QtCore.Qt.AlignLeft)
         self.setRenderHints(QPainter.SmoothPixmapTransform)
+        self.setCacheMode(QtWidgets.QGraphicsView.CacheBackground)
 
         self.setAcceptDrops(True)
         self.setMouseTracking(True)
@@ -99,6 +111,7 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
         self._dragging_move: bool = False
         self._last_move_event_pos = None
         self._last_press_on_card = False
+        self._hovered_card: t.Optional[PhysicalCard] = None
         self._last_double_click = False
         self._drag = None
 
@@ -144,10 +157,19 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
         self.setTransform(QTransform())
         self.scale(0.3, 0.3)
 
-        self._items_info = 0
-        self._selected_items_info = 0
+        self._visibility_timer = QtCore.QTimer(self)
+        self._visibility_timer.setSingleShot(True)
+        self._visibility_timer.setInterval(150)
+        self._visibility_timer.timeout.connect(self._cancel_hidden_image_requests)
 
-        self._scene.changed.connect(self._update_selected_info_text)
+        self.horizontalScrollBar().valueChanged.connect(lambda _: self._visibility_timer.start())
+        self.verticalScrollBar().valueChanged.connect(lambda _: self._visibility_timer.start())
+
+        self._items_info = self._scene.card_count
+        self._selected_items_info = self._scene.selected_count
+
+        self._scene.selectionChanged.connect(self._update_selected_info_text)
+        self._scene.content_changed.connect(self._update_selected_info_text)
 
     def _create_sort_macro_action(self, idx: int) -> QAction:
         return self._create_action(
@@ -185,8 +207,8 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
 
     def _update_selected_info_text(self, *args, **kwargs) -> None:
         previous_items = self._items_info
-        self._items_info = len(self._scene.items())
-        self._selected_items_info = len(self._scene.selectedItems())
+        self._items_info = self._scene.card_count
+        self._selected_items_info = self._scene.selected_count
         if previous_items != self._items_info or self.hasFocus():
             self._update_status()
 
@@ -202,18 +224,21 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
         self._undo_stack = stack
 
     def _paste(self):
-        mime = Context.clipboard.mimeData()
-        cards = mime.data("cards")
+        try:
+            cubeables = clipboard.from_mime(Context.clipboard.mimeData())
+        except clipboard.ClipboardFormatError as e:
+            Context.notification_message.emit(f"Can't paste: {e}")
+            return
 
-        if not cards:
+        if not cubeables:
             return
 
-        cube = PickleStrategy(Context.db).deserialize(Cube, cards)
+        Context.image_prefetcher.prefetch_cubeables(cubeables)
 
         self._undo_stack.push(
             self._scene.get_cube_modification(
-                CubeDeltaOperation(cube.cubeables.elements()),
-                QPoint() if self._last_move_event_pos is None else self.mapToScene(self._last_move_event_pos),
+                add=[PhysicalCard.from_cubeable(cubeable) for cubeable in cubeables],
+                position=QPoint() if self._last_move_event_pos is None else self.mapToScene(self._last_move_event_pos),
             )
         )
 
@@ -223,13 +248,7 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
         if not cards:
             return
 
-        stream = QtCore.QByteArray(PickleStrategy.serialize(Cube(card.cubeable for card in cards)))
-
-        mime = QtCore.QMimeData()
-
-        mime.setData("cards", stream)
-
-        Context.clipboard.setMimeData(mime)
+        Context.clipboard.setMimeData(clipboard.to_mime([card.cubeable for card in cards]))
 
     def _on_sort_selected(
         self,
@@ -258,11 +277,24 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
         dialog = SearchSelectionDialog(self)
         dialog.exec()
 
-    def _on_search_select(self, criteria: Criteria) -> None:
+    @staticmethod
+    def _matches(query: str, criteria: Criteria, printing: Printing) -> bool:
+        key = (query, printing)
+        try:
+            return _SEARCH_MATCH_CACHE[key]
+        except KeyError:
+            _SEARCH_MATCH_CACHE[key] = matches = bool(criteria.match(printing, PrintingStrategy))
+            return matches
+
+    def _on_search_select(self, query: str, criteria: Criteria) -> None:
         self._scene.set_selection(
-            item
-            for item in self._scene.items()
-            if isinstance(item.cubeable, Printing) and criteria.match(item.cubeable, PrintingStrategy)
+            list(
+                itertools.chain.from_iterable(
+                    items
+                    for cubeable, items in self._scene.cubeable_items.items()
+                    if items and isinstance(cubeable, Printing) and self._matches(query, criteria, cubeable)
+                )
+            )
         )
 
     def _create_sort_action_pair(
@@ -310,9 +342,9 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
                     if settings.DOUBLECLICK_MATCH_ON_CARDBOARDS.get_value()
                     else (lambda c: c.cubeable)
                 )
-                for card in self._scene.items():
-                    if cubeable_extractor(card) == cubeable_extractor(item):
-                        card.setSelected(True)
+                self._scene.add_selection(
+                    [card for card in self._scene.items() if cubeable_extractor(card) == cubeable_extractor(item)]
+                )
                 self._last_double_click = True
             else:
                 self.card_double_clicked.emit(item, modifiers)
@@ -388,6 +420,10 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
         flatten_all.triggered.connect(self._flatten_all_traps)
         menu.addAction(flatten_all)
 
+        export_image = QAction("Export as Image", menu)
+        export_image.triggered.connect(lambda: export_scenes((self._scene,), self))
+        menu.addAction(export_image)
+
         menu.addSeparator()
 
         item: QGraphicsItem = self.itemAt(position)
@@ -469,6 +505,7 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
             new_position = self.mapToScene(event.pos())
             position_delta = new_position - old_position
             self.translate(position_delta.x(), position_delta.y())
+            self._visibility_timer.start()
         else:
             super().wheelEvent(event)
 
@@ -535,11 +572,18 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
                 transform = self.transform()
                 x_scale, y_scale = transform.m11(), transform.m22()
                 self.translate(delta.x() / x_scale, delta.y() / y_scale)
+                self._visibility_timer.start()
 
         elif self._rubber_band.isHidden():
             item = self.itemAt(mouse_event.pos())
 
             if isinstance(item, PhysicalCard):
+                if item is not self._hovered_card:
+                    self._hovered_card = item
+                    Context.image_prefetcher.prefetch(
+                        ImageRequest(card.cubeable, back=card.back) for card in self._scene.aligner.neighbours(item, 2)
+                    )
+
                 card_mapped_position = self.mapToScene(mouse_event.pos()) - item.pos()
 
                 Context.focus_card_changed.emit(
@@ -554,6 +598,7 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
                             card_mapped_position.y(),
                         ),
                         modifiers=mouse_event.modifiers(),
+                        back=item.back,
                         release_id=item.release_id,
                     )
                 )
@@ -631,6 +676,20 @@ class CubeImageView(QtWidgets.QGraphicsView, WithActions):
 
         self._scene.add_selection(cards, modifiers)
 
+    def _cancel_hidden_image_requests(self) -> None:
+        visible = set(
+            itertools.chain.from_iterable(
+                view.items(view.viewport().rect()) for view in self._scene.views() if view.isVisible()
+            )
+        )
+        Context.image_scheduler.cancel_where(
+            lambda owner: isinstance(owner, PhysicalCard) and owner.scene() == self._scene and owner not in visible
+        )
+
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        super().hideEvent(event)
+        self._cancel_hidden_image_requests()
+
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
         super().paintEvent(event)
 
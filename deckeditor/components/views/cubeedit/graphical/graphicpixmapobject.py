@@ -3,16 +3,22 @@ import typing as t
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
+from deckeditor.models.cubes.selection import SelectionScene
 from deckeditor.utils.colors import overlay_colors
 
 
 class GraphicPixmapObject(QtWidgets.QGraphicsObject):
     INFO_TEXT_X_OFFSET, INFO_TEXT_Y_OFFSET = 30, 100
 
+    _info_text_font: t.Optional[QtGui.QFont] = None
+    _info_text_brush = QtGui.QBrush(QtGui.QColor(230, 230, 230, 180))
+    _info_text_pen = QtGui.QPen(QtGui.QColor(10, 10, 10, 230))
+
     def __init__(self, pixmap: t.Optional[QtGui.QPixmap] = None):
         super().__init__()
         self._pixmap: t.Optional[QtGui.QPixmap] = None
         self._bounding_rect = QtCore.QRectF()
+        self._render_cache: t.Optional[t.Tuple[int, QtGui.QPixmap]] = None
 
         self._selection_highlight_pen = QtGui.QPen(
             QtGui.QColor(255, 0, 0),
@@ -27,17 +33,23 @@ class GraphicPixmapObject(QtWidgets.QGraphicsObject):
         self._highlight: t.Optional[QtGui.QColor] = None
         self._info_text: t.Optional[str] = None
 
-    def set_info_text(self, text: str) -> None:
-        self._info_text = text
+    def _invalidate_render(self) -> None:
+        self._render_cache = None
         self.update()
 
+    def set_info_text(self, text: str) -> None:
+        if text != self._info_text:
+            self._info_text = text
+            self._invalidate_render()
+
     def add_highlight(self, color: QtGui.QColor) -> None:
         self._highlight = color if self._highlight is None else overlay_colors(color, self._highlight)
-        self.update()
+        self._invalidate_render()
 
     def clear_highlight(self) -> None:
-        self._highlight = None
-        self.update()
+        if self._highlight is not None:
+            self._highlight = None
+            self._invalidate_render()
 
     def pixmap(self):
         return self._pixmap
@@ -45,22 +57,40 @@ class GraphicPixmapObject(QtWidgets.QGraphicsObject):
     def set_pixmap(self, pixmap: QtGui.QPixmap):
         self._pixmap = pixmap
         self._bounding_rect = QtCore.QRectF(0, 0, pixmap.size().width(), pixmap.size().height())
+        self._render_cache = None
+
+    def itemChange(self, change: QtWidgets.QGraphicsItem.GraphicsItemChange, value: t.Any) -> t.Any:
+        if change == QtWidgets.QGraphicsItem.ItemSelectedHasChanged:
+            scene = self.scene()
+            if isinstance(scene, SelectionScene):
+                scene.item_selection_changed(self, bool(value))
+        elif change == QtWidgets.QGraphicsItem.ItemSceneChange:
+            scene = self.scene()
+            if self.isSelected() and isinstance(scene, SelectionScene):
+                scene.item_selection_changed(self, False)
+        elif change == QtWidgets.QGraphicsItem.ItemSceneHasChanged:
+            if self.isSelected() and isinstance(value, SelectionScene):
+                value.item_selection_changed(self, True)
+        return super().itemChange(change, value)
 
     def boundingRect(self) -> QtCore.QRectF:
         return self._bounding_rect
 
-    def paint(self, painter: QtGui.QPainter, options, widget=None):
-        painter.drawPixmap(self._zero_point, self._pixmap)
+    def display_pixmap(self, level_of_detail: float) -> QtGui.QPixmap:
+        return self._pixmap
 
+    def _paint_overlays(self, painter: QtGui.QPainter) -> None:
         if self._highlight is not None:
             painter.setBrush(QtGui.QBrush(self._highlight))
             painter.setPen(QtCore.Qt.NoPen)
             painter.drawRect(self._bounding_rect)
-            painter.setBrush(QtGui.QBrush())
 
         if self._info_text is not None:
-            painter.setFont(QtGui.QFont("Helvetica", 32))
-            painter.setBrush(QtGui.QBrush(QtGui.QColor(230, 230, 230, 180)))
+            if GraphicPixmapObject._info_text_font is None:
+                GraphicPixmapObject._info_text_font = QtGui.QFont("Helvetica", 32)
+
+            painter.setFont(self._info_text_font)
+            painter.setBrush(self._info_text_brush)
             painter.setPen(QtCore.Qt.NoPen)
 
             text_rect = painter.fontMetrics().boundingRect(self._info_text)
@@ -71,9 +101,43 @@ class GraphicPixmapObject(QtWidgets.QGraphicsObject):
                 )
             )
 
-            painter.setPen(QtGui.QPen(QtGui.QColor(10, 10, 10, 230)))
+            painter.setPen(self._info_text_pen)
             painter.drawText(top_corner, self._info_text)
 
+    def _rendered_pixmap(self, pixmap: QtGui.QPixmap) -> QtGui.QPixmap:
+        if (self._highlight is None and self._info_text is None) or pixmap.isNull():
+            return pixmap
+
+        key = pixmap.cacheKey()
+        if self._render_cache is not None and self._render_cache[0] == key:
+            return self._render_cache[1]
+
+        rendered = QtGui.QPixmap(pixmap)
+        painter = QtGui.QPainter(rendered)
+        painter.scale(
+            pixmap.width() / self._bounding_rect.width(),
+            pixmap.height() / self._bounding_rect.height(),
+        )
+        self._paint_overlays(painter)
+        painter.end()
+
+        self._render_cache = (key, rendered)
+        return rendered
+
+    def rendered_pixmap(self, pixmap: t.Optional[QtGui.QPixmap] = None) -> QtGui.QPixmap:
+        return self._rendered_pixmap(self._pixmap if pixmap is None else pixmap)
+
+    def paint(self, painter: QtGui.QPainter, options, widget=None):
+        pixmap = self._rendered_pixmap(
+            self.display_pixmap(
+                QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+            )
+        )
+        if pixmap.width() == self._bounding_rect.width() and pixmap.height() == self._bounding_rect.height():
+            painter.drawPixmap(self._zero_point, pixmap)
+        else:
+            painter.drawPixmap(self._bounding_rect, pixmap, QtCore.QRectF(pixmap.rect()))
+
         if self.isSelected():
             pen_width = math.ceil(self._selection_highlight_pen.width() / 2) - 1
 
@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import os
+import typing as t
+from concurrent.futures import Future
+from concurrent.futures.thread import ThreadPoolExecutor
+
+from mtgimg.interface import ImageRequest, SizeSlug
+from PyQt5 import QtCore, QtGui, QtWidgets
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QGraphicsScene
+
+from deckeditor.context.context import Context
+from deckeditor.models.cubes.physicalcard import PhysicalCard
+from deckeditor.utils.executors import PriorityClass
+from deckeditor.utils.pngwriter import EncodedRows, PngStreamWriter
+
+
+class _ExportEntry(object):
+    def __init__(self, card: PhysicalCard, transform: QtGui.QTransform):
+        self.card = card
+        self.image_request = card.image_request(SizeSlug.MEDIUM)
+        self.bounding_rect = card.boundingRect()
+        self.transform = transform
+        self.rect = transform.mapRect(self.bounding_rect)
+
+
+class _Layer(t.NamedTuple):
+    image: QtGui.QImage
+    source: QtCore.QRectF
+    target: QtCore.QRectF
+    transform: QtGui.QTransform
+
+
+class SceneImageExporter(QObject):
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(int, int)
+
+    _pixmap_loaded = pyqtSignal(int, object, object)
+    _tile_rendered = pyqtSignal(int, int, object)
+    _strip_encoded = pyqtSignal(int, object)
+    _strip_written = pyqtSignal(int)
+    _error = pyqtSignal(str)
+
+    SCENE_SPACING = 100
+    MAX_WEBP_BYTES = 512 << 20
+
+    def __init__(
+        self,
+        scenes: t.Sequence[QGraphicsScene],
+        path: str,
+        tile_size: int = 512,
+        max_workers: t.Optional[int] = None,
+        parent: t.Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self._path = path
+        self._webp = os.path.splitext(path)[1].lower() == ".webp"
+        self._tile_size = tile_size
+
+        max_workers = max_workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export_writer")
+        self._max_tiles_in_flight = 2 * max_workers
+
+        self._entries = self._collect_entries(scenes)
+        self._bounds = QtCore.QRect()
+        for entry in self._entries:
+            self._bounds = self._bounds.united(entry.rect.toAlignedRect())
+
+        self._strip_count = (self._bounds.height() + tile_size - 1) // tile_size
+        self._column_count = (self._bounds.width() + tile_size - 1) // tile_size
+
+        self._writer: t.Optional[PngStreamWriter] = None
+        self._image: t.Optional[QtGui.QImage] = None
+
+        self._strip: t.Optional[int] = None
+        self._strip_entries: t.List[_ExportEntry] = []
+        self._strip_pixmaps: t.Dict[ImageRequest, QtGui.QPixmap] = {}
+        self._pending_pixmaps = 0
+        self._tiles: t.List[t.Optional[QtGui.QImage]] = []
+        self._next_tile = 0
+        self._tiles_in_flight = 0
+        self._encoded: t.Dict[int, EncodedRows] = {}
+        self._next_write = 0
+        self._written = 0
+        self._aborted = False
+
+        self._pixmap_loaded.connect(self._on_pixmap_loaded)
+        self._tile_rendered.connect(self._on_tile_rendered)
+        self._strip_encoded.connect(self._on_strip_encoded)
+        self._strip_written.connect(self._on_strip_written)
+        self._error.connect(self._abort)
+
+    @classmethod
+    def _collect_entries(cls, scenes: t.Sequence[QGraphicsScene]) -> t.List[_ExportEntry]:
+        entries = []
+        offset = 0.0
+        for scene in scenes:
+            cards = [item for item in scene.items(QtCore.Qt.AscendingOrder) if isinstance(item, PhysicalCard)]
+            if not cards:
+                continue
+            bounds = QtCore.QRectF()
+            for card in cards:
+                bounds = bounds.united(card.sceneBoundingRect())
+            placement = QtGui.QTransform.fromTranslate(-bounds.left(), offset - bounds.top())
+            entries.extend(_ExportEntry(card, card.sceneTransform() * placement) for card in cards)
+            offset += bounds.height() + cls.SCENE_SPACING
+        return entries
+
+    @property
+    def size(self) -> QtCore.QSize:
+        return self._bounds.size()
+
+    def start(self) -> None:
+        if not self._entries:
+            self.failed.emit("Nothing to export")
+            return
+
+        if self._webp:
+            if self._bounds.width() * self._bounds.height() * 4 > self.MAX_WEBP_BYTES:
+                self.failed.emit("Image too large for WebP, export as PNG instead")
+                return
+            self._image = QtGui.QImage(self._bounds.size(), QtGui.QImage.Format_ARGB32_Premultiplied)
+            self._image.fill(QtCore.Qt.transparent)
+        else:
+            try:
+                self._writer = PngStreamWriter(self._path, self._bounds.width(), self._bounds.height())
+            except OSError as e:
+                self.failed.emit(f"Could not write {self._path}: {e}")
+                return
+
+        self._begin_strip(0)
+
+    def _strip_rect(self, strip: int) -> QtCore.QRect:
+        top = self._bounds.top() + strip * self._tile_size
+        return QtCore.QRect(
+            self._bounds.left(),
+            top,
+            self._bounds.width(),
+            min(self._tile_size, self._bounds.bottom() + 1 - top),
+        )
+
+    def _tile_rect(self, strip: int, column: int) -> QtCore.QRect:
+        strip_rect = self._strip_rect(strip)
+        left = strip_rect.left() + column * self._tile_size
+        return QtCore.QRect(
+            left,
+            strip_rect.top(),
+            min(self._tile_size, strip_rect.right() + 1 - left),
+            strip_rect.height(),
+        )
+
+    def _begin_strip(self, strip: int) -> None:
+        self._strip = strip
+        strip_rect = QtCore.QRectF(self._strip_rect(strip))
+        self._strip_entries = [entry for entry in self._entries if entry.rect.intersects(strip_rect)]
+        self._strip_pixmaps = {}
+        self._tiles = [None] * self._column_count
+        self._next_tile = 0
+
+        image_requests = {entry.image_request for entry in self._strip_entries}
+        self._pending_pixmaps = len(image_requests)
+
+        if not image_requests:
+            self._submit_tiles()
+            return
+
+        for image_request in image_requests:
+            Context.image_scheduler.load(image_request, PriorityClass.BACKGROUND).then(
+                lambda pixmap, _image_request=image_request: self._pixmap_loaded.emit(strip, _image_request, pixmap),
+                lambda _, _image_request=image_request: self._pixmap_loaded.emit(strip, _image_request, None),
+            )
+
+    def _on_pixmap_loaded(self, strip: int, image_request: ImageRequest, pixmap: t.Optional[QtGui.QPixmap]) -> None:
+        if self._aborted or strip != self._strip:
+            return
+        if pixmap is not None:
+            self._strip_pixmaps[image_request] = pixmap
+        self._pending_pixmaps -= 1
+        if not self._pending_pixmaps:
+            self._submit_tiles()
+
+    def _layers(self, tile_rect: QtCore.QRect) -> t.List[_Layer]:
+        layers = []
+        tile_rect = QtCore.QRectF(tile_rect)
+        for entry in self._strip_entries:
+            if not entry.rect.intersects(tile_rect):
+                continue
+
+            pixmap = self._strip_pixmaps.get(entry.image_request) or entry.card.pixmap()
+            if pixmap is None or pixmap.isNull():
+                continue
+            pixmap = entry.card.rendered_pixmap(pixmap)
+
+            inverted, _ = entry.transform.inverted()
+            target = inverted.mapRect(tile_rect).intersected(entry.bounding_rect)
+            x_scale = pixmap.width() / entry.bounding_rect.width()
+            y_scale = pixmap.height() / entry.bounding_rect.height()
+            source = QtCore.QRectF(
+                target.left() * x_scale,
+                target.top() * y_scale,
+                target.width() * x_scale,
+                target.height() * y_scale,
+            ).toAlignedRect()
+
+            layers.append(
+                _Layer(
+                    pixmap.copy(source).toImage(),
+                    QtCore.QRectF(0, 0, source.width(), source.height()),
+                    QtCore.QRectF(
+                        source.left() / x_scale,
+                        source.top() / y_scale,
+                        source.width() / x_scale,
+                        source.height() / y_scale,
+                    ),
+                    entry.transform,
+                )
+            )
+        return layers
+
+    @staticmethod
+    def _render_tile(tile_rect: QtCore.QRect, layers: t.List[_Layer]) -> QtGui.QImage:
+        image = QtGui.QImage(tile_rect.size(), QtGui.QImage.Format_ARGB32_Premultiplied)
+        image.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(image)
+        try:
+            painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+            offset = QtGui.QTransform.fromTranslate(-tile_rect.left(), -tile_rect.top())
+            for layer in layers:
+                painter.setTransform(layer.transform * offset)
+                painter.drawImage(layer.target, layer.image, layer.source)
+        finally:
+            painter.end()
+        return image
+
+    def _submit_tiles(self) -> None:
+        strip = self._strip
+        while self._next_tile < self._column_count and self._tiles_in_flight < self._max_tiles_in_flight:
+            column = self._next_tile
+            self._next_tile += 1
+            tile_rect = self._tile_rect(strip, column)
+            self._tiles_in_flight += 1
+            self._executor.submit(self._render_tile, tile_rect, self._layers(tile_rect)).add_done_callback(
+                lambda future, _column=column: self._on_future_done(
+                    future, lambda image: self._tile_rendered.emit(strip, _column, image)
+                )
+            )
+
+    def _on_future_done(self, future: Future, callback: t.Callable[[t.Any], None]) -> None:
+        exception = future.exception()
+        if exception is not None:
+            self._error.emit(str(exception))
+        else:
+            callback(future.result())
+
+    def _on_tile_rendered(self, strip: int, column: int, image: QtGui.QImage) -> None:
+        self._tiles_in_flight -= 1
+        if self._aborted or strip != self._strip:
+            return
+
+        self._tiles[column] = image
+        if self._next_tile < self._column_count:
+            self._submit_tiles()
+            return
+        if any(tile is None for tile in self._tiles):
+            return
+
+        tiles = self._tiles
+        if self._image is not None:
+            painter = QtGui.QPainter(self._image)
+            strip_rect = self._strip_rect(strip)
+            for column, tile in enumerate(tiles):
+                painter.drawImage(
+                    column * self._tile_size,
+                    strip_rect.top() - self._bounds.top(),
+                    tile,
+                )
+            painter.end()
+            self._on_strip_written(strip)
+        else:
+            self._executor.submit(self._writer.encode, tiles).add_done_callback(
+                lambda future: self._on_future_done(future, lambda encoded: self._strip_encoded.emit(strip, encoded))
+            )
+
+        if strip + 1 < self._strip_count:
+            self._begin_strip(strip + 1)
+        else:
+            self._strip = None
+            self._strip_entries = []
+            self._strip_pixmaps = {}
+
+    def _on_strip_encoded(self, strip: int, encoded: EncodedRows) -> None:
+        if self._aborted:
+            return
+        self._encoded[strip] = encoded
+        while self._next_write in self._encoded:
+            _strip = self._next_write
+            self._next_write += 1
+            self._writer_executor.submit(
+                self._writer.write,
+                self._encoded.pop(_strip),
+                self._strip_rect(_strip).height(),
+            ).add_done_callback(
+                lambda future, _strip=_strip: self._on_future_done(future, lambda _: self._strip_written.emit(_strip))
+            )
+
+    def _on_strip_written(self, strip: int) -> None:
+        if self._aborted:
+            return
+
+        self._written += 1
+        self.progress.emit(self._written, self._strip_count)
+
+        if self._written < self._strip_count:
+            return
+
+        try:
+            if self._image is not None:
+                if not self._image.save(self._path, "webp", 90):
+                    raise OSError("could not encode image")
+            else:
+                self._writer.close()
+        except (OSError, ValueError) as e:
+            self._abort(str(e))
+            return
+
+        self._shutdown()
+        self.finished.emit(self._path)
+
+    def _abort(self, message: str) -> None:
+        if self._aborted:
+            return
+        self._aborted = True
+        try:
+            if self._writer is not None:
+                self._writer_executor.submit(self._writer.abort)
+            self._shutdown()
+        finally:
+            self.failed.emit(message)
+
+    def _shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._writer_executor.shutdown(wait=False)
+        self._image = None
+
+
+_running_exports: t.Set[SceneImageExporter] = set()
+
+
+def export_scenes(scenes: t.Sequence[QGraphicsScene], parent: t.Optional[QtWidgets.QWidget] = None) -> None:
+    path, _ = QtWidgets.QFileDialog.getSaveFileName(
+        parent,
+        "Export as Image",
+        "",
+        "PNG (*.png);;WebP (*.webp)",
+    )
+
+    if not path:
+        return
+
+    if os.path.splitext(path)[1].lower() not in (".png", ".webp"):
+        path += ".png"
+
+    exporter = SceneImageExporter(scenes, path)
+    _running_exports.add(exporter)
+
+    def _finished(_path: str) -> None:
+        _running_exports.discard(exporter)
+        Context.notification_message.emit(f"Exported {os.path.basename(_path)}")
+
+    def _failed(message: str) -> None:
+        _running_exports.discard(exporter)
+        Context.notification_message.emit(f"Export failed: {message}")
+
+    exporter.finished.connect(_finished)
+    exporter.failed.connect(_failed)
+    exporter.start()
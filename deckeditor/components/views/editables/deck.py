@@ -114,8 +114,9 @@ class DeckView(MultiCubesView):
         }
 
     @classmethod
-    def load(cls, state: t.Any, undo_stack: QUndoStack) -> DeckView:
-        deck_model = DeckModel.load(state["deck_model"])
+    def load(cls, state: t.Any, undo_stack: QUndoStack, deck_model: t.Optional[DeckModel] = None) -> DeckView:
+        if deck_model is None:
+            deck_model = DeckModel.load(state["deck_model"])
         deck_view = DeckView(
             deck_model,
             maindeck_cube_view=CubeView.load(
@@ -142,8 +142,9 @@ class PoolView(MultiCubesView):
         }
 
     @classmethod
-    def load(cls, state: t.Any, undo_stack: QUndoStack) -> PoolView:
-        pool_model = PoolModel.load(state["pool_model"])
+    def load(cls, state: t.Any, undo_stack: QUndoStack, pool_model: t.Optional[PoolModel] = None) -> PoolView:
+        if pool_model is None:
+            pool_model = PoolModel.load(state["pool_model"])
         pool_view = cls(
             pool_model,
             maindeck_cube_view=CubeView.load(
@@ -1,3 +1,4 @@
+import itertools
 import threading
 import typing as t
 from enum import Enum
@@ -6,6 +7,7 @@ from cubeclient.endpoints import AsyncNativeApiClient
 from cubeclient.images import ImageClient
 from magiccube.collections.cube import Cube
 from magiccube.collections.infinites import Infinites
+from mtgimg.interface import ImageRequest
 from mtgimg.load import Loader as ImageLoader
 from mtgorp.db.database import CardDatabase
 from mtgorp.db.load import PickleLoader, SqlLoader
@@ -23,10 +25,28 @@ from PyQt5.QtWidgets import (
 )
 
 from deckeditor.components.cardview.focuscard import FocusEvent
+from deckeditor.components.cardview.focusdispatch import FocusDispatcher
 from deckeditor.components.editables.editor import Editor
 from deckeditor.context.sql import SqlContext
+from deckeditor.paths import IMAGE_CACHE_PATH
 from deckeditor.sorting.custom import CustomSortMap
-from deckeditor.utils.executors import LIFOExecutor
+from deckeditor.utils.executors import PriorityExecutor
+from deckeditor.utils.imagescheduler import ImageScheduler
+from deckeditor.utils.pixmapcache import (
+    CachingPixmapLoader,
+    DiskImageCache,
+    PixmapCache,
+)
+from deckeditor.utils.pixmapupload import PixmapUploader
+from deckeditor.utils.prefetch import ImagePrefetcher
+from deckeditor.utils.remoteimages import BatchingImageClient
+
+
+def _find_image_request(args: t.Tuple[t.Any, ...], kwargs: t.Mapping[str, t.Any]) -> t.Optional[ImageRequest]:
+    for value in itertools.chain(args, kwargs.values()):
+        if isinstance(value, ImageRequest):
+            return value
+    return None
 
 
 class DbType(Enum):
@@ -39,7 +59,10 @@ class _Context(QObject):
     debug: bool = False
 
     settings: QtCore.QSettings
-    pixmap_loader: PixmapLoader
+    pixmap_uploader: PixmapUploader
+    pixmap_loader: CachingPixmapLoader
+    image_scheduler: ImageScheduler
+    image_prefetcher: ImagePrefetcher
 
     db: CardDatabase
 
@@ -65,6 +88,7 @@ class _Context(QObject):
     focus_card_changed = pyqtSignal(FocusEvent)
     focus_freeze_changed = pyqtSignal(bool)
     focus_card_frozen: bool = False
+    focus_dispatcher: FocusDispatcher
 
     focus_scene_changed = pyqtSignal(QGraphicsScene)
 
@@ -95,19 +119,7 @@ class _Context(QObject):
         cls.no_ssl_verify = no_ssl_verify
         cls.compiled = compiled
 
-        cls.settings = QtCore.QSettings("lost-world", "Embargo Edit")
-
-        if db_type == DbType.DEFAULT:
-            if cls.settings.value("sql_db", False, bool):
-                SqlContext.init(cls.settings, echo=echo_sql)
-                cls.db = SqlLoader(SqlContext.engine, SqlContext.scoped_session).load()
-            else:
-                cls.db = PickleLoader().load()
-        elif db_type == DbType.SQL:
-            SqlContext.init(cls.settings, echo=echo_sql)
-            cls.db = SqlLoader(SqlContext.engine, SqlContext.scoped_session).load()
-        else:
-            cls.db = PickleLoader().load()
+        cls.init_headless(db_type, echo_sql)
 
         cls.application = application
 
@@ -122,30 +134,106 @@ class _Context(QObject):
 
         use_disk_with_remote = cls.settings.value("allow_disk_with_local_images", False, bool)
 
-        cls.pixmap_loader = PixmapLoader(
-            image_loader=ImageClient(
-                cls.settings.value("remote_image_url", "prohunterdogkeeper.dk", str),
-                executor=LIFOExecutor(max_workers=16),
-                imageables_executor=LIFOExecutor(max_workers=8),
+        printing_executor = PriorityExecutor(
+            max_workers=16,
+            thread_name_prefix="printing_images",
+            min_workers=4,
+            adaptive=True,
+            key_function=_find_image_request,
+        )
+        imageable_executor = PriorityExecutor(
+            max_workers=8,
+            thread_name_prefix="imageable_images",
+            min_workers=2,
+            adaptive=True,
+            key_function=_find_image_request,
+        )
+
+        disk_executor = PriorityExecutor(
+            max_workers=4,
+            thread_name_prefix="image_cache",
+            key_function=_find_image_request,
+        )
+
+        cls.pixmap_uploader = PixmapUploader()
+
+        if cls.settings.value("remote_images", False, bool):
+            remote_image_url = cls.settings.value("remote_image_url", "prohunterdogkeeper.dk", str)
+            image_loader = ImageClient(
+                remote_image_url,
+                executor=printing_executor,
+                imageables_executor=imageable_executor,
                 use_scryfall_when_available=True,
                 image_cache_size=None,
                 allow_save_to_disk=use_disk_with_remote,
                 allow_load_from_disk=use_disk_with_remote,
                 allow_local_fallback=cls.settings.value("allow_local_image_fallback", True, bool),
             )
-            if cls.settings.value("remote_images", False, bool)
-            else ImageLoader(
-                printing_executor=LIFOExecutor(max_workers=16),
-                imageable_executor=LIFOExecutor(max_workers=8),
+            if cls.settings.value("remote_image_batching", False, bool):
+                image_loader = BatchingImageClient(
+                    image_loader,
+                    remote_image_url,
+                    verify_ssl=not cls.no_ssl_verify,
+                )
+        else:
+            image_loader = ImageLoader(
+                printing_executor=printing_executor,
+                imageable_executor=imageable_executor,
                 image_cache_size=None,
+            )
+
+        cls.pixmap_loader = CachingPixmapLoader(
+            PixmapLoader(
+                image_loader=image_loader,
+                image_cache_size=cls.settings.value("image_cache_size", 64, int),
+            ),
+            image_loader=image_loader,
+            memory_cache=PixmapCache.from_total_budget(cls.settings.value("image_memory_cache_size", 512, int) << 20),
+            executor=disk_executor,
+            uploader=cls.pixmap_uploader,
+            disk_cache=(
+                DiskImageCache(IMAGE_CACHE_PATH, cls.settings.value("image_disk_cache_size", 1024, int) << 20)
+                if cls.settings.value("image_disk_cache", True, bool)
+                else None
             ),
-            image_cache_size=cls.settings.value("image_cache_size", 64, int),
         )
+        cls.image_scheduler = ImageScheduler(
+            cls.pixmap_loader,
+            (disk_executor, printing_executor, imageable_executor),
+        )
+        if debug:
+            cls.image_stats_timer = QtCore.QTimer()
+            cls.image_stats_timer.timeout.connect(cls.image_scheduler.log_stats)
+            cls.image_stats_timer.start(10000)
+        cls.image_prefetcher = ImagePrefetcher(
+            cls.image_scheduler,
+            cls.pixmap_loader.memory_cache,
+            enabled=lambda: cls.settings.value("image_prefetch", True, bool),
+        )
+
+        cls.undo_group = QUndoGroup()
+
+        cls.focus_dispatcher = FocusDispatcher()
+
+    @classmethod
+    def init_headless(cls, db_type: DbType = DbType.DEFAULT, echo_sql: bool = False) -> None:
+        cls.settings = QtCore.QSettings("lost-world", "Embargo Edit")
+
+        if db_type == DbType.DEFAULT:
+            if cls.settings.value("sql_db", False, bool):
+                SqlContext.init(cls.settings, echo=echo_sql)
+                cls.db = SqlLoader(SqlContext.engine, SqlContext.scoped_session).load()
+            else:
+                cls.db = PickleLoader().load()
+        elif db_type == DbType.SQL:
+            SqlContext.init(cls.settings, echo=echo_sql)
+            cls.db = SqlLoader(SqlContext.engine, SqlContext.scoped_session).load()
+        else:
+            cls.db = PickleLoader().load()
 
         cls.cardboard_names = sorted(cls.db.cardboards.keys())
 
         cls.search_pattern_parser = SearchParser(cls.db)
-        cls.undo_group = QUndoGroup()
 
         cls.sort_map = CustomSortMap.empty()
 
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import typing as t
+from concurrent.futures import ProcessPoolExecutor
+
+from magiccube.collections.cube import Cube
+from mtgorp.models.serilization.serializeable import SerializationException
+
+from deckeditor import values
+from deckeditor.components.settings import settings
+from deckeditor.context.context import Context, DbType
+from deckeditor.models.cubes.alignment.init import init_aligners
+from deckeditor.models.deck import Deck, Pool, TabModel
+from deckeditor.serialization.tabfiles import (
+    EMBARGO_DECK_EXTENSION,
+    EMBARGO_POOL_EXTENSION,
+    LegacyTabFileError,
+    TabFileError,
+    read_tab_state,
+    scenes_as_deck,
+    scenes_as_pool,
+    write_tab_state,
+)
+from deckeditor.serialization.tabmodelserializer import (
+    TabModelSerializer,
+    init_deck_serializers,
+)
+from deckeditor.store import EDB, models
+
+
+EMBARGO_EXTENSIONS = {EMBARGO_DECK_EXTENSION: Deck, EMBARGO_POOL_EXTENSION: Pool}
+
+CONVERSION_ERRORS = (OSError, TabFileError, SerializationException, KeyError, ValueError)
+
+
+class ConversionJob(t.NamedTuple):
+    source: str
+    destination: t.Optional[str]
+    target_extension: str
+    target_type: t.Type[TabModel]
+
+
+class ConversionResult(t.NamedTuple):
+    source: str
+    error: t.Optional[str]
+    skipped: t.Optional[str] = None
+
+
+_initialized = False
+
+
+def _init_worker(db_type: DbType, write_tabs: bool = False) -> None:
+    global _initialized
+    if _initialized:
+        return
+    Context.init_headless(db_type)
+    init_deck_serializers()
+    if write_tabs:
+        init_aligners()
+        EDB.init()
+        models.create(EDB.engine)
+    _initialized = True
+
+
+def _extension(path: str) -> str:
+    return os.path.splitext(path)[-1][1:]
+
+
+def get_serializer(extension: str, tab_model_type: t.Type[TabModel]) -> t.Type[TabModelSerializer]:
+    try:
+        return TabModelSerializer.extension_to_serializer[(extension, tab_model_type)]
+    except KeyError:
+        raise TabFileError(f'unsupported {tab_model_type.__name__.lower()} format "{extension}"')
+
+
+def as_type(tab_model: TabModel, target_type: t.Type[TabModel]) -> TabModel:
+    if isinstance(tab_model, target_type):
+        return tab_model
+    if target_type == Pool:
+        return Pool(tab_model.maindeck + tab_model.sideboard)
+    return Deck(tab_model, Cube())
+
+
+def read_tab_model(path: str, target_type: t.Type[TabModel]) -> TabModel:
+    extension = _extension(path)
+
+    if extension.lower() in EMBARGO_EXTENSIONS:
+        with open(path, "rb") as f:
+            scenes = read_tab_state(f.read())
+        return scenes_as_pool(scenes) if target_type == Pool else scenes_as_deck(scenes)
+
+    with open(path, "r") as f:
+        return parse_tab_model(f.read(), extension, target_type)
+
+
+def parse_tab_model(content: str, extension: str, target_type: t.Type[TabModel]) -> TabModel:
+    source_type = target_type
+    if (extension, source_type) not in TabModelSerializer.extension_to_serializer:
+        source_type = Deck if target_type == Pool else Pool
+
+    return as_type(get_serializer(extension, source_type).deserialize(content), target_type)
+
+
+def serialize_tab_model(tab_model: TabModel, extension: str, target_type: t.Type[TabModel]) -> t.Union[str, bytes]:
+    if extension.lower() in EMBARGO_EXTENSIONS:
+        return write_tab_state(tab_model, sort=settings.AUTO_SORT_NON_EMB_FILES_ON_OPEN.get_value())
+    return get_serializer(extension, target_type).serialize(tab_model)
+
+
+def process(job: ConversionJob) -> ConversionResult:
+    try:
+        tab_model = read_tab_model(job.source, job.target_type)
+        if job.destination is not None:
+            content = serialize_tab_model(tab_model, job.target_extension, job.target_type)
+            os.makedirs(os.path.dirname(job.destination) or ".", exist_ok=True)
+            with open(job.destination, "wb" if isinstance(content, bytes) else "w") as f:
+                f.write(content)
+    except LegacyTabFileError as e:
+        return ConversionResult(job.source, None, str(e))
+    except CONVERSION_ERRORS as e:
+        return ConversionResult(job.source, f"{e.__class__.__name__}: {e}")
+    return ConversionResult(job.source, None)
+
+
+def _find_files(paths: t.Iterable[str]) -> t.Iterator[t.Tuple[str, str]]:
+    supported = {extension.lower() for extension, _ in TabModelSerializer.extension_to_serializer} | set(
+        EMBARGO_EXTENSIONS
+    )
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, file_names in os.walk(path):
+                for file_name in sorted(file_names):
+                    if _extension(file_name).lower() in supported:
+                        file_path = os.path.join(directory, file_name)
+                        yield file_path, os.path.relpath(file_path, path)
+        else:
+            yield path, os.path.basename(path)
+
+
+def create_jobs(
+    paths: t.Iterable[str],
+    output: t.Optional[str],
+    target_extension: t.Optional[str],
+    pool: bool,
+) -> t.List[ConversionJob]:
+    jobs = []
+    for source, relative_path in _find_files(paths):
+        extension = target_extension or _extension(source)
+        target_type = Pool if pool else Deck
+        if extension.lower() in EMBARGO_EXTENSIONS:
+            target_type = EMBARGO_EXTENSIONS[extension.lower()]
+        elif (extension, target_type) not in TabModelSerializer.extension_to_serializer:
+            target_type = Deck if pool else Pool
+        jobs.append(
+            ConversionJob(
+                source,
+                None if output is None else os.path.join(output, os.path.splitext(relative_path)[0] + "." + extension),
+                extension,
+                target_type,
+            )
+        )
+    return jobs
+
+
+def run():
+    arg_parser = argparse.ArgumentParser(description="Convert, validate and normalize decks and pools")
+    arg_parser.add_argument("paths", metavar="P", type=str, nargs="+", help="files and directories to process")
+    arg_parser.add_argument(
+        "-t",
+        "--to",
+        type=str,
+        help="target format extension, defaults to the format of each source file",
+    )
+    arg_parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="output directory, directory structure of the sources is mirrored. If omitted files are only validated",
+    )
+    arg_parser.add_argument(
+        "-p",
+        "--pool",
+        action="store_true",
+        help="process files as pools rather than decks",
+    )
+    arg_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="amount of worker processes",
+    )
+    arg_parser.add_argument(
+        "--db-type",
+        type=str,
+        choices=["sql", "pickle", "default"],
+        default="default",
+        help='what type of db to use. "default" means use the one defined in application settings',
+    )
+    arg_parser.add_argument(
+        "-l",
+        "--log-level",
+        action="store",
+        help="logging level",
+        default="warning",
+        choices=values.LOGGING_LEVEL_MAP.keys(),
+    )
+
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(
+        format="%(levelname)s %(message)s",
+        level=values.LOGGING_LEVEL_MAP[args.log_level],
+        stream=sys.stderr,
+    )
+
+    db_type = DbType(args.db_type)
+    jobs = create_jobs(args.paths, args.output, args.to, args.pool)
+    write_tabs = args.output is not None and any(job.target_extension.lower() in EMBARGO_EXTENSIONS for job in jobs)
+    _init_worker(db_type, write_tabs)
+
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(
+            max_workers=args.jobs,
+            initializer=_init_worker,
+            initargs=(db_type, write_tabs),
+        ) as executor:
+            results = executor.map(process, jobs, chunksize=max(1, len(jobs) // (args.jobs * 8)))
+            failed, skipped = _report(results)
+    else:
+        failed, skipped = _report(map(process, jobs))
+
+    summary = f"{len(jobs) - failed - len(skipped)} of {len(jobs)} files {'converted' if args.output else 'valid'}"
+    if skipped:
+        summary += f", {len(skipped)} skipped:"
+    print(summary)
+    for source, reason in skipped:
+        print(f"  {source}: {reason}")
+
+    sys.exit(1 if failed else 0)
+
+
+def _report(results: t.Iterable[ConversionResult]) -> t.Tuple[int, t.List[t.Tuple[str, str]]]:
+    failed = 0
+    skipped = []
+    for result in results:
+        if result.error is not None:
+            failed += 1
+            print(f"{result.source}: {result.error}", file=sys.stderr)
+        elif result.skipped is not None:
+            skipped.append((result.source, result.skipped))
+    return failed, skipped
+
+
+if __name__ == "__main__":
+    run()
@@ -123,7 +123,9 @@ class MainWindow(QMainWindow, WithActions):
         self.layout().setContentsMargins(0, 0, 0, 0)
 
         self._printing_view = CubeableView(self)
-        Context.focus_card_changed.connect(self._printing_view.new_cubeable)
+        Context.focus_card_changed.connect(Context.focus_dispatcher.submit)
+        Context.focus_freeze_changed.connect(lambda _: Context.focus_dispatcher.reset())
+        Context.focus_dispatcher.focus_changed.connect(self._printing_view.new_cubeable)
 
         self._login_status_label = QtWidgets.QLabel("")
         LOGIN_CONTROLLER.login_success.connect(lambda u, h: self._login_status_label.setText(f"{u.username}@{h}"))
@@ -207,6 +209,7 @@ class MainWindow(QMainWindow, WithActions):
                     ("Save", "Ctrl+S", self._save),
                     ("Save As", "Ctrl+Shift+S", self._save_as),
                     ("Export Deck", "Ctrl+Shift+E", self._export_deck),
+                    ("Export as Image", None, self._main_view.editables_tabs.export_image),
                     ("Close Tab", "Ctrl+W", self._close_tab),
                     "line",
                     ("Exit", "Ctrl+Q", self.close),
@@ -417,10 +420,10 @@ class MainWindow(QMainWindow, WithActions):
         except FileSaveException:
             Context.notification_message.emit("Invalid extension")
 
-    def save_state(self):
+    def save_state(self, wait: bool = True):
         Context.settings.setValue("geometry", self.saveGeometry())
         Context.settings.setValue("window_state", self.saveState(0))
-        self._main_view.editables_tabs.save_session()
+        self._main_view.editables_tabs.save_session(wait=wait)
         Context.sort_map.save()
 
     def _load_state(self):
@@ -571,6 +574,13 @@ def run():
         default="localhost",
         help="server host",
     )
+    arg_parser.add_argument(
+        "--server-workers",
+        metavar="W",
+        type=int,
+        default=4,
+        help="amount of worker threads handling server requests",
+    )
     arg_parser.add_argument("files", metavar="F", type=str, nargs="*", help="paths of files to open")
 
     args = arg_parser.parse_args()
@@ -641,14 +651,14 @@ def run():
     sys.excepthook = _get_exception_hook(main_window)
 
     if not args.no_server:
-        Context.embargo_server = EmbargoServer(host=args.host, port=args.port)
+        Context.embargo_server = EmbargoServer(host=args.host, port=args.port, workers=args.server_workers)
         Context.embargo_server.start()
 
     main_window.showMaximized()
 
     if not args.multi_instance:
         save_state_timer = QtCore.QTimer()
-        save_state_timer.timeout.connect(main_window.save_state)
+        save_state_timer.timeout.connect(lambda: main_window.save_state(wait=False))
         save_state_timer.start(1000 * 60 * 3)
 
     if settings.AUTO_LOGIN.get_value():
@@ -40,6 +40,8 @@ class Aligner(ABC):
 
     schema: Schema = Schema()
 
+    layout_tracker: t.Optional[t.Callable[[int, int, int], None]] = None
+
     def __init__(self, scene: SelectionScene, **kwargs):
         self._scene = scene
 
@@ -59,7 +61,14 @@ class Aligner(ABC):
         return aligner
 
     def __reduce__(self):
-        return (self._inflate, (self.__class__, {k: v for k, v in self.__dict__.items() if not k == "_scene"}))
+        return (
+            self._inflate,
+            (self.__class__, {k: v for k, v in self.__dict__.items() if k not in ("_scene", "layout_tracker")}),
+        )
+
+    def track_layout(self, x: int, y: int, from_index: int = 0) -> None:
+        if self.layout_tracker is not None:
+            self.layout_tracker(x, y, from_index)
 
     @property
     def supports_sort_orientation(self) -> bool:
@@ -103,5 +112,8 @@ class Aligner(ABC):
     ) -> QUndoCommand:
         pass
 
+    def neighbours(self, card: SceneCard, distance: int = 1) -> t.Sequence[SceneCard]:
+        return ()
+
     def draw_background(self, painter: QtGui.QPainter, rect: QtCore.QRectF) -> None:
         pass
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import copy
-import itertools
 import typing as t
 from abc import abstractmethod
 
@@ -14,7 +13,8 @@ from PyQt5.QtWidgets import QInputDialog, QUndoCommand, QUndoStack
 from deckeditor.models.cubes.alignment.aligner import Aligner, AlignmentDrop
 from deckeditor.models.cubes.physicalcard import PhysicalCard
 from deckeditor.models.cubes.selection import SelectionScene
-from deckeditor.sorting.sorting import SortIdentity, SortMacro, SortSpecification
+from deckeditor.sorting import sorting
+from deckeditor.sorting.sorting import SortMacro, SortSpecification
 from deckeditor.values import IMAGE_HEIGHT, IMAGE_WIDTH
 
 
@@ -138,17 +138,9 @@ class GridSort(QUndoCommand):
         super().__init__("Sort")
 
     def redo(self) -> None:
-        sorted_cards = sorted(
-            self._cards,
-            key=lambda card: SortIdentity.for_card(card, self._specifications),
+        self._grid.cards[:] = sorting.sort_flat(
+            self._original_order, self._cards, self._specifications, self._in_place
         )
-        unsorted_cards = [card for card in self._original_order if card not in self._cards]
-        if not self._in_place:
-            self._grid.cards[:] = sorted_cards + unsorted_cards
-        else:
-            self._grid.cards[:] = unsorted_cards
-            idx = next(idx for idx, card in enumerate(self._original_order) if card in self._cards)
-            self._grid.cards[idx:idx] = sorted_cards
         self._grid.realign()
 
     def undo(self) -> None:
@@ -217,6 +209,14 @@ class GridAligner(Aligner):
             items,
         )
 
+    def neighbours(self, card: PhysicalCard, distance: int = 1) -> t.Sequence[PhysicalCard]:
+        try:
+            index = self._cards.index(card)
+        except ValueError:
+            return ()
+
+        return self._cards[max(index - distance, 0) : index] + self._cards[index + 1 : index + distance + 1]
+
     def get_position_at_index(self, idx: int) -> QPoint:
         return QPoint(
             max(
@@ -240,6 +240,7 @@ class GridAligner(Aligner):
 
     def realign(self, from_index: int = 0) -> None:
         from_index = max(from_index, 0)
+        self.track_layout(0, 0, from_index)
         for card, idx in zip(self._cards[from_index:], range(from_index, len(self._cards))):
             card.setPos(self.get_position_at_index(idx))
 
@@ -259,11 +260,7 @@ class GridAligner(Aligner):
     def sort(self, sort_macro: SortMacro, cards: t.Sequence[PhysicalCard], in_place: bool = False) -> QUndoCommand:
         return GridSort(
             grid=self,
-            specifications=list(
-                itertools.chain(
-                    *(specifications for dimension, specifications in sort_macro.dimension_specifications_map)
-                )
-            ),
+            specifications=sorting.flat_specifications(sort_macro),
             cards=cards,
             original_order=copy.copy(self._cards),
             in_place=in_place,
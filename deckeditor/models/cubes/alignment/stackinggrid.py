@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import math
+import itertools
 import typing as t
 from abc import ABC, abstractmethod
 from collections import defaultdict
@@ -18,13 +18,9 @@ from deckeditor.models.cubes.alignment.aligner import (
 )
 from deckeditor.models.cubes.physicalcard import PhysicalCard
 from deckeditor.models.cubes.selection import SelectionScene
+from deckeditor.models.headless.grid import HeadlessGrid
 from deckeditor.sorting import sorting
-from deckeditor.sorting.sorting import (
-    DimensionContinuity,
-    SortDimension,
-    SortIdentity,
-    SortMacro,
-)
+from deckeditor.sorting.sorting import SortDimension, SortMacro
 from deckeditor.store.models import SortSpecification
 from deckeditor.utils.math import minmax
 from deckeditor.utils.undo import CommandPackage
@@ -148,6 +144,7 @@ class CardStacker(ABC):
         if not external:
             self._requested_size = self.calculate_requested_size()
             self._aligner.request_space(self, *self.requested_size)
+            self._aligner.track_layout(self.x_index, self.y_index)
 
         self._stack()
 
@@ -213,6 +210,7 @@ class CardStacker(ABC):
         for card in self._cards:
             self._aligner.remove_card(card)
         self._cards.clear()
+        self._aligner.track_layout(self.x_index, self.y_index)
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({id(self)})"
@@ -306,10 +304,7 @@ class SortStacker(QUndoCommand):
         if not self._original_order:
             self._original_order[:] = self._stacker.cards
 
-        self._stacker.cards[:] = sorted(
-            self._stacker.cards,
-            key=lambda card: SortIdentity.for_card(card, self._specifications),
-        )
+        self._stacker.cards[:] = sorting.sort_cards(self._stacker.cards, self._specifications)
         self._stacker.update()
 
     def undo(self) -> None:
@@ -331,10 +326,36 @@ class SortAllStackers(QUndoCommand):
                 self._original_orders[stacker][:] = stacker.cards
 
         for stacker in self._grid.stacker_map.stackers:
-            stacker.cards[:] = sorted(
-                stacker.cards,
-                key=lambda card: SortIdentity.for_card(card, self._specifications),
-            )
+            stacker.cards[:] = sorting.sort_cards(stacker.cards, self._specifications)
+            stacker.update()
+
+    def undo(self) -> None:
+        for stacker, cards in self._original_orders.items():
+            stacker.cards[:] = cards
+            stacker.update()
+
+
+class SortCardsInStackers(QUndoCommand):
+    def __init__(
+        self, grid: StackingGrid, cards: t.Sequence[PhysicalCard], specifications: t.Sequence[SortSpecification]
+    ):
+        self._grid = grid
+        self._cards = cards
+        self._specifications = specifications
+        super().__init__("Sort stackers")
+
+        self._original_orders: t.Dict[CardStacker, t.List[PhysicalCard]] = {}
+
+    def redo(self) -> None:
+        if not self._original_orders:
+            for card in self._cards:
+                stacker = self._grid.get_card_info(card).card_stacker
+                if stacker not in self._original_orders:
+                    self._original_orders[stacker] = list(stacker.cards)
+
+        cards = set(self._cards)
+        for stacker, original_order in self._original_orders.items():
+            stacker.cards[:] = sorting.sort_within(original_order, cards, self._specifications)
             stacker.update()
 
     def undo(self) -> None:
@@ -344,6 +365,8 @@ class SortAllStackers(QUndoCommand):
 
 
 class ContinuousSort(QUndoCommand):
+    grouped = False
+
     def __init__(
         self,
         grid: StackingGrid,
@@ -371,43 +394,25 @@ class ContinuousSort(QUndoCommand):
             self._stackers[info.card_stacker].append((info.position, card))
             self._card_infos[card] = (info.card_stacker, info.position)
 
-    def _sorted_cards(self) -> t.List[PhysicalCard]:
-        return sorted(
-            self._card_infos.keys(),
-            key=lambda card: SortIdentity.for_card(card, self._specifications),
-        )
-
     @property
-    def _cards_separated(self) -> t.Generator[t.Tuple[PhysicalCard, int]]:
-        sorted_cards = self._sorted_cards()
-
-        parts = (
+    def _parts(self) -> int:
+        return (
             self._grid.stacker_map.row_length
             if self._orientation == QtCore.Qt.Horizontal
             else self._grid.stacker_map.column_height
         )
 
-        part = math.ceil(len(sorted_cards) / parts)
-
-        sorted_cards_iter = sorted_cards.__iter__()
-
-        try:
-            for i in range(parts):
-                for n in range(part):
-                    yield next(sorted_cards_iter), i
-        except StopIteration:
-            return
-
     def _card_sorted_indexes(self) -> t.Iterator[t.Tuple[PhysicalCard, int, int]]:
-        info_extractor = (
-            (lambda _i, info: (_i + self._smallest_index, info[0].index[1]))
-            if self._orientation == QtCore.Qt.Horizontal
-            else (lambda _i, info: (info[0].index[0], _i + self._smallest_index))
+        return sorting.partition_indexes(
+            self._card_infos.keys(),
+            {card: info[0].index for card, info in self._card_infos.items()},
+            self._specifications,
+            horizontal=self._orientation == QtCore.Qt.Horizontal,
+            grouped=self.grouped,
+            parts=self._parts,
+            offset=self._smallest_index,
         )
 
-        for card, i in self._cards_separated:
-            yield card, *info_extractor(i, self._card_infos[card])
-
     def _make_sorted_stackers(self) -> None:
         for card, x, y in self._card_sorted_indexes():
             self._sorted_stackers[self._grid.get_card_stacker_at_index(x, y)].append(card)
@@ -446,41 +451,7 @@ class ContinuousSort(QUndoCommand):
 
 
 class GroupedSort(ContinuousSort):
-    @property
-    def _cards_separated(self) -> t.Iterable[t.Tuple[PhysicalCard, int]]:
-        parts = (
-            self._grid.stacker_map.row_length
-            if self._orientation == QtCore.Qt.Horizontal
-            else self._grid.stacker_map.column_height
-        )
-
-        value_map = defaultdict(list)
-
-        for card in self._card_infos.keys():
-            value_map[SortIdentity.for_card(card, self._specifications)].append(card)
-
-        for (
-            key,
-            cards,
-        ) in value_map.items():
-            value_map[key] = sorted(
-                cards,
-                key=sorting.NameExtractor.extract,
-            )
-
-        values = sorted(value_map.keys()).__iter__()
-
-        for i in range(parts):
-            value = next(values, None)
-            if value is None:
-                break
-
-            for card in value_map[value]:
-                yield card, i
-
-        for value in values:
-            for card in value_map[value]:
-                yield card, parts - 1
+    grouped = True
 
 
 class RowColumnInsert(QUndoCommand):
@@ -600,12 +571,14 @@ class GridResize(QUndoCommand):
         self._pick_up.redo()
         self._aligner._stacker_map = self._new_map
         self._drop.redo()
+        self._aligner.invalidate_background()
         self._aligner.scene.update()
 
     def undo(self):
         self._drop.undo()
         self._aligner._stacker_map = self._old_map
         self._pick_up.undo()
+        self._aligner.invalidate_background()
         self._aligner.scene.update()
 
 
@@ -619,6 +592,9 @@ class _CardInfo(object):
 
 
 class StackerMap(object):
+    _row_termination_points: t.Optional[t.List[float]] = None
+    _column_termination_points: t.Optional[t.List[float]] = None
+
     def __init__(
         self,
         aligner: StackingGrid,
@@ -684,34 +660,42 @@ class StackerMap(object):
             yield column[index]
 
     def width_at(self, index: int) -> int:
-        return sum(self._column_widths[:index])
+        points = self.row_termination_points()
+        return points[min(index, len(points)) - 1] if index > 0 else 0
 
     def height_at(self, index: int) -> int:
-        return sum(self._row_heights[:index])
+        points = self.column_termination_points()
+        return points[min(index, len(points)) - 1] if index > 0 else 0
 
     def row_height_at(self, index: int) -> float:
         return self._row_heights[index]
 
     def set_row_height_at(self, index: int, height: float) -> None:
+        if self._row_heights[index] == height:
+            return
         self._row_heights[index] = height
+        self._column_termination_points = None
+        self._aligner.invalidate_background()
 
     def column_width_at(self, index: int) -> float:
         return self._column_widths[index]
 
     def set_column_width_at(self, index: int, width: float) -> None:
+        if self._column_widths[index] == width:
+            return
         self._column_widths[index] = width
+        self._row_termination_points = None
+        self._aligner.invalidate_background()
 
-    def row_termination_points(self) -> t.Iterator[int]:
-        v = 0
-        for i in range(self.row_length):
-            v += self.column_width_at(i)
-            yield v
+    def row_termination_points(self) -> t.Sequence[float]:
+        if self._row_termination_points is None:
+            self._row_termination_points = list(itertools.accumulate(self._column_widths))
+        return self._row_termination_points
 
-    def column_termination_points(self) -> t.Iterator[int]:
-        v = 0
-        for i in range(self.column_height):
-            v += self.row_height_at(i)
-            yield v
+    def column_termination_points(self) -> t.Sequence[float]:
+        if self._column_termination_points is None:
+            self._column_termination_points = list(itertools.accumulate(self._row_heights))
+        return self._column_termination_points
 
     def map_position_to_index(self, x: float, y: float) -> t.Tuple[int, int]:
         xi = self.row_length
@@ -764,6 +748,7 @@ class StackerMap(object):
 
 class StackingGrid(Aligner):
     _show_grid = False
+    _grid_pen = QtGui.QPen(QtGui.QColor(0, 0, 0))
     schema = Schema(
         fields={
             "rows": fields.Integer(default=3, min=1, max=64),
@@ -833,6 +818,19 @@ class StackingGrid(Aligner):
             self._stacked_cards[card] = info = _CardInfo()
             return info
 
+    def neighbours(self, card: PhysicalCard, distance: int = 1) -> t.Sequence[PhysicalCard]:
+        info = self._stacked_cards.get(card)
+        if info is None or info.card_stacker is None:
+            return ()
+
+        cards = info.card_stacker.cards
+        try:
+            index = cards.index(card)
+        except ValueError:
+            return ()
+
+        return cards[max(index - distance, 0) : index] + cards[index + 1 : index + distance + 1]
+
     def remove_card(self, card: PhysicalCard) -> None:
         try:
             del self._stacked_cards[card]
@@ -883,25 +881,19 @@ class StackingGrid(Aligner):
 
     def sort(self, sort_macro: SortMacro, cards: t.Sequence[PhysicalCard], in_place: bool = False) -> QUndoCommand:
         commands = []
-        for dimension, specifications in sort_macro.dimension_specifications_map:
-            continuity = sort_macro.continuity_for_dimension(dimension)
-            if continuity == DimensionContinuity.AUTO:
-                if len(specifications) == 1:
-                    continuity = continuity.continuity_for(specifications[0].sort_property)
-                else:
-                    continuity = DimensionContinuity.CONTINUOUS
-
+        for dimension, specifications, grouped in sorting.sort_steps(sort_macro):
             if dimension == SortDimension.SUB_DIVISIONS:
                 commands.append(
-                    SortAllStackers(
+                    SortCardsInStackers(
                         grid=self,
+                        cards=cards,
                         specifications=specifications,
                     )
                 )
 
             else:
                 commands.append(
-                    (ContinuousSort if continuity == DimensionContinuity.CONTINUOUS else GroupedSort)(
+                    (GroupedSort if grouped else ContinuousSort)(
                         grid=self,
                         cards=cards,
                         specifications=specifications,
@@ -917,6 +909,17 @@ class StackingGrid(Aligner):
 
         return CommandPackage(commands)
 
+    def headless_grid(self) -> HeadlessGrid:
+        return HeadlessGrid.from_placements(
+            self._stacker_map.column_height,
+            self._stacker_map.row_length,
+            (
+                (card, *stacker.index, position)
+                for stacker in self._stacker_map.stackers
+                for position, card in enumerate(stacker.cards)
+            ),
+        )
+
     @classmethod
     def _get_sort_stack(
         cls,
@@ -955,8 +958,13 @@ class StackingGrid(Aligner):
     def insert_column(self, idx: int) -> QUndoCommand:
         pass
 
+    def invalidate_background(self) -> None:
+        if self._show_grid:
+            self._scene.invalidate(QtCore.QRectF(), QtWidgets.QGraphicsScene.BackgroundLayer)
+
     def _set_show_grid(self, show_grid: bool) -> None:
         self._show_grid = show_grid
+        self._scene.invalidate(QtCore.QRectF(), QtWidgets.QGraphicsScene.BackgroundLayer)
 
     def context_menu(self, menu: QtWidgets.QMenu, position: QPoint, undo_stack: QUndoStack) -> None:
         stacker = self.get_card_stacker(position.x(), position.y())
@@ -998,30 +1006,18 @@ class StackingGrid(Aligner):
         if not self._show_grid:
             return
 
-        painter.setPen(QtGui.QPen(QtGui.QColor(0, 0, 0)))
+        painter.setPen(self._grid_pen)
 
         lines = []
 
-        for x in list(self.stacker_map.row_termination_points())[:-1]:
-            if rect.left() <= x <= rect.right():
-                lines.append(
-                    QLineF(
-                        x,
-                        rect.top(),
-                        x,
-                        rect.bottom(),
-                    )
-                )
+        left, top, right, bottom = rect.left(), rect.top(), rect.right(), rect.bottom()
 
-        for y in list(self.stacker_map.column_termination_points())[:-1]:
-            if rect.top() <= y <= rect.bottom():
-                lines.append(
-                    QLineF(
-                        rect.left(),
-                        y,
-                        rect.right(),
-                        y,
-                    )
-                )
+        for x in self.stacker_map.row_termination_points()[:-1]:
+            if left <= x <= right:
+                lines.append(QLineF(x, top, x, bottom))
+
+        for y in self.stacker_map.column_termination_points()[:-1]:
+            if top <= y <= bottom:
+                lines.append(QLineF(left, y, right, y))
 
         painter.drawLines(lines)
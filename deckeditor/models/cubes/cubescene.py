@@ -13,7 +13,7 @@ from magiccube.collections.infinites import Infinites
 from mtgorp.models.interfaces import Printing
 from PyQt5 import QtCore, QtGui
 from PyQt5.QtCore import QPoint, pyqtSignal
-from PyQt5.QtWidgets import QUndoCommand
+from PyQt5.QtWidgets import QGraphicsScene, QUndoCommand
 from yeetlong.counters import Counter
 
 from deckeditor.components.settings import settings
@@ -160,6 +160,18 @@ class PhysicalCardChange(object):
 DEFAULT_ALIGNER_MARKER = object()
 
 
+def get_default_sort_macro(scene_type: SceneType) -> SortMacro:
+    return EDB.Session.query(models.SortMacro).get(
+        settings.SCENE_DEFAULTS.get_value()[scene_type.value]["sort_macro"]
+    ) or SortMacro(
+        specifications=[
+            SortSpecification(
+                sort_property=CMCExtractor,
+            )
+        ]
+    )
+
+
 class CubeScene(SelectionScene):
     aligner_changed = pyqtSignal(Aligner)
     content_changed = pyqtSignal(PhysicalCardChange)
@@ -210,6 +222,7 @@ class CubeScene(SelectionScene):
             )
 
         self._item_map: t.MutableMapping[Cubeable, t.List[SceneCard]] = defaultdict(list)
+        self._card_count = 0
         self._related_scenes: t.AbstractSet[CubeScene] = {self}
 
         if cards is not None and self._aligner is not None:
@@ -226,6 +239,10 @@ class CubeScene(SelectionScene):
     def scene_type(self) -> SceneType:
         return self._scene_type
 
+    @property
+    def mode(self) -> CubeEditMode:
+        return self._mode
+
     @property
     def cube(self) -> Cube:
         return Cube(item.cubeable for item in self.items() if isinstance(item, SceneCard))
@@ -234,6 +251,14 @@ class CubeScene(SelectionScene):
     def aligner(self) -> Aligner:
         return self._aligner
 
+    @property
+    def card_count(self) -> int:
+        return self._card_count
+
+    @property
+    def cubeable_items(self) -> t.Mapping[Cubeable, t.Sequence[SceneCard]]:
+        return self._item_map
+
     @property
     def related_scenes(self) -> t.AbstractSet[CubeScene]:
         return self._related_scenes
@@ -248,6 +273,7 @@ class CubeScene(SelectionScene):
 
     def _on_aligner_changed(self, aligner: Aligner) -> None:
         self._aligner = aligner
+        self.invalidate(QtCore.QRectF(), QGraphicsScene.BackgroundLayer)
 
     def get_set_aligner(self, aligner_type: t.Type[Aligner]) -> ChangeAligner:
         new_aligner = aligner_type(self, **aligner_type.schema.deserialize_raw(self._aligner.options))
@@ -364,13 +390,19 @@ class CubeScene(SelectionScene):
         for card in physical_cards:
             self._item_map[card.cubeable].append(card)
             self.addItem(card)
+        self._card_count += len(physical_cards)
 
         self.content_changed.emit(PhysicalCardChange(added=physical_cards))
 
+    def place_physical_cards(self, physical_cards: t.Sequence[SceneCard], position: QPoint = QPoint()) -> None:
+        self.add_physical_cards(*physical_cards)
+        self._aligner.drop(physical_cards, position).redo()
+
     def remove_physical_cards(self, *physical_cards: SceneCard) -> None:
         for card in physical_cards:
             self._item_map[card.cubeable].remove(card)
             self.removeItem(card)
+        self._card_count -= len(physical_cards)
 
         self.content_changed.emit(PhysicalCardChange(removed=physical_cards))
 
@@ -378,18 +410,12 @@ class CubeScene(SelectionScene):
         if self._aligner:
             self._aligner.draw_background(painter, rect)
 
+    def get_default_sort_macro(self) -> SortMacro:
+        return get_default_sort_macro(self._scene_type)
+
     def get_default_sort(self) -> QUndoCommand:
         return self.aligner.sort(
-            sort_macro=EDB.Session.query(models.SortMacro).get(
-                settings.SCENE_DEFAULTS.get_value()[self._scene_type.value]["sort_macro"]
-            )
-            or SortMacro(
-                specifications=[
-                    SortSpecification(
-                        sort_property=CMCExtractor,
-                    )
-                ]
-            ),
+            sort_macro=self.get_default_sort_macro(),
             cards=self.items(),
         )
 
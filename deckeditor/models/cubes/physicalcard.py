@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import itertools
-import logging
 import typing as t
 from collections import OrderedDict, defaultdict
 
@@ -9,11 +8,11 @@ from magiccube.laps.purples.purple import Purple
 from magiccube.laps.tickets.ticket import Ticket
 from magiccube.laps.traps.trap import Trap
 from magiccube.laps.traps.tree.printingtree import AllNode, AnyNode
-from mtgimg.interface import ImageRequest, SizeSlug
+from mtgimg.interface import IMAGE_SIZE_MAP, ImageRequest, SizeSlug
 from mtgorp.models.interfaces import Printing
 from mtgorp.models.serilization.strategies.raw import RawStrategy
 from mtgqt.pixmapload.pixmaploader import PixmapLoader
-from PyQt5 import QtCore, QtGui, QtWidgets
+from PyQt5 import QtGui, QtWidgets
 from PyQt5.QtCore import QPoint
 from PyQt5.QtWidgets import QInputDialog, QMenu, QUndoCommand, QUndoStack
 
@@ -28,17 +27,19 @@ from deckeditor.sorting.sorting import (
 )
 from deckeditor.utils.dialogs import ColorSelector
 from deckeditor.utils.undo import CommandPackage
+from deckeditor.values import IMAGE_WIDTH
 from deckeditor.views.focusables.dialogs import SelectOneOfPrintingsDialog
 
 
 class PhysicalCard(SceneCard[C]):
     scene: t.Callable[[], CubeScene]
 
-    signal = QtCore.pyqtSignal(QtGui.QPixmap)
     pixmap_loader: PixmapLoader = None
 
     DEFAULT_PIXMAP: QtGui.QPixmap = None
 
+    LEVEL_OF_DETAIL_SIZE_SLUGS = (SizeSlug.THUMBNAIL, SizeSlug.SMALL, SizeSlug.MEDIUM)
+
     def __init__(
         self,
         cubeable: C,
@@ -60,16 +61,19 @@ class PhysicalCard(SceneCard[C]):
 
         self.values: t.MutableMapping[str, t.Any] = values if values is not None else {}
 
-        self.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable)
-
-        self.signal.connect(self._set_pixmap)
+        self._size_slug_pixmaps: t.Dict[SizeSlug, QtGui.QPixmap] = {}
+        self._requested_size_slugs: t.Set[SizeSlug] = set()
 
-        self._update_image()
+        self.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable)
 
     @property
     def release_id(self) -> t.Optional[int]:
         return self._release_id
 
+    @property
+    def back(self) -> bool:
+        return self._back
+
     @classmethod
     def _cubeable_to_physical_type(cls, cubeable: C) -> t.Type[PhysicalCard[C]]:
         if isinstance(cubeable, Printing):
@@ -103,26 +107,75 @@ class PhysicalCard(SceneCard[C]):
             cubeable, node_parent=node_parent, release_id=release_id, values=values
         )
 
-    def image_request(self) -> ImageRequest:
-        return ImageRequest(self._cubeable, back=self._back, size_slug=SizeSlug.MEDIUM)
+    def image_request(self, size_slug: SizeSlug = SizeSlug.MEDIUM) -> ImageRequest:
+        return ImageRequest(self._cubeable, back=self._back, size_slug=size_slug)
 
-    def _update_image(self):
-        image_request = self.image_request()
-        Context.pixmap_loader.get_pixmap(image_request=image_request).then(
-            lambda pixmap: self._set_updated_pixmap(pixmap, image_request)
-        ).catch(lambda e: logging.warning(f"failed loading image {image_request}: {e}"))
-
-    def _set_updated_pixmap(self, pixmap: QtGui.QPixmap, image_request: ImageRequest):
-        if image_request == self.image_request():
-            self.signal.emit(pixmap)
+    @classmethod
+    def size_slug_for_level_of_detail(cls, level_of_detail: float) -> SizeSlug:
+        width = IMAGE_WIDTH * level_of_detail
+        for size_slug in cls.LEVEL_OF_DETAIL_SIZE_SLUGS:
+            if IMAGE_SIZE_MAP[frozenset((size_slug, False))][0] >= width:
+                return size_slug
+        return cls.LEVEL_OF_DETAIL_SIZE_SLUGS[-1]
+
+    def _update_image(self, size_slug: SizeSlug = SizeSlug.MEDIUM):
+        if size_slug in self._requested_size_slugs:
+            return
+        self._requested_size_slugs.add(size_slug)
+
+        back = self._back
+        Context.image_scheduler.request(
+            self,
+            size_slug,
+            self.image_request(size_slug),
+            lambda pixmap: self._set_pixmap(size_slug, back, pixmap),
+            priority=self.zValue(),
+            on_cancel=lambda: self._requested_size_slugs.discard(size_slug),
+        )
 
-    def _set_pixmap(self, pixmap: QtGui.QPixmap):
-        self.set_pixmap(pixmap)
+    def _set_pixmap(self, size_slug: SizeSlug, back: bool, pixmap: QtGui.QPixmap):
+        if back != self._back:
+            return
+        self._size_slug_pixmaps[size_slug] = pixmap
         self.update()
 
+    def _loaded_pixmap(self, size_slug: SizeSlug) -> t.Optional[QtGui.QPixmap]:
+        idx = self.LEVEL_OF_DETAIL_SIZE_SLUGS.index(size_slug)
+        for _size_slug in itertools.chain(
+            self.LEVEL_OF_DETAIL_SIZE_SLUGS[idx:],
+            reversed(self.LEVEL_OF_DETAIL_SIZE_SLUGS[:idx]),
+        ):
+            pixmap = self._size_slug_pixmaps.get(_size_slug)
+            if pixmap is not None:
+                return pixmap
+        return None
+
+    def pixmap(self) -> QtGui.QPixmap:
+        pixmap = self._loaded_pixmap(SizeSlug.MEDIUM)
+        return self._pixmap if pixmap is None else pixmap
+
+    def display_pixmap(self, level_of_detail: float) -> QtGui.QPixmap:
+        size_slug = self.size_slug_for_level_of_detail(level_of_detail)
+        pixmap = self._size_slug_pixmaps.get(size_slug)
+        if pixmap is not None:
+            return pixmap
+
+        self._update_image(size_slug)
+        pixmap = self._loaded_pixmap(size_slug)
+        return self._pixmap if pixmap is None else pixmap
+
+    def itemChange(self, change: QtWidgets.QGraphicsItem.GraphicsItemChange, value: t.Any) -> t.Any:
+        if change == QtWidgets.QGraphicsItem.ItemSceneHasChanged and value is None:
+            Context.image_scheduler.cancel(self)
+        return super().itemChange(change, value)
+
     def flip(self) -> None:
+        Context.image_scheduler.cancel(self)
+        self._pixmap = self.pixmap()
         self._back = not self._back
-        self._update_image()
+        self._size_slug_pixmaps.clear()
+        self._requested_size_slugs.clear()
+        self.update()
 
     def context_child_menu(self, child: PhysicalCard, menu: QtWidgets.QMenu, undo_stack: QUndoStack) -> None:
         if self.node_parent is not None:
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import itertools
+import pickle
+import typing as t
+from collections import defaultdict
+
+from mtgorp.models.interfaces import Printing
+
+from deckeditor.components.views.cubeedit.cubeedit import CubeEditMode
+from deckeditor.context.context import Context
+from deckeditor.models.cubes.alignment.aligner import Aligner
+from deckeditor.models.cubes.alignment.aligners import ALIGNER_TYPE_MAP
+from deckeditor.models.cubes.alignment.grid import GridAligner
+from deckeditor.models.cubes.alignment.stackinggrid import StackingGrid
+from deckeditor.models.cubes.cubescene import CubeScene
+from deckeditor.models.cubes.physicalcard import PhysicalCard, PhysicalPrinting
+from deckeditor.models.cubes.scenetypes import SceneType
+from deckeditor.serialization.columnar import NO_VALUE, SceneColumns
+
+
+_SCALAR_TYPES = (bool, int, float, str)
+
+
+def is_plain_printing(card: PhysicalCard) -> bool:
+    return type(card) is PhysicalPrinting and isinstance(card.cubeable, Printing) and card.node_parent is None
+
+
+def aligned_cards(aligner: Aligner) -> t.Iterator[t.Tuple[PhysicalCard, int, int, int]]:
+    if isinstance(aligner, StackingGrid):
+        for stacker in aligner.stacker_map.stackers:
+            x, y = stacker.index
+            for position, card in enumerate(stacker.cards):
+                yield card, x, y, position
+    else:
+        for position, card in enumerate(aligner.cards):
+            yield card, 0, 0, position
+
+
+def supports_columns(aligner: t.Optional[Aligner]) -> bool:
+    return isinstance(aligner, (StackingGrid, GridAligner)) and ALIGNER_TYPE_MAP.get(aligner.name) is type(aligner)
+
+
+def aligner_state(aligner: Aligner) -> t.Dict[str, t.Any]:
+    return {
+        "options": dict(aligner.options),
+        "attributes": {k: v for k, v in aligner.__dict__.items() if isinstance(v, _SCALAR_TYPES)},
+    }
+
+
+def scene_to_columns(scene: CubeScene) -> SceneColumns:
+    columns = SceneColumns(scene_type=scene.scene_type.value, mode=scene.mode.name)
+    aligner = scene.aligner
+
+    if not supports_columns(aligner):
+        columns.legacy = pickle.dumps(scene)
+        return columns
+
+    columns.aligner_type = aligner.name
+    columns.aligner_state = aligner_state(aligner)
+
+    value_indexes: t.Dict[int, int] = {}
+    side_table = []
+
+    for card, x, y, position in aligned_cards(aligner):
+        if not is_plain_printing(card):
+            side_table.append((card, x, y, position))
+            continue
+
+        value_index = NO_VALUE
+        if card.values:
+            value_index = value_indexes.get(id(card.values))
+            if value_index is None:
+                value_index = value_indexes[id(card.values)] = len(columns.values)
+                columns.values.append(dict(card.values))
+
+        columns.append(card.cubeable.id, x, y, position, card.release_id, value_index)
+
+    if side_table:
+        columns.side_table = pickle.dumps(side_table)
+
+    return columns
+
+
+def _inflate_aligner(columns: SceneColumns, scene: CubeScene) -> Aligner:
+    aligner_type = ALIGNER_TYPE_MAP[columns.aligner_type]
+    options = columns.aligner_state["options"]
+
+    aligner = aligner_type.__new__(aligner_type)
+    aligner.__dict__.update(columns.aligner_state["attributes"])
+    aligner._scene = scene
+
+    if isinstance(aligner, StackingGrid):
+        aligner._stacked_cards = {}
+        aligner._stacker_map = aligner.create_stacker_map(options["rows"], options["columns"])
+    else:
+        aligner._cards = []
+
+    return aligner
+
+
+class CardRow(t.NamedTuple):
+    printing: Printing
+    x: int
+    y: int
+    position: int
+    release_id: t.Optional[int]
+    values: t.Optional[t.Mapping[str, t.Any]]
+
+
+Placement = t.Tuple[PhysicalCard, int, int, int]
+
+
+def resolve_rows(columns: SceneColumns) -> t.List[CardRow]:
+    printings = Context.db.printings
+    return [
+        CardRow(
+            printings[printing_id],
+            x,
+            y,
+            position,
+            release_id if release_id != NO_VALUE else None,
+            columns.values[value_index] if value_index != NO_VALUE else None,
+        )
+        for printing_id, x, y, position, release_id, value_index in zip(
+            columns.printing_ids,
+            columns.stacker_x,
+            columns.stacker_y,
+            columns.positions,
+            columns.release_ids,
+            columns.value_indexes,
+        )
+    ]
+
+
+def inflate_row(row: CardRow) -> Placement:
+    return (
+        PhysicalPrinting(
+            row.printing,
+            values=dict(row.values) if row.values is not None else None,
+            release_id=row.release_id,
+        ),
+        row.x,
+        row.y,
+        row.position,
+    )
+
+
+def scene_from_columns(
+    columns: SceneColumns,
+    placements: t.Optional[t.Sequence[Placement]] = None,
+) -> CubeScene:
+    if columns.legacy is not None:
+        return pickle.loads(columns.legacy)
+
+    scene = CubeScene(
+        aligner_type=None,
+        mode=CubeEditMode[columns.mode],
+        scene_type=SceneType(columns.scene_type),
+    )
+    aligner = _inflate_aligner(columns, scene)
+    scene._aligner = aligner
+
+    if placements is None:
+        placements = [inflate_row(row) for row in resolve_rows(columns)]
+
+    if columns.side_table:
+        placements = list(itertools.chain(placements, pickle.loads(columns.side_table)))
+
+    placed: t.DefaultDict[t.Tuple[int, int], t.List[t.Tuple[int, PhysicalCard]]] = defaultdict(list)
+    for card, x, y, position in placements:
+        placed[x, y].append((position, card))
+
+    for (x, y), stacked in placed.items():
+        stacked.sort(key=lambda item: item[0])
+        cards = [card for _, card in stacked]
+        if isinstance(aligner, StackingGrid):
+            aligner.stacker_map.get_stacker_clipped(x, y).add_cards_no_restack(cards)
+        else:
+            aligner.cards.extend(cards)
+
+    scene.add_physical_cards(*aligner.cards)
+    aligner.realign()
+    return scene
@@ -10,9 +10,46 @@ from PyQt5.QtWidgets import QGraphicsItem, QGraphicsScene
 class SelectionScene(QGraphicsScene):
     selection_cleared = QtCore.pyqtSignal(QGraphicsScene)
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._selected: t.Set[QGraphicsItem] = set()
+
+    @property
+    def selected_count(self) -> int:
+        return len(self._selected)
+
+    def item_selection_changed(self, item: QGraphicsItem, selected: bool) -> None:
+        if selected:
+            self._selected.add(item)
+        else:
+            self._selected.discard(item)
+
+    def apply_selection(
+        self,
+        select: t.Iterable[QGraphicsItem] = (),
+        deselect: t.Iterable[QGraphicsItem] = (),
+    ) -> bool:
+        changed = False
+        blocked = self.blockSignals(True)
+        try:
+            for item in deselect:
+                if item.isSelected():
+                    item.setSelected(False)
+                    changed = True
+            for item in select:
+                if not item.isSelected():
+                    item.setSelected(True)
+                    changed = True
+        finally:
+            self.blockSignals(blocked)
+
+        if changed and not blocked:
+            self.selectionChanged.emit()
+
+        return changed
+
     def remove_selected(self, items: t.Iterable[QGraphicsItem]):
-        for item in items:
-            item.setSelected(False)
+        self.apply_selection(deselect=items)
 
     def clear_selection(self, propagate: bool = True):
         if propagate:
@@ -25,15 +62,12 @@ class SelectionScene(QGraphicsScene):
         modifiers: Qt.KeyboardModifiers = Qt.NoModifier,
     ):
         if modifiers == Qt.AltModifier:
-            for item in items:
-                item.setSelected(False)
+            self.apply_selection(deselect=items)
         elif modifiers == Qt.AltModifier | Qt.ShiftModifier:
             items = set(items)
-            for item in self.selectedItems():
-                item.setSelected(item in items)
+            self.apply_selection(deselect=[item for item in self.selectedItems() if item not in items])
         else:
-            for item in items:
-                item.setSelected(True)
+            self.apply_selection(select=items)
 
     def set_selection(
         self,
@@ -41,21 +75,20 @@ class SelectionScene(QGraphicsScene):
         modifiers: Qt.KeyboardModifiers = Qt.NoModifier,
     ):
         if modifiers == Qt.AltModifier:
-            for item in items:
-                item.setSelected(False)
+            self.apply_selection(deselect=items)
         elif modifiers == Qt.ShiftModifier:
-            for item in items:
-                item.setSelected(True)
+            self.apply_selection(select=items)
         elif modifiers == Qt.AltModifier | Qt.ShiftModifier:
             items = set(items)
-            for item in self.selectedItems():
-                item.setSelected(item in items)
+            self.apply_selection(deselect=[item for item in self.selectedItems() if item not in items])
         else:
-            self.clear_selection()
-            for item in items:
-                item.setSelected(True)
+            self.selection_cleared.emit(self)
+            items = set(items)
+            self.apply_selection(
+                select=items,
+                deselect=[item for item in self.selectedItems() if item not in items],
+            )
 
     def select_all(self):
-        for item in self.items():
-            item.setSelected(True)
+        self.apply_selection(select=self.items())
         self.selection_cleared.emit(self)
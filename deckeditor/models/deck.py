@@ -4,6 +4,7 @@ import pickle
 import typing as t
 from abc import abstractmethod
 
+from frozendict import frozendict
 from magiccube.collections.cube import Cube
 from magiccube.collections.infinites import Infinites
 from mtgorp.models.collections.deck import Deck as OrpDeck
@@ -19,7 +20,14 @@ from deckeditor.components.views.cubeedit.cubeedit import CubeEditMode
 from deckeditor.context.context import Context
 from deckeditor.models.cubes.cubescene import CubeScene
 from deckeditor.models.cubes.physicalcard import PhysicalCard
+from deckeditor.models.cubes.scenecolumns import (
+    Placement,
+    scene_from_columns,
+    scene_to_columns,
+)
 from deckeditor.models.cubes.scenetypes import SceneType
+from deckeditor.serialization import columnar
+from deckeditor.serialization.columnar import ColumnarDocument
 
 
 class TabModel(Serializeable):
@@ -151,11 +159,34 @@ class DeckModel(QObject):
             "sideboard": self._sideboard,
         }
 
+    @property
+    def named_scenes(self) -> t.Mapping[str, CubeScene]:
+        return {
+            "maindeck": self._maindeck,
+            "sideboard": self._sideboard,
+        }
+
+    def to_columns(self) -> ColumnarDocument:
+        return ColumnarDocument({name: scene_to_columns(scene) for name, scene in self.named_scenes.items()})
+
     def persist(self) -> t.Any:
-        return pickle.dumps(self.serialize())
+        return columnar.DocumentSnapshot(self.to_columns())
+
+    @classmethod
+    def from_columns(
+        cls,
+        document: ColumnarDocument,
+        placements: t.Mapping[str, t.Sequence[Placement]] = frozendict(),
+    ) -> DeckModel:
+        return cls(
+            scene_from_columns(document.scenes["maindeck"], placements.get("maindeck")),
+            scene_from_columns(document.scenes["sideboard"], placements.get("sideboard")),
+        )
 
     @classmethod
     def load(cls, state: t.Any) -> DeckModel:
+        if columnar.is_columnar(state):
+            return cls.from_columns(columnar.loads(state))
         state = pickle.loads(state)
         return cls(
             state["maindeck"],
@@ -242,8 +273,35 @@ class PoolModel(DeckModel):
             **super().serialize(),
         }
 
+    @property
+    def named_scenes(self) -> t.Mapping[str, CubeScene]:
+        return {
+            "pool": self._pool,
+            **super().named_scenes,
+        }
+
+    def to_columns(self) -> ColumnarDocument:
+        document = super().to_columns()
+        document.extra["infinites"] = RawStrategy.serialize(self.infinites)
+        return document
+
+    @classmethod
+    def from_columns(
+        cls,
+        document: ColumnarDocument,
+        placements: t.Mapping[str, t.Sequence[Placement]] = frozendict(),
+    ) -> PoolModel:
+        return cls(
+            maindeck=scene_from_columns(document.scenes["maindeck"], placements.get("maindeck")),
+            sideboard=scene_from_columns(document.scenes["sideboard"], placements.get("sideboard")),
+            pool=scene_from_columns(document.scenes["pool"], placements.get("pool")),
+            infinites=RawStrategy(Context.db).deserialize(Infinites, document.extra["infinites"]),
+        )
+
     @classmethod
     def load(cls, state: t.Any) -> PoolModel:
+        if columnar.is_columnar(state):
+            return cls.from_columns(columnar.loads(state))
         state = pickle.loads(state)
         return cls(
             maindeck=state["maindeck"],
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import typing as t
+
+from magiccube.collections.cubeable import Cubeable
+
+
+class HeadlessCard(object):
+    def __init__(
+        self,
+        cubeable: Cubeable,
+        values: t.Optional[t.MutableMapping[str, t.Any]] = None,
+        release_id: t.Optional[int] = None,
+    ):
+        self.cubeable = cubeable
+        self.values: t.MutableMapping[str, t.Any] = values if values is not None else {}
+        self.release_id = release_id
+
+    def __repr__(self):
+        return "{}({})".format(
+            self.__class__.__name__,
+            self.cubeable,
+        )
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import typing as t
+from abc import abstractmethod
+from collections import defaultdict
+
+from deckeditor.models.cubes.scenecard import SceneCard
+from deckeditor.models.headless.card import HeadlessCard
+from deckeditor.models.headless.undo import Command, CommandPackage
+from deckeditor.sorting import sorting
+from deckeditor.sorting.sorting import SortDimension, SortMacro, SortSpecification
+from deckeditor.utils.math import minmax
+
+
+Card = t.Union[HeadlessCard, SceneCard]
+Placement = t.Tuple[Card, int, int, int]
+
+
+class HeadlessGrid(object):
+    def __init__(self, rows: int = 1, columns: int = 1, flat: bool = False):
+        self._rows = max(rows, 1)
+        self._columns = max(columns, 1)
+        self._flat = flat
+        self._stackers: t.List[t.List[t.List[Card]]] = self._create_stackers(self._rows, self._columns)
+        self._card_indexes: t.Dict[Card, t.Tuple[int, int]] = {}
+
+    @classmethod
+    def from_placements(
+        cls,
+        rows: int,
+        columns: int,
+        placements: t.Iterable[Placement],
+        flat: bool = False,
+    ) -> HeadlessGrid:
+        grid = cls(rows, columns, flat)
+        grid._reset(grid.rows, grid.columns, placements)
+        return grid
+
+    @staticmethod
+    def _create_stackers(rows: int, columns: int) -> t.List[t.List[t.List[Card]]]:
+        return [[[] for _ in range(rows)] for _ in range(columns)]
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    @property
+    def columns(self) -> int:
+        return self._columns
+
+    @property
+    def flat(self) -> bool:
+        return self._flat
+
+    @property
+    def cards(self) -> t.List[Card]:
+        return [card for column in self._stackers for stacker in column for card in stacker]
+
+    def __len__(self) -> int:
+        return len(self._card_indexes)
+
+    def __contains__(self, card: Card) -> bool:
+        return card in self._card_indexes
+
+    def clip(self, x: int, y: int) -> t.Tuple[int, int]:
+        return minmax(0, x, self._columns - 1), minmax(0, y, self._rows - 1)
+
+    def stacker(self, x: int, y: int) -> t.Sequence[Card]:
+        x, y = self.clip(x, y)
+        return self._stackers[x][y]
+
+    def stackers(self) -> t.Iterator[t.Tuple[int, int, t.Sequence[Card]]]:
+        for x, column in enumerate(self._stackers):
+            for y, stacker in enumerate(column):
+                if stacker:
+                    yield x, y, stacker
+
+    def index_of(self, card: Card) -> t.Tuple[int, int]:
+        return self._card_indexes[card]
+
+    def position_of(self, card: Card) -> t.Tuple[int, int, int]:
+        x, y = self._card_indexes[card]
+        return x, y, self._stackers[x][y].index(card)
+
+    def placements(self) -> t.Iterator[Placement]:
+        for x, y, stacker in self.stackers():
+            for position, card in enumerate(stacker):
+                yield card, x, y, position
+
+    def _add(self, cards: t.Iterable[Card], x: int, y: int) -> None:
+        x, y = self.clip(x, y)
+        stacker = self._stackers[x][y]
+        for card in cards:
+            stacker.append(card)
+            self._card_indexes[card] = (x, y)
+
+    def _remove(self, cards: t.Iterable[Card]) -> t.List[Placement]:
+        removing = set(cards)
+        removed = []
+        for x, y in {self._card_indexes.pop(card) for card in removing}:
+            stacker = self._stackers[x][y]
+            removed.extend((card, x, y, position) for position, card in enumerate(stacker) if card in removing)
+            stacker[:] = [card for card in stacker if card not in removing]
+        return removed
+
+    def _restore(self, placements: t.Iterable[Placement]) -> None:
+        for card, x, y, position in sorted(placements, key=lambda placement: placement[3]):
+            self._stackers[x][y].insert(position, card)
+            self._card_indexes[card] = (x, y)
+
+    def _reset(self, rows: int, columns: int, placements: t.Iterable[Placement]) -> None:
+        self._rows, self._columns = max(rows, 1), max(columns, 1)
+        self._stackers = self._create_stackers(self._rows, self._columns)
+        self._card_indexes.clear()
+        for card, x, y, _ in sorted(placements, key=lambda placement: placement[3]):
+            self._add((card,), x, y)
+
+    def _set_order(self, x: int, y: int, cards: t.Sequence[Card]) -> None:
+        self._stackers[x][y][:] = cards
+
+    def add_cards(self, cards: t.Sequence[Card], x: int = 0, y: int = 0) -> Command:
+        return AddCards(self, cards, x, y)
+
+    def remove_cards(self, cards: t.Sequence[Card]) -> Command:
+        return RemoveCards(self, cards)
+
+    def move_cards(self, cards: t.Sequence[Card], x: int, y: int) -> Command:
+        return MoveCards(self, cards, x, y)
+
+    def resize(self, rows: int, columns: int) -> Command:
+        return Resize(self, rows, columns)
+
+    def sort(
+        self,
+        sort_macro: SortMacro,
+        cards: t.Optional[t.Sequence[Card]] = None,
+        in_place: bool = False,
+    ) -> Command:
+        if cards is None:
+            cards = self.cards
+
+        if self._flat:
+            return FlatSort(self, cards, sorting.flat_specifications(sort_macro), in_place)
+
+        commands = []
+        for dimension, specifications, grouped in sorting.sort_steps(sort_macro):
+            if dimension == SortDimension.SUB_DIVISIONS:
+                commands.append(SortCardsInStackers(self, cards, specifications))
+            else:
+                commands.append(
+                    PartitionSort(
+                        self,
+                        cards,
+                        specifications,
+                        horizontal=dimension == SortDimension.HORIZONTAL,
+                        grouped=grouped,
+                        in_place=in_place,
+                    )
+                )
+
+        if len(commands) == 1:
+            return commands[0]
+
+        return CommandPackage(commands)
+
+
+class AddCards(Command):
+    text = "Add cards"
+
+    def __init__(self, grid: HeadlessGrid, cards: t.Sequence[Card], x: int, y: int):
+        self._grid = grid
+        self._cards = cards
+        self._x = x
+        self._y = y
+
+    def redo(self) -> None:
+        self._grid._add(self._cards, self._x, self._y)
+
+    def undo(self) -> None:
+        self._grid._remove(self._cards)
+
+
+class RemoveCards(Command):
+    text = "Remove cards"
+
+    def __init__(self, grid: HeadlessGrid, cards: t.Sequence[Card]):
+        self._grid = grid
+        self._cards = cards
+        self._removed: t.List[Placement] = []
+
+    def redo(self) -> None:
+        self._removed = self._grid._remove(self._cards)
+
+    def undo(self) -> None:
+        self._grid._restore(self._removed)
+
+
+class MoveCards(Command):
+    text = "Move cards"
+
+    def __init__(self, grid: HeadlessGrid, cards: t.Sequence[Card], x: int, y: int):
+        self._grid = grid
+        self._cards = cards
+        self._x = x
+        self._y = y
+        self._removed: t.List[Placement] = []
+
+    def redo(self) -> None:
+        self._removed = self._grid._remove(self._cards)
+        self._grid._add(self._cards, self._x, self._y)
+
+    def undo(self) -> None:
+        self._grid._remove(self._cards)
+        self._grid._restore(self._removed)
+
+
+class Resize(Command):
+    text = "Resize"
+
+    def __init__(self, grid: HeadlessGrid, rows: int, columns: int):
+        self._grid = grid
+        self._rows = max(rows, 1)
+        self._columns = max(columns, 1)
+        self._original: t.Optional[t.Tuple[int, int, t.List[Placement]]] = None
+
+    def redo(self) -> None:
+        self._original = (self._grid.rows, self._grid.columns, list(self._grid.placements()))
+        self._grid._reset(self._rows, self._columns, self._original[2])
+
+    def undo(self) -> None:
+        self._grid._reset(*self._original)
+
+
+class _ReorderStackers(Command):
+    def __init__(self, grid: HeadlessGrid, cards: t.Sequence[Card]):
+        self._grid = grid
+        self._cards = cards
+        self._original_orders: t.Dict[t.Tuple[int, int], t.List[Card]] = {}
+
+    @abstractmethod
+    def _reorder(self, order: t.Sequence[Card]) -> t.List[Card]:
+        pass
+
+    def redo(self) -> None:
+        self._original_orders = {}
+        for card in self._cards:
+            x, y = self._grid.index_of(card)
+            if (x, y) not in self._original_orders:
+                self._original_orders[x, y] = list(self._grid.stacker(x, y))
+
+        for (x, y), order in self._original_orders.items():
+            self._grid._set_order(x, y, self._reorder(order))
+
+    def undo(self) -> None:
+        for (x, y), order in self._original_orders.items():
+            self._grid._set_order(x, y, order)
+
+
+class SortCardsInStackers(_ReorderStackers):
+    text = "Sort stackers"
+
+    def __init__(self, grid: HeadlessGrid, cards: t.Sequence[Card], specifications: t.Sequence[SortSpecification]):
+        super().__init__(grid, cards)
+        self._specifications = specifications
+
+    def _reorder(self, order: t.Sequence[Card]) -> t.List[Card]:
+        return sorting.sort_within(order, set(self._cards), self._specifications)
+
+
+class FlatSort(_ReorderStackers):
+    text = "Sort"
+
+    def __init__(
+        self,
+        grid: HeadlessGrid,
+        cards: t.Sequence[Card],
+        specifications: t.Sequence[SortSpecification],
+        in_place: bool,
+    ):
+        super().__init__(grid, cards)
+        self._specifications = specifications
+        self._in_place = in_place
+
+    def _reorder(self, order: t.Sequence[Card]) -> t.List[Card]:
+        return sorting.sort_flat(order, self._cards, self._specifications, self._in_place)
+
+
+class PartitionSort(Command):
+    text = "Sort"
+
+    def __init__(
+        self,
+        grid: HeadlessGrid,
+        cards: t.Sequence[Card],
+        specifications: t.Sequence[SortSpecification],
+        horizontal: bool,
+        grouped: bool,
+        in_place: bool,
+    ):
+        self._grid = grid
+        self._cards = cards
+        self._specifications = specifications
+        self._horizontal = horizontal
+        self._grouped = grouped
+        self._in_place = in_place
+        self._removed: t.List[Placement] = []
+
+    def redo(self) -> None:
+        self._removed = self._grid._remove(self._cards)
+        if not self._removed:
+            return
+
+        dimension = 1 if self._horizontal else 2
+        sorted_stackers: t.DefaultDict[t.Tuple[int, int], t.List[Card]] = defaultdict(list)
+        for card, x, y in sorting.partition_indexes(
+            self._cards,
+            {card: (x, y) for card, x, y, _ in self._removed},
+            self._specifications,
+            horizontal=self._horizontal,
+            grouped=self._grouped,
+            parts=self._grid.columns if self._horizontal else self._grid.rows,
+            offset=min(placement[dimension] for placement in self._removed) if self._in_place else 0,
+        ):
+            sorted_stackers[x, y].append(card)
+
+        for (x, y), cards in sorted_stackers.items():
+            self._grid._add(cards, x, y)
+
+    def undo(self) -> None:
+        self._grid._remove(self._cards)
+        self._grid._restore(self._removed)
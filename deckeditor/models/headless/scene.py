@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import io
+import pickle
+import typing as t
+
+from magiccube.collections.cube import Cube
+from magiccube.collections.cubeable import Cubeable
+from mtgorp.models.interfaces import Printing
+from mtgorp.models.serilization.strategies.raw import RawStrategy
+
+from deckeditor.components.settings import settings
+from deckeditor.context.context import Context
+from deckeditor.models.cubes.alignment.aligners import get_default_aligner_type
+from deckeditor.models.cubes.cubescene import get_default_sort_macro
+from deckeditor.models.cubes.scenecolumns import aligner_state, supports_columns
+from deckeditor.models.cubes.scenetypes import SceneType
+from deckeditor.models.headless.card import HeadlessCard
+from deckeditor.models.headless.grid import HeadlessGrid, Placement
+from deckeditor.models.headless.undo import UndoStack
+from deckeditor.serialization import columnar
+from deckeditor.serialization.columnar import NO_VALUE, ColumnarDocument, SceneColumns
+from deckeditor.sorting.sorting import SortMacro
+
+
+_PHYSICAL_CARD_MODULE = "deckeditor.models.cubes.physicalcard"
+
+
+class HeadlessSceneError(Exception):
+    pass
+
+
+class SideCard(HeadlessCard):
+    def __init__(
+        self,
+        cubeable: Cubeable,
+        values: t.Optional[t.MutableMapping[str, t.Any]] = None,
+        release_id: t.Optional[int] = None,
+        card_type: t.Optional[str] = None,
+        node_parent: t.Optional[SideCard] = None,
+        additional_values: t.Optional[t.Dict[str, t.Any]] = None,
+    ):
+        super().__init__(cubeable, values, release_id)
+        self.card_type = card_type
+        self.node_parent = node_parent
+        self.additional_values = additional_values
+
+
+def _inflate_side_card(
+    card_type: str,
+    cubeable: t.Any,
+    cubeable_type: t.Optional[t.Type],
+    node_parent: t.Optional[SideCard],
+    values: t.Optional[t.MutableMapping[str, t.Any]],
+    release_id: t.Optional[int],
+    additional_values: t.Optional[t.Dict[str, t.Any]],
+) -> SideCard:
+    return SideCard(
+        (
+            Context.db.printings[cubeable]
+            if isinstance(cubeable, int)
+            else RawStrategy(Context.db).deserialize(cubeable_type, cubeable)
+        ),
+        values,
+        release_id,
+        card_type=card_type,
+        node_parent=node_parent,
+        additional_values=additional_values,
+    )
+
+
+class _SideTableUnpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str) -> t.Any:
+        if module == _PHYSICAL_CARD_MODULE:
+            if name.endswith("._inflate"):
+                return _inflate_side_card
+            return name
+        return super().find_class(module, name)
+
+
+def read_side_table(side_table: bytes) -> t.List[t.Tuple[SideCard, int, int, int]]:
+    return _SideTableUnpickler(io.BytesIO(side_table)).load()
+
+
+class _PhysicalCardProxy(object):
+    def __init__(self, card: HeadlessCard, proxies: t.MutableMapping[HeadlessCard, _PhysicalCardProxy]):
+        self._card = card
+        self._proxies = proxies
+
+    @classmethod
+    def for_card(
+        cls,
+        card: t.Optional[HeadlessCard],
+        proxies: t.MutableMapping[HeadlessCard, _PhysicalCardProxy],
+    ) -> t.Optional[_PhysicalCardProxy]:
+        if card is None:
+            return None
+        try:
+            return proxies[card]
+        except KeyError:
+            proxy = proxies[card] = cls(card, proxies)
+            return proxy
+
+    def _proxied(self, value: t.Any) -> t.Any:
+        if isinstance(value, HeadlessCard):
+            return self.for_card(value, self._proxies)
+        if type(value) in (list, tuple):
+            return type(value)(self._proxied(item) for item in value)
+        if type(value) is dict:
+            return {key: self._proxied(item) for key, item in value.items()}
+        return value
+
+    def __reduce__(self):
+        from deckeditor.models.cubes import physicalcard
+
+        card = self._card
+        card_type = getattr(card, "card_type", None)
+        return (
+            physicalcard.PhysicalCard._inflate,
+            (
+                (
+                    getattr(physicalcard, card_type)
+                    if card_type is not None
+                    else physicalcard.PhysicalCard._cubeable_to_physical_type(card.cubeable)
+                ),
+                card.cubeable.id if isinstance(card.cubeable, Printing) else RawStrategy.serialize(card.cubeable),
+                type(card.cubeable),
+                self.for_card(getattr(card, "node_parent", None), self._proxies),
+                self._proxied(card.values),
+                card.release_id,
+                self._proxied(getattr(card, "additional_values", None)),
+            ),
+        )
+
+
+def _is_plain_printing(card: HeadlessCard) -> bool:
+    return (
+        isinstance(card.cubeable, Printing)
+        and getattr(card, "node_parent", None) is None
+        and getattr(card, "card_type", None) in (None, "PhysicalPrinting")
+    )
+
+
+class HeadlessScene(object):
+    def __init__(
+        self,
+        aligner_type: str,
+        aligner_state: t.Mapping[str, t.Any],
+        grid: t.Optional[HeadlessGrid] = None,
+        scene_type: SceneType = SceneType.POOL,
+        mode: str = "OPEN",
+    ):
+        self.aligner_type = aligner_type
+        self.aligner_state = aligner_state
+        self.grid = HeadlessGrid(flat=self.is_flat) if grid is None else grid
+        self.scene_type = scene_type
+        self.mode = mode
+        self.undo_stack = UndoStack()
+
+    @property
+    def is_flat(self) -> bool:
+        return "rows" not in self.aligner_state["options"]
+
+    @property
+    def cards(self) -> t.List[HeadlessCard]:
+        return self.grid.cards
+
+    @property
+    def cube(self) -> Cube:
+        return Cube(card.cubeable for card in self.grid.cards)
+
+    @property
+    def card_count(self) -> int:
+        return len(self.grid)
+
+    @classmethod
+    def create(cls, scene_type: SceneType, mode: str = "OPEN") -> HeadlessScene:
+        aligner_type = get_default_aligner_type(scene_type)
+        aligner = aligner_type(
+            None,
+            **aligner_type.schema.deserialize_raw(
+                settings.SCENE_DEFAULTS.get_value()[scene_type.value]["aligner_options"]
+            ),
+        )
+        if not supports_columns(aligner):
+            raise HeadlessSceneError(f'aligner "{aligner.name}" is not supported headlessly')
+
+        state = aligner_state(aligner)
+        options = state["options"]
+        return cls(
+            aligner_type=aligner.name,
+            aligner_state=state,
+            grid=HeadlessGrid(options["rows"], options["columns"]) if "rows" in options else None,
+            scene_type=scene_type,
+            mode=mode,
+        )
+
+    def add_cubeables(self, cubeables: t.Iterable[Cubeable]) -> t.List[HeadlessCard]:
+        cards = [HeadlessCard(cubeable) for cubeable in cubeables]
+        self.undo_stack.push(self.grid.add_cards(cards))
+        return cards
+
+    def sort(
+        self, sort_macro: t.Optional[SortMacro] = None, cards: t.Optional[t.Sequence[HeadlessCard]] = None
+    ) -> None:
+        self.undo_stack.push(
+            self.grid.sort(get_default_sort_macro(self.scene_type) if sort_macro is None else sort_macro, cards)
+        )
+
+    @classmethod
+    def from_columns(cls, columns: SceneColumns) -> HeadlessScene:
+        if columns.legacy is not None:
+            raise HeadlessSceneError("scene is stored in the legacy format")
+
+        printings = Context.db.printings
+        placements: t.List[Placement] = [
+            (
+                HeadlessCard(
+                    printings[printing_id],
+                    values=dict(columns.values[value_index]) if value_index != NO_VALUE else None,
+                    release_id=release_id if release_id != NO_VALUE else None,
+                ),
+                x,
+                y,
+                position,
+            )
+            for printing_id, x, y, position, release_id, value_index in zip(
+                columns.printing_ids,
+                columns.stacker_x,
+                columns.stacker_y,
+                columns.positions,
+                columns.release_ids,
+                columns.value_indexes,
+            )
+        ]
+
+        if columns.side_table:
+            placements.extend(read_side_table(columns.side_table))
+
+        options = columns.aligner_state["options"]
+        if "rows" in options:
+            grid = HeadlessGrid.from_placements(options["rows"], options["columns"], placements)
+        else:
+            grid = HeadlessGrid.from_placements(1, 1, placements, flat=True)
+
+        return cls(
+            aligner_type=columns.aligner_type,
+            aligner_state=columns.aligner_state,
+            grid=grid,
+            scene_type=SceneType(columns.scene_type),
+            mode=columns.mode,
+        )
+
+    def to_columns(self) -> SceneColumns:
+        options = dict(self.aligner_state["options"])
+        if not self.is_flat:
+            options["rows"] = self.grid.rows
+            options["columns"] = self.grid.columns
+
+        columns = SceneColumns(
+            scene_type=self.scene_type.value,
+            mode=self.mode,
+            aligner_type=self.aligner_type,
+            aligner_state={**self.aligner_state, "options": options},
+        )
+
+        value_indexes: t.Dict[int, int] = {}
+        side_table = []
+        proxies: t.Dict[HeadlessCard, _PhysicalCardProxy] = {}
+
+        for card, x, y, position in self.grid.placements():
+            if not _is_plain_printing(card):
+                side_table.append((_PhysicalCardProxy.for_card(card, proxies), x, y, position))
+                continue
+
+            value_index = NO_VALUE
+            if card.values:
+                value_index = value_indexes.get(id(card.values))
+                if value_index is None:
+                    value_index = value_indexes[id(card.values)] = len(columns.values)
+                    columns.values.append(card.values)
+
+            columns.append(card.cubeable.id, x, y, position, card.release_id, value_index)
+
+        if side_table:
+            columns.side_table = pickle.dumps(side_table)
+
+        return columns
+
+
+def load_scenes(blob: bytes) -> t.Dict[str, HeadlessScene]:
+    return {name: HeadlessScene.from_columns(columns) for name, columns in columnar.loads(blob).scenes.items()}
+
+
+def dump_scenes(scenes: t.Mapping[str, HeadlessScene], extra: t.Optional[t.Dict[str, t.Any]] = None) -> bytes:
+    return columnar.dumps(
+        ColumnarDocument(
+            {name: scene.to_columns() for name, scene in scenes.items()},
+            extra if extra is not None else {},
+        )
+    )
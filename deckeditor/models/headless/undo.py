@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import typing as t
+from abc import ABC, abstractmethod
+
+
+class Command(ABC):
+    text: str = ""
+
+    @abstractmethod
+    def redo(self) -> None:
+        pass
+
+    @abstractmethod
+    def undo(self) -> None:
+        pass
+
+
+class CommandPackage(Command):
+    text = "intra modification"
+
+    def __init__(self, commands: t.Sequence[Command]):
+        self._commands = commands
+
+    def redo(self) -> None:
+        for command in self._commands:
+            command.redo()
+
+    def undo(self) -> None:
+        for command in reversed(self._commands):
+            command.undo()
+
+
+class UndoStack(object):
+    def __init__(self, limit: int = 64):
+        self._limit = limit
+        self._commands: t.List[Command] = []
+        self._index = 0
+        self._clean_index: t.Optional[int] = 0
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def can_undo(self) -> bool:
+        return self._index > 0
+
+    def can_redo(self) -> bool:
+        return self._index < len(self._commands)
+
+    def is_clean(self) -> bool:
+        return self._index == self._clean_index
+
+    def set_clean(self) -> None:
+        self._clean_index = self._index
+
+    def clear(self) -> None:
+        self._commands.clear()
+        self._index = 0
+        self._clean_index = 0
+
+    def push(self, command: Command) -> None:
+        command.redo()
+
+        del self._commands[self._index :]
+        if self._clean_index is not None and self._clean_index > self._index:
+            self._clean_index = None
+
+        self._commands.append(command)
+        self._index += 1
+
+        if self._limit and len(self._commands) > self._limit:
+            del self._commands[0]
+            self._index -= 1
+            if self._clean_index is not None:
+                self._clean_index = self._clean_index - 1 if self._clean_index > 0 else None
+
+    def undo(self) -> None:
+        if self.can_undo():
+            self._index -= 1
+            self._commands[self._index].undo()
+
+    def redo(self) -> None:
+        if self.can_redo():
+            self._commands[self._index].redo()
+            self._index += 1
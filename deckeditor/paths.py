@@ -8,8 +8,11 @@ APP_DATA_PATH = AppDirs("embargoedit", "embargoedit").user_data_dir
 LOGS_PATH = os.path.join(APP_DATA_PATH, "errors.log")
 SESSION_PATH = os.path.join(APP_DATA_PATH, "session.dmp")
 DEBUG_SESSION_PATH = os.path.join(APP_DATA_PATH, "session_debug.dmp")
+JOURNAL_PATH = os.path.join(APP_DATA_PATH, "journal")
+DEBUG_JOURNAL_PATH = os.path.join(APP_DATA_PATH, "journal_debug")
 CUSTOM_SORT_MAP_PATH = os.path.join(APP_DATA_PATH, "sort_map.dmp")
 DB_PATH = os.path.join(APP_DATA_PATH, "store.db")
+IMAGE_CACHE_PATH = os.path.join(APP_DATA_PATH, "image_cache")
 
 
 RESOURCE_PATH = os.path.join(
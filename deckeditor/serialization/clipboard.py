@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import pickle
+import typing as t
+from collections import Counter
+
+from magiccube.collections.cube import Cube
+from magiccube.collections.cubeable import Cubeable
+from mtgorp.models.interfaces import Printing
+from mtgorp.models.serilization.serializeable import SerializationException
+from mtgorp.models.serilization.strategies.picklestrategy import PickleStrategy
+from PyQt5 import QtCore
+
+from deckeditor.context.context import Context
+from deckeditor.models.deck import Deck
+from deckeditor.serialization.tabmodelserializer import TabModelSerializer
+
+
+CARDS_MIME_TYPE = "application/x-embargo-cards+json"
+LEGACY_CARDS_MIME_TYPE = "cards"
+
+CLIPBOARD_VERSION = 1
+TEXT_EXTENSION = "dec"
+
+
+_PICKLE_ERRORS = (pickle.UnpicklingError, SerializationException, EOFError)
+
+
+class ClipboardFormatError(Exception):
+    pass
+
+
+def dumps(cubeables: t.Iterable[Cubeable]) -> bytes:
+    printings = Counter()
+    raw = []
+
+    for cubeable in cubeables:
+        if isinstance(cubeable, Printing):
+            printings[cubeable.id] += 1
+        else:
+            raw.append(cubeable)
+
+    return json.dumps(
+        {
+            "version": CLIPBOARD_VERSION,
+            "printings": list(printings.items()),
+            "raw": base64.b64encode(PickleStrategy.serialize(Cube(raw))).decode("ascii") if raw else None,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def loads(data: bytes) -> t.List[Cubeable]:
+    try:
+        payload = json.loads(data)
+        if payload["version"] > CLIPBOARD_VERSION:
+            raise ClipboardFormatError(f"unsupported version {payload['version']}")
+
+        printings = Context.db.printings
+        cubeables = [
+            printings[printing_id] for printing_id, multiplicity in payload["printings"] for _ in range(multiplicity)
+        ]
+
+        if payload["raw"]:
+            cubeables.extend(
+                PickleStrategy(Context.db).deserialize(Cube, base64.b64decode(payload["raw"])).cubeables.elements()
+            )
+    except (ValueError, KeyError, TypeError, binascii.Error) + _PICKLE_ERRORS as e:
+        raise ClipboardFormatError(f"invalid clipboard content: {e}")
+
+    return cubeables
+
+
+def as_text(cubeables: t.Iterable[Cubeable]) -> t.Optional[str]:
+    serializer = TabModelSerializer.extension_to_serializer.get((TEXT_EXTENSION, Deck))
+    if serializer is None:
+        return None
+    return serializer.serialize(
+        Deck(Cube(cubeable for cubeable in cubeables if isinstance(cubeable, Printing)), Cube())
+    )
+
+
+def from_text(text: str) -> t.List[Cubeable]:
+    serializer = TabModelSerializer.extension_to_serializer.get((TEXT_EXTENSION, Deck))
+    if serializer is None:
+        raise ClipboardFormatError("no text deck format available")
+    try:
+        deck = serializer.deserialize(text)
+    except SerializationException as e:
+        raise ClipboardFormatError(f"invalid deck list: {e}")
+    return list(deck.maindeck.cubeables.elements()) + list(deck.sideboard.cubeables.elements())
+
+
+def to_mime(cubeables: t.Sequence[Cubeable]) -> QtCore.QMimeData:
+    mime = QtCore.QMimeData()
+    mime.setData(CARDS_MIME_TYPE, QtCore.QByteArray(dumps(cubeables)))
+
+    text = as_text(cubeables)
+    if text:
+        mime.setText(text)
+
+    return mime
+
+
+def from_mime(mime: QtCore.QMimeData) -> t.List[Cubeable]:
+    if mime.hasFormat(CARDS_MIME_TYPE):
+        return loads(bytes(mime.data(CARDS_MIME_TYPE)))
+
+    if mime.hasFormat(LEGACY_CARDS_MIME_TYPE):
+        cards = bytes(mime.data(LEGACY_CARDS_MIME_TYPE))
+        if cards:
+            try:
+                return list(PickleStrategy(Context.db).deserialize(Cube, cards).cubeables.elements())
+            except _PICKLE_ERRORS as e:
+                raise ClipboardFormatError(f"invalid clipboard content: {e}")
+
+    if mime.hasText() and mime.text().strip():
+        return from_text(mime.text())
+
+    return []
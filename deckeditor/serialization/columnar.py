@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import pickle
+import struct
+import sys
+import threading
+import typing as t
+from array import array
+from dataclasses import dataclass, field
+
+
+MAGIC = b"EMBC"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHI")
+
+NO_VALUE = -1
+
+
+class ColumnarFormatError(Exception):
+    pass
+
+
+@dataclass
+class SceneColumns(object):
+    scene_type: str
+    mode: str
+    aligner_type: t.Optional[str] = None
+    aligner_state: t.Dict[str, t.Any] = field(default_factory=dict)
+    printing_ids: array = field(default_factory=lambda: array("q"))
+    stacker_x: array = field(default_factory=lambda: array("h"))
+    stacker_y: array = field(default_factory=lambda: array("h"))
+    positions: array = field(default_factory=lambda: array("i"))
+    release_ids: array = field(default_factory=lambda: array("q"))
+    value_indexes: array = field(default_factory=lambda: array("i"))
+    values: t.List[t.Mapping[str, t.Any]] = field(default_factory=list)
+    side_table: bytes = b""
+    legacy: t.Optional[bytes] = None
+
+    _columns: t.ClassVar[t.Sequence[str]] = (
+        "printing_ids",
+        "stacker_x",
+        "stacker_y",
+        "positions",
+        "release_ids",
+        "value_indexes",
+    )
+
+    def __len__(self) -> int:
+        return len(self.printing_ids)
+
+    def append(
+        self,
+        printing_id: int,
+        stacker_x: int,
+        stacker_y: int,
+        position: int,
+        release_id: t.Optional[int],
+        value_index: int,
+    ) -> None:
+        self.printing_ids.append(printing_id)
+        self.stacker_x.append(stacker_x)
+        self.stacker_y.append(stacker_y)
+        self.positions.append(position)
+        self.release_ids.append(NO_VALUE if release_id is None else release_id)
+        self.value_indexes.append(value_index)
+
+
+@dataclass
+class ColumnarDocument(object):
+    scenes: t.Dict[str, SceneColumns]
+    extra: t.Dict[str, t.Any] = field(default_factory=dict)
+
+
+class DocumentSnapshot(object):
+    def __init__(self, document: ColumnarDocument):
+        self.document = document
+        self._blob: t.Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    def encode(self) -> bytes:
+        with self._lock:
+            if self._blob is None:
+                self._blob = dumps(self.document)
+            return self._blob
+
+    def __reduce__(self):
+        return bytes, (self.encode(),)
+
+
+def is_columnar(data: t.Union[bytes, DocumentSnapshot]) -> bool:
+    if isinstance(data, DocumentSnapshot):
+        return True
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[: len(MAGIC)]) == MAGIC
+
+
+def _array_bytes(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _array_from_bytes(typecode: str, data: memoryview) -> array:
+    column = array(typecode)
+    column.frombytes(data)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def dumps(document: ColumnarDocument) -> bytes:
+    blobs = []
+    scenes_meta = {}
+
+    for name, scene in document.scenes.items():
+        columns = []
+        for column_name in SceneColumns._columns:
+            column = getattr(scene, column_name)
+            blob = _array_bytes(column)
+            columns.append((column_name, column.typecode, len(blob)))
+            blobs.append(blob)
+
+        scenes_meta[name] = {
+            "scene_type": scene.scene_type,
+            "mode": scene.mode,
+            "aligner_type": scene.aligner_type,
+            "aligner_state": scene.aligner_state,
+            "values": scene.values,
+            "side_table": scene.side_table,
+            "legacy": scene.legacy,
+            "columns": columns,
+        }
+
+    meta = pickle.dumps({"scenes": scenes_meta, "extra": document.extra}, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return b"".join((_HEADER.pack(MAGIC, VERSION, len(meta)), meta, *blobs))
+
+
+def loads(data: t.Union[bytes, DocumentSnapshot]) -> ColumnarDocument:
+    if isinstance(data, DocumentSnapshot):
+        return ColumnarDocument(dict(data.document.scenes), dict(data.document.extra))
+
+    view = memoryview(data)
+
+    try:
+        magic, version, meta_length = _HEADER.unpack_from(view)
+    except struct.error:
+        raise ColumnarFormatError("truncated header")
+
+    if magic != MAGIC:
+        raise ColumnarFormatError("not a columnar document")
+    if version > VERSION:
+        raise ColumnarFormatError(f"unsupported version {version}")
+
+    offset = _HEADER.size
+    try:
+        meta = pickle.loads(view[offset : offset + meta_length])
+    except (pickle.UnpicklingError, EOFError) as e:
+        raise ColumnarFormatError(f"corrupt metadata: {e}")
+    offset += meta_length
+
+    scenes = {}
+    for name, scene_meta in meta["scenes"].items():
+        columns = {}
+        for column_name, typecode, length in scene_meta["columns"]:
+            if offset + length > len(view):
+                raise ColumnarFormatError(f"truncated column {name}.{column_name}")
+            columns[column_name] = _array_from_bytes(typecode, view[offset : offset + length])
+            offset += length
+
+        scenes[name] = SceneColumns(
+            scene_type=scene_meta["scene_type"],
+            mode=scene_meta["mode"],
+            aligner_type=scene_meta["aligner_type"],
+            aligner_state=scene_meta["aligner_state"],
+            values=scene_meta["values"],
+            side_table=scene_meta["side_table"],
+            legacy=scene_meta["legacy"],
+            **columns,
+        )
+
+        if len({len(column) for column in columns.values()}) > 1:
+            raise ColumnarFormatError(f"inconsistent column lengths in {name}")
+
+    return ColumnarDocument(scenes, meta["extra"])
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import pickle
+import typing as t
+
+from magiccube.collections.cube import Cube
+from magiccube.collections.cubeable import Cubeable
+from magiccube.collections.infinites import Infinites
+from mtgorp.models.serilization.strategies.raw import RawStrategy
+from PyQt5.QtCore import QByteArray
+from PyQt5.QtGui import QTransform
+
+from deckeditor.components.views.cubeedit.cubeedit import CubeEditMode
+from deckeditor.components.views.cubeedit.cubeview import CubeViewLayout
+from deckeditor.components.views.editables.editable import TabType
+from deckeditor.context.context import Context
+from deckeditor.models.cubes.scenetypes import SceneType
+from deckeditor.models.deck import Deck, Pool, PoolModel, TabModel
+from deckeditor.models.headless.scene import (
+    HeadlessScene,
+    HeadlessSceneError,
+    dump_scenes,
+)
+from deckeditor.serialization import columnar
+from deckeditor.serialization.columnar import ColumnarFormatError, SceneColumns
+from deckeditor.utils.transform import serialize_transform
+
+
+EMBARGO_DECK_EXTENSION = "embd"
+EMBARGO_POOL_EXTENSION = "embp"
+
+_MODEL_KEYS = {
+    TabType.DECK: "deck_model",
+    TabType.POOL: "pool_model",
+}
+
+
+class TabFileError(Exception):
+    pass
+
+
+class LegacyTabFileError(TabFileError):
+    pass
+
+
+def scene_cubeables(columns: SceneColumns) -> t.List[Cubeable]:
+    try:
+        return [card.cubeable for card in HeadlessScene.from_columns(columns).cards]
+    except HeadlessSceneError:
+        raise LegacyTabFileError("scene is stored in the legacy format, open and save it in the editor to upgrade it")
+
+
+def read_tab_state(data: bytes) -> t.Mapping[str, Cube]:
+    try:
+        state = pickle.loads(data)
+        model_key = _MODEL_KEYS[state["tab_type"]]
+        blob = state[model_key]
+    except (pickle.UnpicklingError, EOFError, KeyError, TypeError) as e:
+        raise TabFileError(f"not an embargo deck or pool file: {e}")
+
+    if not columnar.is_columnar(blob):
+        raise LegacyTabFileError("file is stored in the legacy format, open and save it in the editor to upgrade it")
+
+    try:
+        document = columnar.loads(blob)
+    except ColumnarFormatError as e:
+        raise TabFileError(str(e))
+
+    return {name: Cube(scene_cubeables(columns)) for name, columns in document.scenes.items()}
+
+
+def scenes_as_deck(scenes: t.Mapping[str, Cube]) -> Deck:
+    return Deck(scenes.get("maindeck", Cube()), scenes.get("sideboard", Cube()))
+
+
+def scenes_as_pool(scenes: t.Mapping[str, Cube]) -> Pool:
+    return Pool(cubeable for cube in scenes.values() for cubeable in cube)
+
+
+def _create_scene(
+    scene_type: SceneType,
+    cubeables: t.Iterable[Cubeable],
+    mode: CubeEditMode = CubeEditMode.OPEN,
+    sort: bool = True,
+) -> HeadlessScene:
+    scene = HeadlessScene.create(scene_type, mode.name)
+    if scene.add_cubeables(cubeables) and sort:
+        scene.sort()
+    return scene
+
+
+def _view_state() -> t.Dict[str, t.Any]:
+    return {
+        "layout": CubeViewLayout.IMAGE.name,
+        "image_view_transform": serialize_transform(QTransform()),
+    }
+
+
+def write_tab_state(tab_model: TabModel, sort: bool = True) -> bytes:
+    try:
+        if isinstance(tab_model, Pool):
+            state = {
+                "maindeck_view": _view_state(),
+                "sideboard_view": _view_state(),
+                "pool_view": _view_state(),
+                "horizontal_splitter": QByteArray(),
+                "vertical_splitter": QByteArray(),
+                "pool_model": dump_scenes(
+                    {
+                        "pool": _create_scene(SceneType.POOL, tab_model, CubeEditMode.CLOSED, sort),
+                        "maindeck": _create_scene(SceneType.MAINDECK, (), CubeEditMode.CLOSED),
+                        "sideboard": _create_scene(SceneType.SIDEBOARD, (), CubeEditMode.CLOSED),
+                    },
+                    {
+                        "infinites": RawStrategy.serialize(
+                            Infinites(Context.db.cardboards[name] for name in PoolModel._default_infinite_names)
+                        ),
+                    },
+                ),
+                "tab_type": TabType.POOL,
+            }
+        else:
+            state = {
+                "maindeck_view": _view_state(),
+                "sideboard_view": _view_state(),
+                "splitter": QByteArray(),
+                "deck_model": dump_scenes(
+                    {
+                        "maindeck": _create_scene(SceneType.MAINDECK, tab_model.maindeck, sort=sort),
+                        "sideboard": _create_scene(SceneType.SIDEBOARD, tab_model.sideboard, sort=sort),
+                    }
+                ),
+                "tab_type": TabType.DECK,
+            }
+    except HeadlessSceneError as e:
+        raise TabFileError(str(e))
+
+    return pickle.dumps(state)
@@ -1,3 +1,5 @@
+import typing as t
+
 import requests
 
 
@@ -19,3 +21,17 @@ class EmbargoClient(object):
 
     def open_file(self, path: str) -> None:
         requests.post(self.uri + "files/", params={"path": path})
+
+    def _batch(self, endpoint: str, items: t.Sequence[t.Mapping[str, t.Any]]) -> t.List[t.Mapping[str, t.Any]]:
+        response = requests.post(self.uri + endpoint, json=list(items))
+        response.raise_for_status()
+        return response.json()
+
+    def convert(self, items: t.Sequence[t.Mapping[str, t.Any]]) -> t.List[t.Mapping[str, t.Any]]:
+        return self._batch("decks/convert/", items)
+
+    def parse(self, items: t.Sequence[t.Mapping[str, t.Any]]) -> t.List[t.Mapping[str, t.Any]]:
+        return self._batch("decks/parse/", items)
+
+    def search(self, items: t.Sequence[t.Mapping[str, t.Any]]) -> t.List[t.Mapping[str, t.Any]]:
+        return self._batch("cards/search/", items)
@@ -1,19 +1,22 @@
 import threading
 
+from gevent import get_hub
 from gevent.pywsgi import WSGIServer
 
 from deckeditor.server.serverapp import server_app
 
 
 class EmbargoServer(threading.Thread):
-    def __init__(self, host: str = "localhost", port: int = 7777):
+    def __init__(self, host: str = "localhost", port: int = 7777, workers: int = 4):
         super().__init__(daemon=True)
         self._host = host
         self._port = port
+        self._workers = workers
 
         self._server = None
 
     def run(self) -> None:
+        get_hub().threadpool.maxsize = self._workers
         self._server = WSGIServer((self._host, self._port), server_app)
         self._server.serve_forever()
 
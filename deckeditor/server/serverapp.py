@@ -1,10 +1,136 @@
-from flask import Flask, request
+import threading
+import typing as t
+from collections import Counter
+
+from flask import Flask, jsonify, request
+from gevent import get_hub
+from magiccube.collections.cube import Cube
+from mtgorp.models.interfaces import Printing
+from mtgorp.tools.parsing.exceptions import ParseException
+from mtgorp.tools.parsing.search.parse import SearchParser
 
 from deckeditor.context.context import Context
+from deckeditor.convert import CONVERSION_ERRORS, get_serializer, parse_tab_model
+from deckeditor.models.deck import Deck, Pool, TabModel
+
 
+MAX_BATCH_SIZE = 256
+MAX_SEARCH_RESULTS = 1000
 
 server_app = Flask(__name__)
 
+_local = threading.local()
+
+
+class RequestError(Exception):
+    pass
+
+
+def _search_parser() -> SearchParser:
+    try:
+        return _local.search_parser
+    except AttributeError:
+        _local.search_parser = SearchParser(Context.db)
+        return _local.search_parser
+
+
+def _item_value(item: t.Mapping[str, t.Any], key: str, value_type: t.Type, default: t.Any = None) -> t.Any:
+    value = item.get(key, default)
+    if not isinstance(value, value_type):
+        raise RequestError(f'"{key}" must be {value_type.__name__}')
+    return value
+
+
+def _tab_model_type(item: t.Mapping[str, t.Any]) -> t.Type[TabModel]:
+    return Pool if _item_value(item, "pool", bool, False) else Deck
+
+
+def _serialize_cube(cube: Cube) -> t.List[t.Mapping[str, t.Any]]:
+    return [
+        (
+            {
+                "id": cubeable.id,
+                "name": cubeable.cardboard.name,
+                "expansion": cubeable.expansion.code,
+                "count": count,
+            }
+            if isinstance(cubeable, Printing)
+            else {
+                "type": cubeable.__class__.__name__,
+                "name": str(cubeable),
+                "count": count,
+            }
+        )
+        for cubeable, count in Counter(cube.cubeables.elements()).items()
+    ]
+
+
+def _convert(item: t.Mapping[str, t.Any]) -> t.Mapping[str, t.Any]:
+    tab_model_type = _tab_model_type(item)
+    tab_model = parse_tab_model(
+        _item_value(item, "content", str),
+        _item_value(item, "format", str),
+        tab_model_type,
+    )
+    return {"content": get_serializer(_item_value(item, "target", str), tab_model_type).serialize(tab_model)}
+
+
+def _parse(item: t.Mapping[str, t.Any]) -> t.Mapping[str, t.Any]:
+    tab_model = parse_tab_model(
+        _item_value(item, "content", str),
+        _item_value(item, "format", str),
+        _tab_model_type(item),
+    )
+    if isinstance(tab_model, Pool):
+        return {"pool": _serialize_cube(tab_model)}
+    return {
+        "maindeck": _serialize_cube(tab_model.maindeck),
+        "sideboard": _serialize_cube(tab_model.sideboard),
+    }
+
+
+def _search(item: t.Mapping[str, t.Any]) -> t.Mapping[str, t.Any]:
+    limit = _item_value(item, "limit", int, MAX_SEARCH_RESULTS)
+    if isinstance(limit, bool):
+        raise RequestError('"limit" must be int')
+    limit = max(0, min(limit, MAX_SEARCH_RESULTS))
+    cardboards = sorted(
+        _search_parser().parse(_item_value(item, "query", str)).matches(Context.db.cardboards.values()),
+        key=lambda cardboard: cardboard.name,
+    )
+    return {
+        "total": len(cardboards),
+        "cards": [
+            {
+                "name": cardboard.name,
+                "printings": [printing.id for printing in cardboard.printings_chronologically],
+            }
+            for cardboard in cardboards[:limit]
+        ],
+    }
+
+
+def _process(f: t.Callable[[t.Mapping[str, t.Any]], t.Mapping[str, t.Any]], item: t.Any) -> t.Mapping[str, t.Any]:
+    try:
+        if not isinstance(item, dict):
+            raise RequestError("items must be objects")
+        return f(item)
+    except RequestError as e:
+        return {"error": str(e)}
+    except ParseException as e:
+        return {"error": f"invalid query: {e}"}
+    except CONVERSION_ERRORS as e:
+        return {"error": f"{e.__class__.__name__}: {e}"}
+
+
+def _run_batch(f: t.Callable[[t.Mapping[str, t.Any]], t.Mapping[str, t.Any]]):
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        return jsonify({"error": "request body must be a json list"}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"at most {MAX_BATCH_SIZE} items per request"}), 400
+    return jsonify(list(get_hub().threadpool.imap(lambda item: _process(f, item), items)))
+
 
 @server_app.route("/", methods=["GET"])
 def check():
@@ -18,3 +144,18 @@ def open_file():
         return "invalid path", 400
     Context.open_file.emit(path)
     return "ok"
+
+
+@server_app.route("/decks/convert/", methods=["POST"])
+def convert():
+    return _run_batch(_convert)
+
+
+@server_app.route("/decks/parse/", methods=["POST"])
+def parse():
+    return _run_batch(_parse)
+
+
+@server_app.route("/cards/search/", methods=["POST"])
+def search():
+    return _run_batch(_search)
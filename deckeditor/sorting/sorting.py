@@ -4,6 +4,7 @@ import collections
 import datetime
 import functools
 import itertools
+import math
 import typing as t
 from abc import ABCMeta, abstractmethod
 from collections import OrderedDict
@@ -188,6 +189,111 @@ class SortIdentity(object):
         )
 
 
+def resolve_continuity(
+    sort_macro: SortMacro,
+    dimension: SortDimension,
+    specifications: t.Sequence[SortSpecification],
+) -> DimensionContinuity:
+    continuity = sort_macro.continuity_for_dimension(dimension)
+    if continuity == DimensionContinuity.AUTO:
+        if len(specifications) == 1:
+            return continuity.continuity_for(specifications[0].sort_property)
+        return DimensionContinuity.CONTINUOUS
+    return continuity
+
+
+def continuous_partition(
+    cards: t.Iterable[SceneCard],
+    specifications: t.Sequence[SortSpecification],
+    parts: int,
+) -> t.Iterator[t.Tuple[SceneCard, int]]:
+    sorted_cards = sorted(cards, key=lambda card: SortIdentity.for_card(card, specifications))
+    part = math.ceil(len(sorted_cards) / parts)
+
+    for i, card in enumerate(sorted_cards):
+        yield card, i // part
+
+
+def grouped_partition(
+    cards: t.Iterable[SceneCard],
+    specifications: t.Sequence[SortSpecification],
+    parts: int,
+) -> t.Iterator[t.Tuple[SceneCard, int]]:
+    value_map = collections.defaultdict(list)
+
+    for card in cards:
+        value_map[SortIdentity.for_card(card, specifications)].append(card)
+
+    for key, _cards in value_map.items():
+        value_map[key] = sorted(_cards, key=NameExtractor.extract)
+
+    for i, value in enumerate(sorted(value_map.keys())):
+        for card in value_map[value]:
+            yield card, min(i, parts - 1)
+
+
+def sort_steps(
+    sort_macro: SortMacro,
+) -> t.Iterator[t.Tuple[SortDimension, t.Sequence[SortSpecification], bool]]:
+    for dimension, specifications in sort_macro.dimension_specifications_map:
+        yield (
+            dimension,
+            specifications,
+            resolve_continuity(sort_macro, dimension, specifications) != DimensionContinuity.CONTINUOUS,
+        )
+
+
+def flat_specifications(sort_macro: SortMacro) -> t.List[SortSpecification]:
+    return list(
+        itertools.chain(*(specifications for dimension, specifications in sort_macro.dimension_specifications_map))
+    )
+
+
+def partition_indexes(
+    cards: t.Iterable[SceneCard],
+    indexes: t.Mapping[SceneCard, t.Tuple[int, int]],
+    specifications: t.Sequence[SortSpecification],
+    horizontal: bool,
+    grouped: bool,
+    parts: int,
+    offset: int = 0,
+) -> t.Iterator[t.Tuple[SceneCard, int, int]]:
+    for card, i in (grouped_partition if grouped else continuous_partition)(cards, specifications, parts):
+        x, y = indexes[card]
+        if horizontal:
+            yield card, i + offset, y
+        else:
+            yield card, x, i + offset
+
+
+def sort_cards(cards: t.Iterable[SceneCard], specifications: t.Sequence[SortSpecification]) -> t.List[SceneCard]:
+    return sorted(cards, key=lambda card: SortIdentity.for_card(card, specifications))
+
+
+def sort_within(
+    order: t.Sequence[SceneCard],
+    cards: t.AbstractSet[SceneCard],
+    specifications: t.Sequence[SortSpecification],
+) -> t.List[SceneCard]:
+    sorted_cards = iter(sort_cards((card for card in order if card in cards), specifications))
+    return [next(sorted_cards) if card in cards else card for card in order]
+
+
+def sort_flat(
+    order: t.Sequence[SceneCard],
+    cards: t.Sequence[SceneCard],
+    specifications: t.Sequence[SortSpecification],
+    in_place: bool,
+) -> t.List[SceneCard]:
+    card_set = set(cards)
+    sorted_cards = sort_cards(cards, specifications)
+    unsorted_cards = [card for card in order if card not in card_set]
+    if not in_place:
+        return sorted_cards + unsorted_cards
+    idx = next(idx for idx, card in enumerate(order) if card in card_set)
+    return unsorted_cards[:idx] + sorted_cards + unsorted_cards[idx:]
+
+
 class ColorExtractor(SortProperty):
     name = "Color"
 
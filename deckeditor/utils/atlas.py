@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import typing as t
+from collections import OrderedDict
+
+from PyQt5 import QtCore, QtGui
+
+
+class ThumbnailAtlas(object):
+    def __init__(self, cell_width: int, cell_height: int, max_sheets: int = 8, max_sheet_size: int = 2048):
+        self._cell_width = cell_width
+        self._cell_height = cell_height
+        self._max_sheets = max_sheets
+        self._columns = max(1, max_sheet_size // cell_width)
+        self._rows = max(1, max_sheet_size // cell_height)
+
+        self._sheets: t.List[QtGui.QPixmap] = []
+        self._slots: t.OrderedDict[t.Hashable, t.Tuple[int, int]] = OrderedDict()
+        self._free: t.List[t.Tuple[int, int]] = []
+
+    @property
+    def cell_size(self) -> QtCore.QSize:
+        return QtCore.QSize(self._cell_width, self._cell_height)
+
+    @property
+    def capacity(self) -> int:
+        return self._max_sheets * self._columns * self._rows
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: t.Hashable) -> bool:
+        return key in self._slots
+
+    def _cell_rect(self, cell: int) -> QtCore.QRect:
+        return QtCore.QRect(
+            cell % self._columns * self._cell_width,
+            cell // self._columns * self._cell_height,
+            self._cell_width,
+            self._cell_height,
+        )
+
+    def _allocate(self) -> t.Tuple[int, int]:
+        if self._free:
+            return self._free.pop()
+
+        if len(self._sheets) < self._max_sheets:
+            sheet = QtGui.QPixmap(self._columns * self._cell_width, self._rows * self._cell_height)
+            sheet.fill(QtCore.Qt.transparent)
+            self._sheets.append(sheet)
+            sheet_index = len(self._sheets) - 1
+            self._free.extend((sheet_index, cell) for cell in reversed(range(1, self._columns * self._rows)))
+            return sheet_index, 0
+
+        _, slot = self._slots.popitem(last=False)
+        return slot
+
+    def get(self, key: t.Hashable) -> t.Optional[t.Tuple[QtGui.QPixmap, QtCore.QRect]]:
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        self._slots.move_to_end(key)
+        sheet_index, cell = slot
+        return self._sheets[sheet_index], self._cell_rect(cell)
+
+    def insert(self, key: t.Hashable, pixmap: QtGui.QPixmap) -> None:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            slot = self._allocate()
+        self._slots[key] = slot
+
+        sheet_index, cell = slot
+        painter = QtGui.QPainter(self._sheets[sheet_index])
+        try:
+            painter.setCompositionMode(QtGui.QPainter.CompositionMode_Source)
+            painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+            painter.drawPixmap(self._cell_rect(cell), pixmap)
+        finally:
+            painter.end()
+
+    def draw(self, painter: QtGui.QPainter, target: QtCore.QRect, key: t.Hashable) -> bool:
+        entry = self.get(key)
+        if entry is None:
+            return False
+        sheet, source = entry
+        painter.drawPixmap(target, sheet, source)
+        return True
+
+    def clear(self) -> None:
+        self._sheets.clear()
+        self._slots.clear()
+        self._free.clear()
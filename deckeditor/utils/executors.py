@@ -1,6 +1,18 @@
+from __future__ import annotations
+
+import contextlib
+import heapq
+import itertools
+import math
+import os
 import queue
+import threading
+import time
 import typing as t
+from concurrent.futures import Executor, Future
 from concurrent.futures.thread import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import IntEnum
 
 
 class LIFOExecutor(ThreadPoolExecutor):
@@ -13,3 +25,327 @@ class LIFOExecutor(ThreadPoolExecutor):
     ) -> None:
         super().__init__(max_workers, thread_name_prefix, initializer, initargs)
         self._work_queue = queue.LifoQueue()
+
+
+class PriorityClass(IntEnum):
+    FOCUS = 0
+    VISIBLE = 1
+    PREFETCH = 2
+    BACKGROUND = 3
+
+
+_scope = threading.local()
+
+
+@contextlib.contextmanager
+def priority_scope(priority: PriorityClass, key: t.Optional[t.Hashable] = None) -> t.Iterator[None]:
+    previous = getattr(_scope, "value", None)
+    _scope.value = (priority, key)
+    try:
+        yield
+    finally:
+        _scope.value = previous
+
+
+@dataclass
+class ExecutorStats(object):
+    queue_depth: t.Mapping[PriorityClass, int]
+    mean_wait_time: t.Mapping[PriorityClass, float]
+    mean_run_time: t.Mapping[PriorityClass, float]
+    running: int
+    workers: int
+    target_workers: int
+    completed: int
+    cancelled: int
+    deduplicated: int
+    io_fraction: float
+
+    @property
+    def total_queue_depth(self) -> int:
+        return sum(self.queue_depth.values())
+
+    def __str__(self) -> str:
+        return "running {}/{} (target {}), completed {}, cancelled {}, deduplicated {}, io {:.0%}; {}".format(
+            self.running,
+            self.workers,
+            self.target_workers,
+            self.completed,
+            self.cancelled,
+            self.deduplicated,
+            self.io_fraction,
+            ", ".join(
+                "{}: {} queued, wait {:.1f}ms, run {:.1f}ms".format(
+                    priority.name.lower(),
+                    self.queue_depth[priority],
+                    self.mean_wait_time[priority] * 1000,
+                    self.mean_run_time[priority] * 1000,
+                )
+                for priority in PriorityClass
+            ),
+        )
+
+
+class _WorkItem(object):
+    def __init__(
+        self,
+        key: t.Optional[t.Hashable],
+        priority: PriorityClass,
+        fn: t.Callable[..., t.Any],
+        args: t.Tuple[t.Any, ...],
+        kwargs: t.Mapping[str, t.Any],
+    ):
+        self.key = key
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.submitted = time.monotonic()
+        self.taken = False
+
+
+class PriorityExecutor(Executor):
+    _SMOOTHING = 0.1
+    _ADAPT_INTERVAL = 32
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        thread_name_prefix: str = "",
+        *,
+        min_workers: int = 1,
+        adaptive: bool = False,
+        default_priority: PriorityClass = PriorityClass.VISIBLE,
+        key_function: t.Optional[
+            t.Callable[[t.Tuple[t.Any, ...], t.Mapping[str, t.Any]], t.Optional[t.Hashable]]
+        ] = None,
+    ):
+        self._max_workers = max_workers
+        self._min_workers = min(min_workers, max_workers)
+        self._target_workers = max_workers
+        self._thread_name_prefix = thread_name_prefix or "PriorityExecutor"
+        self._adaptive = adaptive
+        self._default_priority = default_priority
+        self._key_function = key_function
+
+        self._condition = threading.Condition()
+        self._queue: t.List[t.Tuple[int, int, _WorkItem]] = []
+        self._sequence = itertools.count()
+        self._keyed: t.Dict[t.Hashable, t.List[_WorkItem]] = {}
+        self._key_priorities: t.Dict[t.Hashable, PriorityClass] = {}
+        self._queue_depth = {priority: 0 for priority in PriorityClass}
+        self._threads: t.Set[threading.Thread] = set()
+        self._idle = 0
+        self._running = 0
+        self._shutdown = False
+
+        self._completed = 0
+        self._cancelled = 0
+        self._deduplicated = 0
+        self._mean_wait_time = {priority: 0.0 for priority in PriorityClass}
+        self._mean_run_time = {priority: 0.0 for priority in PriorityClass}
+        self._samples = {priority: 0 for priority in PriorityClass}
+        self._io_fraction = 0.0
+
+    @property
+    def name(self) -> str:
+        return self._thread_name_prefix
+
+    @property
+    def stats(self) -> ExecutorStats:
+        with self._condition:
+            return ExecutorStats(
+                queue_depth=dict(self._queue_depth),
+                mean_wait_time=dict(self._mean_wait_time),
+                mean_run_time=dict(self._mean_run_time),
+                running=self._running,
+                workers=len(self._threads),
+                target_workers=self._target_workers,
+                completed=self._completed,
+                cancelled=self._cancelled,
+                deduplicated=self._deduplicated,
+                io_fraction=self._io_fraction,
+            )
+
+    def _enqueue(self, work_item: _WorkItem) -> None:
+        heapq.heappush(self._queue, (work_item.priority, -next(self._sequence), work_item))
+        self._queue_depth[work_item.priority] += 1
+        if work_item.key is not None:
+            self._keyed.setdefault(work_item.key, []).append(work_item)
+
+        if self._idle:
+            self._condition.notify()
+        elif len(self._threads) < self._target_workers:
+            thread = threading.Thread(
+                target=self._work,
+                name=f"{self._thread_name_prefix}_{len(self._threads)}",
+                daemon=True,
+            )
+            self._threads.add(thread)
+            thread.start()
+
+    def _unlink(self, work_item: _WorkItem) -> None:
+        work_item.taken = True
+        self._queue_depth[work_item.priority] -= 1
+        if work_item.key is not None:
+            items = self._keyed.get(work_item.key)
+            if items is not None:
+                items.remove(work_item)
+                if not items:
+                    del self._keyed[work_item.key]
+
+    def submit(self, fn: t.Callable[..., t.Any], *args, **kwargs) -> Future:
+        scope = getattr(_scope, "value", None)
+        key = scope[1] if scope is not None else None
+        if key is None and self._key_function is not None:
+            key = self._key_function(args, kwargs)
+
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+
+            if scope is not None:
+                priority = scope[0]
+            else:
+                priority = self._key_priorities.get(key, self._default_priority)
+
+            for work_item in self._keyed.get(key, ()) if key is not None else ():
+                if (
+                    work_item.fn == fn
+                    and work_item.args == args
+                    and work_item.kwargs == kwargs
+                    and not work_item.future.cancelled()
+                ):
+                    self._deduplicated += 1
+                    self._reprioritize(work_item, min(priority, work_item.priority))
+                    return work_item.future
+
+            work_item = _WorkItem(key, priority, fn, args, kwargs)
+            self._enqueue(work_item)
+            return work_item.future
+
+    def _reprioritize(self, work_item: _WorkItem, priority: PriorityClass) -> None:
+        if work_item.taken or priority == work_item.priority:
+            return
+        self._queue_depth[work_item.priority] -= 1
+        self._queue_depth[priority] += 1
+        work_item.priority = priority
+        heapq.heappush(self._queue, (priority, -next(self._sequence), work_item))
+
+    def prioritize(self, key: t.Hashable, priority: PriorityClass) -> None:
+        with self._condition:
+            self._key_priorities[key] = priority
+            for work_item in self._keyed.get(key, ()):
+                self._reprioritize(work_item, priority)
+
+    def release(self, key: t.Hashable) -> None:
+        with self._condition:
+            self._key_priorities.pop(key, None)
+
+    def cancel(self, key: t.Hashable) -> int:
+        with self._condition:
+            self._key_priorities.pop(key, None)
+            work_items = list(self._keyed.get(key, ()))
+            for work_item in work_items:
+                self._unlink(work_item)
+            self._cancelled += len(work_items)
+
+            if len(self._queue) > 2 * sum(self._queue_depth.values()) + 64:
+                self._queue = [entry for entry in self._queue if not entry[2].taken and entry[0] == entry[2].priority]
+                heapq.heapify(self._queue)
+
+        for work_item in work_items:
+            work_item.future.cancel()
+
+        return len(work_items)
+
+    def _adapt(self) -> None:
+        if not self._adaptive:
+            return
+        cpu_fraction = max(1 - self._io_fraction, 0.05)
+        self._target_workers = max(
+            self._min_workers,
+            min(self._max_workers, math.ceil((os.cpu_count() or 1) / cpu_fraction)),
+        )
+
+    def _weight(self, priority: PriorityClass) -> float:
+        return max(self._SMOOTHING, 1 / max(self._samples[priority], 1))
+
+    def _record(self, priority: PriorityClass, run_time: float, cpu_time: float) -> None:
+        self._completed += 1
+        self._mean_run_time[priority] += (run_time - self._mean_run_time[priority]) * self._weight(priority)
+        if run_time > 0:
+            io_fraction = max(0.0, 1 - cpu_time / run_time)
+            self._io_fraction += (io_fraction - self._io_fraction) * self._SMOOTHING
+        if self._completed % self._ADAPT_INTERVAL == 0:
+            self._adapt()
+
+    def _take(self) -> t.Optional[_WorkItem]:
+        with self._condition:
+            while True:
+                while self._queue:
+                    priority, _, work_item = heapq.heappop(self._queue)
+                    if not work_item.taken and priority == work_item.priority:
+                        self._unlink(work_item)
+                        self._running += 1
+                        self._samples[priority] += 1
+                        self._mean_wait_time[priority] += (
+                            time.monotonic() - work_item.submitted - self._mean_wait_time[priority]
+                        ) * self._weight(priority)
+                        return work_item
+
+                if self._shutdown or len(self._threads) > self._target_workers:
+                    self._threads.discard(threading.current_thread())
+                    return None
+
+                self._idle += 1
+                self._condition.wait()
+                self._idle -= 1
+
+    def _work(self) -> None:
+        while True:
+            work_item = self._take()
+            if work_item is None:
+                return
+
+            try:
+                if not work_item.future.set_running_or_notify_cancel():
+                    continue
+
+                started = time.monotonic()
+                started_cpu = time.thread_time()
+                try:
+                    result = work_item.fn(*work_item.args, **work_item.kwargs)
+                except BaseException as e:
+                    work_item.future.set_exception(e)
+                else:
+                    work_item.future.set_result(result)
+
+                with self._condition:
+                    self._record(work_item.priority, time.monotonic() - started, time.thread_time() - started_cpu)
+            finally:
+                with self._condition:
+                    self._running -= 1
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._condition:
+            self._shutdown = True
+            cancelled = []
+            if cancel_futures:
+                cancelled = [
+                    work_item
+                    for priority, _, work_item in self._queue
+                    if not work_item.taken and priority == work_item.priority
+                ]
+                for work_item in cancelled:
+                    self._unlink(work_item)
+                self._queue = []
+            self._condition.notify_all()
+            threads = list(self._threads)
+
+        for work_item in cancelled:
+            work_item.future.cancel()
+
+        if wait:
+            for thread in threads:
+                thread.join()
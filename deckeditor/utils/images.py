@@ -2,23 +2,33 @@ import typing as t
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
+from deckeditor.utils.executors import LIFOExecutor
+
 
 class ScaledImageLabel(QtWidgets.QLabel):
+    _scale_executor = LIFOExecutor(max_workers=2, thread_name_prefix="image_scaling")
+    _scaled = QtCore.pyqtSignal(int, QtGui.QImage)
+
     def __init__(self, *args):
         super().__init__(*args)
         self.setMinimumSize(1, 1)
         self.setScaledContents(False)
         self._pixmap: t.Optional[QtGui.QPixmap] = None
+        self._image: t.Optional[QtGui.QImage] = None
+        self._scale_generation = 0
 
         self.setAlignment(QtCore.Qt.AlignTop | QtCore.Qt.AlignHCenter)
 
+        self._scaled.connect(self._on_scaled)
+
     @property
     def pixmap(self) -> QtGui.QPixmap:
         return self._pixmap
 
     def setPixmap(self, pixmap: QtGui.QPixmap):
         self._pixmap = pixmap
-        super().setPixmap(self._scaled_pixmap())
+        self._image = None
+        self._rescale()
 
     def heightForWidth(self, width: int) -> int:
         return (
@@ -30,9 +40,27 @@ class ScaledImageLabel(QtWidgets.QLabel):
     def sizeHint(self) -> QtCore.QSize:
         return QtCore.QSize(self.width(), self.heightForWidth(self.width()))
 
-    def _scaled_pixmap(self) -> QtGui.QPixmap:
-        return self._pixmap.scaled(self.size(), QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+    def _scale_image(self, generation: int, image: QtGui.QImage, size: QtCore.QSize) -> None:
+        self._scaled.emit(
+            generation,
+            image.scaled(size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation),
+        )
+
+    def _on_scaled(self, generation: int, image: QtGui.QImage) -> None:
+        if generation == self._scale_generation:
+            super().setPixmap(QtGui.QPixmap.fromImage(image))
+
+    def _rescale(self) -> None:
+        self._scale_generation += 1
+
+        if self._pixmap.size().scaled(self.size(), QtCore.Qt.KeepAspectRatio) == self._pixmap.size():
+            super().setPixmap(self._pixmap)
+            return
+
+        if self._image is None:
+            self._image = self._pixmap.toImage()
+        self._scale_executor.submit(self._scale_image, self._scale_generation, self._image, QtCore.QSize(self.size()))
 
     def resizeEvent(self, resize_event: QtGui.QResizeEvent):
         if self._pixmap is not None:
-            super().setPixmap(self._scaled_pixmap())
+            self._rescale()
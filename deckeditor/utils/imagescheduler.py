@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+import typing as t
+from collections import Counter, deque
+from concurrent.futures import CancelledError
+
+from mtgimg.interface import ImageRequest
+from mtgqt.pixmapload.pixmaploader import PixmapLoader
+from promise import Promise
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QPixmap
+
+from deckeditor.utils.executors import PriorityClass, PriorityExecutor, priority_scope
+
+
+class _ScheduledImage(object):
+    def __init__(
+        self,
+        owner: t.Hashable,
+        tag: t.Hashable,
+        image_request: ImageRequest,
+        callback: t.Callable[[QPixmap], None],
+        priority: float,
+        priority_class: PriorityClass,
+        on_cancel: t.Optional[t.Callable[[], None]],
+    ):
+        self.owner = owner
+        self.tag = tag
+        self.image_request = image_request
+        self.callback = callback
+        self.priority = priority
+        self.priority_class = priority_class
+        self.on_cancel = on_cancel
+        self.active = True
+
+
+class ImageScheduler(QObject):
+    _completed_ready = pyqtSignal()
+
+    def __init__(
+        self,
+        pixmap_loader: PixmapLoader,
+        executors: t.Sequence[PriorityExecutor] = (),
+        max_in_flight: int = 16,
+        frame_budget: float = 0.004,
+        parent: t.Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self._pixmap_loader = pixmap_loader
+        self._executors = executors
+        self._max_in_flight = max_in_flight
+        self._frame_budget = frame_budget
+
+        self._pending: t.Dict[t.Hashable, t.Dict[t.Hashable, _ScheduledImage]] = {}
+        self._pending_count = 0
+        self._pending_requests: t.Dict[ImageRequest, t.List[_ScheduledImage]] = {}
+        self._dispatched: t.Dict[t.Hashable, t.Dict[t.Hashable, _ScheduledImage]] = {}
+        self._in_flight_requests: t.Dict[ImageRequest, t.List[_ScheduledImage]] = {}
+        self._loads: t.Counter[ImageRequest] = Counter()
+        self._loads_lock = threading.Lock()
+        self._queue: t.List[t.Tuple[PriorityClass, float, int, _ScheduledImage]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._pumping = False
+
+        self._completed: t.Deque[t.Tuple[ImageRequest, t.List[_ScheduledImage], t.Optional[QPixmap]]] = deque()
+        self._completed_lock = threading.Lock()
+
+        self._completed_ready.connect(self._on_completed, Qt.QueuedConnection)
+
+    @property
+    def pending_count(self) -> int:
+        return self._pending_count
+
+    @property
+    def in_flight_count(self) -> int:
+        return self._in_flight
+
+    @property
+    def executors(self) -> t.Sequence[PriorityExecutor]:
+        return self._executors
+
+    def log_stats(self) -> None:
+        logging.debug(f"image scheduler: {self._pending_count} pending, {self._in_flight} in flight")
+        for executor in self._executors:
+            logging.debug(f"{executor.name}: {executor.stats}")
+
+    def prioritize(self, image_request: ImageRequest, priority_class: PriorityClass) -> None:
+        for executor in self._executors:
+            executor.prioritize(image_request, priority_class)
+
+    def release(self, image_request: ImageRequest) -> None:
+        with self._loads_lock:
+            self._loads[image_request] -= 1
+            if self._loads[image_request] > 0:
+                return
+            del self._loads[image_request]
+        for executor in self._executors:
+            executor.release(image_request)
+
+    def abandon(self, image_request: ImageRequest) -> bool:
+        with self._loads_lock:
+            if self._loads[image_request] > 1:
+                return False
+        return sum(executor.cancel(image_request) for executor in self._executors) > 0
+
+    def load(self, image_request: ImageRequest, priority_class: PriorityClass = PriorityClass.VISIBLE) -> Promise:
+        with self._loads_lock:
+            self._loads[image_request] += 1
+        self.prioritize(image_request, priority_class)
+        with priority_scope(priority_class, image_request):
+            promise = self._pixmap_loader.get_pixmap(image_request=image_request)
+        promise.then(lambda _: self.release(image_request), lambda _: self.release(image_request))
+        return promise
+
+    def request(
+        self,
+        owner: t.Hashable,
+        tag: t.Hashable,
+        image_request: ImageRequest,
+        callback: t.Callable[[QPixmap], None],
+        priority: float = 0.0,
+        priority_class: PriorityClass = PriorityClass.VISIBLE,
+        on_cancel: t.Optional[t.Callable[[], None]] = None,
+    ) -> None:
+        dispatched = self._dispatched.get(owner, {}).get(tag)
+        if dispatched is not None and dispatched.image_request == image_request:
+            dispatched.callback = callback
+            dispatched.on_cancel = on_cancel
+            dispatched.active = True
+            if dispatched.priority_class != priority_class:
+                dispatched.priority_class = priority_class
+                self.prioritize(image_request, priority_class)
+            return
+        if dispatched is not None:
+            dispatched.active = False
+
+        owner_pending = self._pending.setdefault(owner, {})
+        previous = owner_pending.get(tag)
+        if previous is not None:
+            previous.active = False
+            self._unlink_pending_request(previous)
+            self._pending_count -= 1
+            del owner_pending[tag]
+
+        scheduled = _ScheduledImage(owner, tag, image_request, callback, priority, priority_class, on_cancel)
+
+        in_flight_group = self._in_flight_requests.get(image_request)
+        if in_flight_group is not None:
+            if not owner_pending:
+                del self._pending[owner]
+            self._attach(scheduled, in_flight_group)
+            return
+
+        self._pending_count += 1
+        owner_pending[tag] = scheduled
+        self._pending_requests.setdefault(image_request, []).append(scheduled)
+        heapq.heappush(self._queue, (priority_class, -priority, -next(self._sequence), scheduled))
+        self._pump()
+
+    def is_pending(self, owner: t.Hashable, tag: t.Hashable) -> bool:
+        return tag in self._pending.get(owner, ())
+
+    def cancel(self, owner: t.Hashable, tag: t.Optional[t.Hashable] = None) -> None:
+        cancelled = self._pop(self._pending, owner, tag)
+        self._pending_count -= len(cancelled)
+        for scheduled in cancelled:
+            self._unlink_pending_request(scheduled)
+
+        cancelled_dispatched = [
+            scheduled
+            for scheduled in self._dispatched.get(owner, {}).values()
+            if scheduled.active and (tag is None or scheduled.tag == tag)
+        ]
+        cancelled.extend(cancelled_dispatched)
+
+        for scheduled in cancelled:
+            scheduled.active = False
+            if scheduled.on_cancel is not None:
+                scheduled.on_cancel()
+
+        for scheduled in cancelled_dispatched:
+            image_request = scheduled.image_request
+            in_flight_group = self._in_flight_requests.get(image_request)
+            if in_flight_group is None or any(_scheduled.active for _scheduled in in_flight_group):
+                continue
+            if self.abandon(image_request):
+                del self._in_flight_requests[image_request]
+            else:
+                self.prioritize(image_request, PriorityClass.BACKGROUND)
+
+        self._compact()
+
+    def cancel_where(self, predicate: t.Callable[[t.Hashable], bool]) -> None:
+        for owner in [owner for owner in itertools.chain(self._pending, self._dispatched) if predicate(owner)]:
+            self.cancel(owner)
+
+    @staticmethod
+    def _pop(
+        scheduled_images: t.Dict[t.Hashable, t.Dict[t.Hashable, _ScheduledImage]],
+        owner: t.Hashable,
+        tag: t.Optional[t.Hashable],
+    ) -> t.List[_ScheduledImage]:
+        owner_images = scheduled_images.get(owner)
+        if not owner_images:
+            return []
+
+        if tag is None:
+            del scheduled_images[owner]
+            return list(owner_images.values())
+
+        scheduled = owner_images.pop(tag, None)
+        if not owner_images:
+            del scheduled_images[owner]
+        return [] if scheduled is None else [scheduled]
+
+    def _unlink_pending_request(self, scheduled: _ScheduledImage) -> None:
+        group = self._pending_requests.get(scheduled.image_request)
+        if group is not None and scheduled in group:
+            group.remove(scheduled)
+            if not group:
+                del self._pending_requests[scheduled.image_request]
+
+    def _attach(self, scheduled: _ScheduledImage, in_flight_group: t.List[_ScheduledImage]) -> None:
+        if in_flight_group and scheduled.priority_class < min(
+            (_scheduled.priority_class for _scheduled in in_flight_group if _scheduled.active),
+            default=PriorityClass.BACKGROUND,
+        ):
+            self.prioritize(scheduled.image_request, scheduled.priority_class)
+        in_flight_group.append(scheduled)
+        self._dispatched.setdefault(scheduled.owner, {})[scheduled.tag] = scheduled
+
+    def _compact(self) -> None:
+        if len(self._queue) > 2 * self._pending_count + 64:
+            self._queue = [entry for entry in self._queue if entry[3].active]
+            heapq.heapify(self._queue)
+
+    def _on_failed(
+        self,
+        image_request: ImageRequest,
+        in_flight_group: t.List[_ScheduledImage],
+        exception: Exception,
+    ) -> None:
+        if not isinstance(exception, CancelledError):
+            logging.warning(f"failed loading image {image_request}: {exception}")
+        self._complete(image_request, in_flight_group, None)
+
+    def _complete(
+        self,
+        image_request: ImageRequest,
+        in_flight_group: t.List[_ScheduledImage],
+        pixmap: t.Optional[QPixmap],
+    ) -> None:
+        with self._completed_lock:
+            self._completed.append((image_request, in_flight_group, pixmap))
+            first = len(self._completed) == 1
+        if first:
+            self._completed_ready.emit()
+
+    def _pump(self) -> None:
+        if self._pumping:
+            return
+
+        self._pumping = True
+        try:
+            while self._queue and self._in_flight < self._max_in_flight:
+                _, _, _, scheduled = heapq.heappop(self._queue)
+                if not scheduled.active:
+                    continue
+
+                image_request = scheduled.image_request
+                group = [_scheduled for _scheduled in self._pending_requests.pop(image_request) if _scheduled.active]
+                in_flight_group = self._in_flight_requests[image_request] = []
+                for _scheduled in group:
+                    self._pop(self._pending, _scheduled.owner, _scheduled.tag)
+                    self._attach(_scheduled, in_flight_group)
+                self._pending_count -= len(group)
+
+                self._in_flight += 1
+                self.load(image_request, scheduled.priority_class).then(
+                    lambda pixmap, _image_request=image_request, _group=in_flight_group: self._complete(
+                        _image_request, _group, pixmap
+                    )
+                ).catch(
+                    lambda e, _image_request=image_request, _group=in_flight_group: self._on_failed(
+                        _image_request, _group, e
+                    )
+                )
+        finally:
+            self._pumping = False
+
+    def _on_completed(self) -> None:
+        deadline = time.perf_counter() + self._frame_budget
+        while True:
+            with self._completed_lock:
+                if not self._completed:
+                    break
+                if time.perf_counter() > deadline:
+                    self._completed_ready.emit()
+                    break
+                image_request, in_flight_group, pixmap = self._completed.popleft()
+
+            self._in_flight -= 1
+            if self._in_flight_requests.get(image_request) is in_flight_group:
+                del self._in_flight_requests[image_request]
+            for scheduled in in_flight_group:
+                if self._dispatched.get(scheduled.owner, {}).get(scheduled.tag) is scheduled:
+                    self._pop(self._dispatched, scheduled.owner, scheduled.tag)
+                if scheduled.active and pixmap is not None:
+                    scheduled.callback(pixmap)
+
+        self._pump()
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+import typing as t
+from collections import OrderedDict
+from concurrent.futures import Executor
+
+from mtgimg.interface import ImageRequest, SizeSlug
+from mtgorp.models.interfaces import Printing
+from mtgqt.pixmapload.pixmaploader import PixmapLoader
+from promise import Promise
+from PyQt5.QtGui import QImage, QImageWriter, QPixmap
+
+from deckeditor.utils.executors import PriorityClass, priority_scope
+from deckeditor.utils.pixmapupload import PixmapUploader
+
+
+CACHE_VERSION = 1
+
+
+def image_request_key(image_request: ImageRequest) -> t.Optional[str]:
+    pictured = image_request.pictured
+    if isinstance(pictured, Printing):
+        identifier = f"printing-{pictured.id}"
+    elif hasattr(pictured, "persistent_hash"):
+        identifier = f"{type(pictured).__name__}-{pictured.persistent_hash()}"
+    else:
+        return None
+
+    size_slug = getattr(image_request, "size_slug", None)
+
+    return hashlib.sha1(
+        "|".join(
+            (
+                str(CACHE_VERSION),
+                identifier,
+                str(bool(getattr(image_request, "back", False))),
+                str(bool(getattr(image_request, "crop", False))),
+                str(getattr(size_slug, "name", size_slug)),
+            )
+        ).encode("UTF-8")
+    ).hexdigest()
+
+
+def pixmap_size(pixmap: QPixmap) -> int:
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+class PixmapCache(object):
+    def __init__(self, budgets: t.Mapping[SizeSlug, int], default_budget: int):
+        self._budgets = budgets
+        self._default_budget = default_budget
+        self._lock = threading.Lock()
+        self._tiers: t.Dict[t.Optional[SizeSlug], t.OrderedDict[t.Hashable, QPixmap]] = {}
+        self._used: t.Dict[t.Optional[SizeSlug], int] = {}
+
+    @classmethod
+    def from_total_budget(cls, total: int) -> PixmapCache:
+        return cls(
+            {
+                SizeSlug.THUMBNAIL: total // 16,
+                SizeSlug.SMALL: total * 3 // 16,
+                SizeSlug.MEDIUM: total // 2,
+            },
+            total // 4,
+        )
+
+    def used_bytes(self, size_slug: t.Optional[SizeSlug] = None) -> int:
+        with self._lock:
+            return self._used.get(size_slug, 0) if size_slug is not None else sum(self._used.values())
+
+    def get(self, image_request: ImageRequest) -> t.Optional[QPixmap]:
+        size_slug = getattr(image_request, "size_slug", None)
+        with self._lock:
+            tier = self._tiers.get(size_slug)
+            if tier is None:
+                return None
+            pixmap = tier.get(image_request)
+            if pixmap is not None:
+                tier.move_to_end(image_request)
+            return pixmap
+
+    def put(self, image_request: ImageRequest, pixmap: QPixmap) -> None:
+        size_slug = getattr(image_request, "size_slug", None)
+        budget = self._budgets.get(size_slug, self._default_budget)
+        size = pixmap_size(pixmap)
+        if size > budget:
+            return
+
+        with self._lock:
+            tier = self._tiers.setdefault(size_slug, OrderedDict())
+            previous = tier.pop(image_request, None)
+            used = self._used.get(size_slug, 0) - (0 if previous is None else pixmap_size(previous)) + size
+            tier[image_request] = pixmap
+            while used > budget:
+                _, evicted = tier.popitem(last=False)
+                used -= pixmap_size(evicted)
+            self._used[size_slug] = used
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tiers.clear()
+            self._used.clear()
+
+
+class DiskImageCache(object):
+    def __init__(self, path: str, max_bytes: int):
+        self._path = path
+        self._max_bytes = max_bytes
+        self._image_format = "webp" if b"webp" in QImageWriter.supportedImageFormats() else "png"
+        self._lock = threading.Lock()
+        self._entries: t.Optional[t.OrderedDict[str, int]] = None
+        self._used = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _index(self) -> t.OrderedDict[str, int]:
+        if self._entries is None:
+            os.makedirs(self._path, exist_ok=True)
+            files = []
+            for entry in os.scandir(self._path):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+            files.sort()
+            self._entries = OrderedDict((name, size) for _, name, size in files)
+            self._used = sum(self._entries.values())
+            self._evict()
+        return self._entries
+
+    def _file_name(self, key: str) -> str:
+        return f"{key}.{self._image_format}"
+
+    def _evict(self) -> None:
+        while self._used > self._max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._used -= size
+            try:
+                os.remove(os.path.join(self._path, name))
+            except OSError:
+                pass
+
+    def get(self, key: str) -> t.Optional[QImage]:
+        name = self._file_name(key)
+        with self._lock:
+            entries = self._index()
+            if name not in entries:
+                return None
+            entries.move_to_end(name)
+
+        path = os.path.join(self._path, name)
+        image = QImage(path)
+        if image.isNull():
+            with self._lock:
+                size = self._entries.pop(name, None)
+                if size is not None:
+                    self._used -= size
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return image
+
+    def put(self, key: str, image: QImage) -> None:
+        name = self._file_name(key)
+        with self._lock:
+            self._index()
+
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self._path, prefix=".", suffix=f".{self._image_format}")
+        os.close(file_descriptor)
+        try:
+            if not image.save(temp_path, self._image_format, 90):
+                os.remove(temp_path)
+                return
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, os.path.join(self._path, name))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        with self._lock:
+            previous = self._entries.pop(name, None)
+            self._used += size - (0 if previous is None else previous)
+            self._entries[name] = size
+            self._evict()
+
+
+class CachingPixmapLoader(object):
+    def __init__(
+        self,
+        pixmap_loader: PixmapLoader,
+        image_loader: t.Any,
+        memory_cache: PixmapCache,
+        executor: Executor,
+        uploader: PixmapUploader,
+        disk_cache: t.Optional[DiskImageCache] = None,
+    ):
+        self._pixmap_loader = pixmap_loader
+        self._image_loader = image_loader
+        self._memory_cache = memory_cache
+        self._executor = executor
+        self._uploader = uploader
+        self._disk_cache = disk_cache
+
+    @property
+    def memory_cache(self) -> PixmapCache:
+        return self._memory_cache
+
+    @property
+    def disk_cache(self) -> t.Optional[DiskImageCache]:
+        return self._disk_cache
+
+    def get_default_pixmap(self, *args, **kwargs) -> QPixmap:
+        return self._pixmap_loader.get_default_pixmap(*args, **kwargs)
+
+    def get_pixmap(
+        self, pictured: t.Any = None, *, image_request: t.Optional[ImageRequest] = None, **kwargs
+    ) -> Promise:
+        if image_request is None:
+            image_request = ImageRequest(pictured, **kwargs)
+
+        pixmap = self._memory_cache.get(image_request)
+        if pixmap is not None:
+            return Promise.resolve(pixmap)
+
+        key = image_request_key(image_request) if self._disk_cache is not None else None
+        if key is None:
+            return self._load(image_request, None)
+
+        return Promise.resolve(self._executor.submit(self._read, image_request, key)).then(
+            lambda image: self._load(image_request, key) if image is None else self._upload(image_request, image)
+        )
+
+    def _read(self, image_request: ImageRequest, key: str) -> t.Optional[QImage]:
+        image = self._disk_cache.get(key)
+        if image is None:
+            return None
+        return self._uploader.prepare(image)
+
+    def _upload(self, image_request: ImageRequest, image: QImage) -> Promise:
+        return self._uploader.upload(image).then(lambda pixmap: self._cache(image_request, pixmap))
+
+    def _cache(self, image_request: ImageRequest, pixmap: QPixmap) -> QPixmap:
+        self._memory_cache.put(image_request, pixmap)
+        return pixmap
+
+    def _load(self, image_request: ImageRequest, key: t.Optional[str]) -> Promise:
+        return self._image_loader.get_image(image_request=image_request).then(
+            lambda image: self._on_loaded(image_request, key, self._uploader.from_pil(image))
+        )
+
+    def _on_loaded(self, image_request: ImageRequest, key: t.Optional[str], image: QImage) -> Promise:
+        if key is not None:
+            try:
+                with priority_scope(PriorityClass.BACKGROUND):
+                    self._executor.submit(self._disk_cache.put, key, image)
+            except RuntimeError:
+                pass
+        return self._upload(image_request, image)
+
+    def stop(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._pixmap_loader.stop()
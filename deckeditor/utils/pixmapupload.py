@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import threading
+import time
+import typing as t
+from collections import deque
+
+from PIL import Image
+from promise import Promise
+from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+
+class PixmapUploader(QObject):
+    _submitted = pyqtSignal()
+
+    def __init__(self, frame_budget: float = 0.006, parent: t.Optional[QObject] = None):
+        super().__init__(parent)
+        self._frame_budget = frame_budget
+
+        self._queue: t.Deque[t.Tuple[QImage, t.Callable[[QPixmap], None]]] = deque()
+        self._lock = threading.Lock()
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._process)
+
+        self._submitted.connect(self._timer.start, Qt.QueuedConnection)
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    @staticmethod
+    def prepare(image: QImage) -> QImage:
+        if image.hasAlphaChannel():
+            return image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        return image.convertToFormat(QImage.Format_RGB32)
+
+    @classmethod
+    def from_pil(cls, image: Image.Image) -> QImage:
+        if image.mode == "RGB":
+            data = image.tobytes("raw", "RGB")
+            return cls.prepare(QImage(data, image.width, image.height, 3 * image.width, QImage.Format_RGB888))
+        data = image.convert("RGBA").tobytes("raw", "RGBA")
+        return cls.prepare(QImage(data, image.width, image.height, 4 * image.width, QImage.Format_RGBA8888))
+
+    def submit(self, image: QImage, callback: t.Callable[[QPixmap], None]) -> None:
+        with self._lock:
+            self._queue.append((image, callback))
+            first = len(self._queue) == 1
+        if first:
+            self._submitted.emit()
+
+    def upload(self, image: QImage) -> Promise:
+        return Promise(lambda resolve, reject: self.submit(image, resolve))
+
+    def _process(self) -> None:
+        deadline = time.perf_counter() + self._frame_budget
+        while True:
+            with self._lock:
+                if not self._queue:
+                    return
+                if time.perf_counter() > deadline:
+                    break
+                image, callback = self._queue.popleft()
+            callback(QPixmap.fromImage(image))
+
+        self._timer.start()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import os
+import struct
+import tempfile
+import typing as t
+import zlib
+
+from PyQt5.QtGui import QImage
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+_ADLER_BASE = 65521
+
+
+def adler32_combine(adler_1: int, adler_2: int, length_2: int) -> int:
+    remainder = length_2 % _ADLER_BASE
+    sum_1 = adler_1 & 0xFFFF
+    sum_2 = (remainder * sum_1) % _ADLER_BASE
+    sum_1 += (adler_2 & 0xFFFF) + _ADLER_BASE - 1
+    sum_2 += ((adler_1 >> 16) & 0xFFFF) + ((adler_2 >> 16) & 0xFFFF) + _ADLER_BASE - remainder
+    sum_1 %= _ADLER_BASE
+    sum_2 %= _ADLER_BASE
+    return sum_1 | (sum_2 << 16)
+
+
+class EncodedRows(t.NamedTuple):
+    data: bytes
+    adler: int
+    length: int
+
+
+def encode_rows(tiles: t.Sequence[QImage], compression_level: int = 1) -> EncodedRows:
+    tiles = [tile.convertToFormat(QImage.Format_RGBA8888) for tile in tiles]
+    height = tiles[0].height()
+
+    buffers = []
+    for tile in tiles:
+        bits = tile.constBits()
+        bits.setsize(tile.sizeInBytes())
+        buffers.append((memoryview(bits.asstring()), tile.bytesPerLine(), tile.width() * 4))
+
+    raw = bytearray()
+    for y in range(height):
+        raw.append(0)
+        for buffer, bytes_per_line, row_length in buffers:
+            offset = y * bytes_per_line
+            raw += buffer[offset : offset + row_length]
+
+    compressor = zlib.compressobj(compression_level, zlib.DEFLATED, -15)
+    return EncodedRows(
+        compressor.compress(raw) + compressor.flush(zlib.Z_SYNC_FLUSH),
+        zlib.adler32(raw),
+        len(raw),
+    )
+
+
+class PngStreamWriter(object):
+    def __init__(self, path: str, width: int, height: int, compression_level: int = 1):
+        self._path = path
+        self._width = width
+        self._height = height
+        self._compression_level = compression_level
+
+        self._adler = 1
+        self._rows = 0
+
+        file_descriptor, self._temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)),
+            prefix=".",
+            suffix=".png",
+        )
+        self._file = os.fdopen(file_descriptor, "wb")
+        self._file.write(PNG_SIGNATURE)
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+        self._write_chunk(b"IDAT", b"\x78\x01")
+
+    @property
+    def rows_written(self) -> int:
+        return self._rows
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes) -> None:
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type)) & 0xFFFFFFFF))
+
+    def encode(self, tiles: t.Sequence[QImage]) -> EncodedRows:
+        return encode_rows(tiles, self._compression_level)
+
+    def write(self, encoded: EncodedRows, rows: int) -> None:
+        if encoded.data:
+            self._write_chunk(b"IDAT", encoded.data)
+        self._adler = adler32_combine(self._adler, encoded.adler, encoded.length)
+        self._rows += rows
+
+    def close(self) -> None:
+        if self._rows != self._height:
+            self.abort()
+            raise ValueError(f"expected {self._height} rows, got {self._rows}")
+
+        self._write_chunk(b"IDAT", b"\x03\x00" + struct.pack(">I", self._adler))
+        self._write_chunk(b"IEND", b"")
+        self._file.close()
+        os.replace(self._temp_path, self._path)
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
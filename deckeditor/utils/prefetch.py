@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import typing as t
+from collections import OrderedDict
+
+from mtgimg.interface import ImageRequest, SizeSlug
+from PyQt5.QtCore import QObject, Qt, QThread, pyqtSignal
+
+from deckeditor.utils.executors import PriorityClass
+from deckeditor.utils.imagescheduler import ImageScheduler
+from deckeditor.utils.pixmapcache import PixmapCache
+
+
+class ImagePrefetcher(QObject):
+    _submitted = pyqtSignal(object)
+    _finished = pyqtSignal(object)
+
+    def __init__(
+        self,
+        image_scheduler: ImageScheduler,
+        memory_cache: PixmapCache,
+        enabled: t.Callable[[], bool] = lambda: True,
+        max_in_flight: int = 16,
+        max_pending: int = 1024,
+        parent: t.Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self._image_scheduler = image_scheduler
+        self._memory_cache = memory_cache
+        self._enabled = enabled
+        self._max_in_flight = max_in_flight
+        self._max_pending = max_pending
+
+        self._pending: t.OrderedDict[ImageRequest, None] = OrderedDict()
+        self._in_flight: t.Set[ImageRequest] = set()
+
+        self._submitted.connect(self._on_submitted, Qt.QueuedConnection)
+        self._finished.connect(self._on_finished, Qt.QueuedConnection)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def prefetch(self, image_requests: t.Iterable[ImageRequest]) -> None:
+        if not self._enabled():
+            return
+        if QThread.currentThread() == self.thread():
+            self._on_submitted(list(image_requests))
+        else:
+            self._submitted.emit(list(image_requests))
+
+    def prefetch_cubeables(self, cubeables: t.Iterable[t.Any], size_slug: SizeSlug = SizeSlug.MEDIUM) -> None:
+        self.prefetch(ImageRequest(cubeable, size_slug=size_slug) for cubeable in cubeables)
+
+    def _on_submitted(self, image_requests: t.List[ImageRequest]) -> None:
+        for image_request in image_requests:
+            if image_request in self._in_flight or self._memory_cache.get(image_request) is not None:
+                continue
+            self._pending[image_request] = None
+            self._pending.move_to_end(image_request)
+
+        while len(self._pending) > self._max_pending:
+            self._pending.popitem(last=False)
+
+        self._pump()
+
+    def _on_finished(self, image_request: ImageRequest) -> None:
+        self._in_flight.discard(image_request)
+        self._pump()
+
+    def _pump(self) -> None:
+        while self._pending and len(self._in_flight) < self._max_in_flight:
+            image_request, _ = self._pending.popitem(last=False)
+            self._in_flight.add(image_request)
+            self._image_scheduler.load(image_request, PriorityClass.PREFETCH).then(
+                lambda _, _image_request=image_request: self._finished.emit(_image_request),
+                lambda _, _image_request=image_request: self._finished.emit(_image_request),
+            )
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import io
+import logging
+import threading
+import time
+import typing as t
+import zipfile
+from concurrent.futures import Executor, Future
+from concurrent.futures.thread import ThreadPoolExecutor
+
+import requests
+from mtgimg.interface import ImageRequest
+from mtgorp.models.interfaces import Printing
+from PIL import Image
+from promise import Promise
+
+
+class BatchingImageClient(object):
+    BATCH_PATH = "/api/images/batch/"
+
+    def __init__(
+        self,
+        image_client: t.Any,
+        url: str,
+        *,
+        window: float = 0.02,
+        max_batch_size: int = 64,
+        executor: t.Optional[Executor] = None,
+        verify_ssl: bool = True,
+        timeout: float = 30.0,
+    ):
+        self._image_client = image_client
+        self._url = (url if "://" in url else "https://" + url).rstrip("/") + self.BATCH_PATH
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._executor = executor or ThreadPoolExecutor(max_workers=4, thread_name_prefix="image_batches")
+        self._verify_ssl = verify_ssl
+        self._timeout = timeout
+
+        self._sessions = threading.local()
+        self._condition = threading.Condition()
+        self._pending: t.Dict[t.Tuple[t.Any, ...], t.Tuple[ImageRequest, Future]] = {}
+        self._supported = True
+        self._stopped = False
+
+        self._collector = threading.Thread(target=self._collect, name="image_batch_collector", daemon=True)
+        self._collector.start()
+
+    def __getattr__(self, item: str) -> t.Any:
+        return getattr(self._image_client, item)
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    @property
+    def supported(self) -> bool:
+        return self._supported
+
+    @staticmethod
+    def descriptor(image_request: ImageRequest) -> t.Optional[t.Tuple[t.Any, ...]]:
+        if not isinstance(image_request.pictured, Printing):
+            return None
+        size_slug = getattr(image_request, "size_slug", None)
+        return (
+            image_request.pictured.id,
+            bool(getattr(image_request, "back", False)),
+            bool(getattr(image_request, "crop", False)),
+            str(getattr(size_slug, "name", size_slug)),
+        )
+
+    def get_image(self, *args, image_request: t.Optional[ImageRequest] = None, **kwargs) -> Promise:
+        if image_request is None:
+            image_request = ImageRequest(*args, **{k: v for k, v in kwargs.items() if k != "save"})
+
+        descriptor = self.descriptor(image_request)
+        if descriptor is None or not self._supported:
+            return self._image_client.get_image(image_request=image_request)
+
+        with self._condition:
+            pending = self._pending.get(descriptor)
+            if pending is not None:
+                return Promise.resolve(pending[1])
+
+            future = Future()
+            self._pending[descriptor] = (image_request, future)
+            self._condition.notify()
+
+        return Promise.resolve(future)
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._sessions, "session", None)
+        if session is None:
+            session = self._sessions.session = requests.Session()
+            session.verify = self._verify_ssl
+        return session
+
+    def _collect(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+
+            time.sleep(self._window)
+
+            with self._condition:
+                batch = []
+                for descriptor in list(self._pending)[: self._max_batch_size]:
+                    batch.append((descriptor, *self._pending.pop(descriptor)))
+
+            if not batch:
+                continue
+
+            try:
+                self._executor.submit(self._fetch, batch)
+            except RuntimeError:
+                return
+
+    def _fetch(self, batch: t.List[t.Tuple[t.Tuple[t.Any, ...], ImageRequest, Future]]) -> None:
+        images: t.Dict[str, Image.Image] = {}
+
+        if self._supported:
+            try:
+                response = self._session().post(
+                    self._url,
+                    json={
+                        "images": [
+                            {"id": _id, "back": back, "crop": crop, "size_slug": size_slug}
+                            for (_id, back, crop, size_slug), _, _ in batch
+                        ]
+                    },
+                    timeout=self._timeout,
+                )
+                if response.status_code in (404, 405, 501):
+                    self._supported = False
+                else:
+                    response.raise_for_status()
+                    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+                        for name in archive.namelist():
+                            image = Image.open(io.BytesIO(archive.read(name)))
+                            image.load()
+                            images[name] = image
+            except (requests.RequestException, zipfile.BadZipFile, OSError) as e:
+                logging.warning(f"batched image fetch failed: {e}")
+
+        for index, (_, image_request, future) in enumerate(batch):
+            image = images.get(str(index))
+            if image is not None:
+                future.set_result(image)
+            else:
+                self._image_client.get_image(image_request=image_request).then(future.set_result, future.set_exception)
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            pending, self._pending = self._pending, {}
+            self._condition.notify_all()
+        for _, future in pending.values():
+            future.cancel()
+        self._executor.shutdown(wait=False)
+        stop = getattr(self._image_client, "stop", None)
+        if stop is not None:
+            stop()
@@ -1,10 +1,9 @@
 import typing as t
 
-from mtgimg.interface import IMAGE_SIZE_MAP, SizeSlug
+from mtgimg.interface import IMAGE_SIZE_MAP, ImageRequest, SizeSlug
 from mtgorp.models.interfaces import Cardboard
-from PIL import Image
 from PyQt5 import QtCore, QtGui, QtWidgets
-from PyQt5.QtCore import QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt5.QtCore import QModelIndex, QPersistentModelIndex, pyqtSignal
 from PyQt5.QtWidgets import (
     QAbstractItemView,
     QHeaderView,
@@ -18,18 +17,30 @@ from deckeditor.components.cardview.focuscard import FocusEvent
 from deckeditor.context.context import Context
 from deckeditor.models.focusables.grid import CubeablesGrid
 from deckeditor.utils.actions import WithActions
+from deckeditor.utils.atlas import ThumbnailAtlas
+from deckeditor.utils.executors import PriorityClass
 
 
 T = t.TypeVar("T")
 
 
 class CubeableImageDelegate(QStyledItemDelegate):
+    _image_loaded = pyqtSignal(object, object)
+
     def __init__(self, parent: t.Optional[QtCore.QObject], size_slug: SizeSlug = SizeSlug.MEDIUM) -> None:
         super().__init__(parent)
         self._size_slug = size_slug
+        self._atlas = ThumbnailAtlas(*IMAGE_SIZE_MAP[frozenset((self._size_slug, False))])
+        self._pending: t.Dict[ImageRequest, t.List[QPersistentModelIndex]] = {}
+
+        self._image_loaded.connect(self._on_image_loaded, QtCore.Qt.QueuedConnection)
 
     def set_size(self, size: SizeSlug) -> None:
+        if size == self._size_slug:
+            return
         self._size_slug = size
+        self._atlas = ThumbnailAtlas(*IMAGE_SIZE_MAP[frozenset((self._size_slug, False))])
+        self._pending.clear()
 
     def createEditor(
         self,
@@ -39,29 +50,54 @@ class CubeableImageDelegate(QStyledItemDelegate):
     ) -> t.Optional[QWidget]:
         return None
 
-    def _get_image_done_callback(
-        self, index: QModelIndex, model: QAbstractTableModel
-    ) -> t.Callable[[Image.Image], None]:
-        def _image_done(image: Image.Image) -> None:
-            model.dataChanged.emit(index, index)
-
-        return _image_done
-
-    def paint(self, painter: QtGui.QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+    def _image_request(self, index: QModelIndex) -> t.Optional[ImageRequest]:
         cubeable = index.model().get_item(index)
         if not cubeable:
-            return
+            return None
 
         if isinstance(cubeable, Cardboard):
             cubeable = cubeable.original_printing
 
-        image_promise = Context.pixmap_loader.get_pixmap(cubeable, size_slug=self._size_slug)
+        return ImageRequest(cubeable, size_slug=self._size_slug)
 
-        if image_promise.is_fulfilled:
-            painter.drawPixmap(option.rect, image_promise.get())
-        else:
+    def request(self, index: QModelIndex, priority_class: PriorityClass = PriorityClass.VISIBLE) -> None:
+        image_request = self._image_request(index)
+        if image_request is None or image_request in self._atlas:
+            return
+
+        pending = self._pending.get(image_request)
+        if pending is not None:
+            if not any(_index == index for _index in pending):
+                pending.append(QPersistentModelIndex(index))
+            if priority_class < PriorityClass.PREFETCH:
+                Context.image_scheduler.prioritize(image_request, priority_class)
+            return
+
+        self._pending[image_request] = [QPersistentModelIndex(index)]
+        Context.image_scheduler.load(image_request, priority_class).then(
+            lambda pixmap: self._image_loaded.emit(image_request, pixmap),
+            lambda _: self._image_loaded.emit(image_request, None),
+        )
+
+    def _on_image_loaded(self, image_request: ImageRequest, pixmap: t.Optional[QtGui.QPixmap]) -> None:
+        indexes = self._pending.pop(image_request, None)
+        if indexes is None or pixmap is None or image_request.size_slug != self._size_slug:
+            return
+
+        self._atlas.insert(image_request, pixmap)
+
+        for index in indexes:
+            if index.isValid():
+                index.model().dataChanged.emit(QModelIndex(index), QModelIndex(index))
+
+    def paint(self, painter: QtGui.QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        image_request = self._image_request(index)
+        if image_request is None:
+            return
+
+        if not self._atlas.draw(painter, option.rect, image_request):
             painter.drawPixmap(option.rect, Context.pixmap_loader.get_default_pixmap(size_slug=self._size_slug))
-            image_promise.then(self._get_image_done_callback(index, index.model()))
+            self.request(index)
 
 
 class FocusableGridView(QTableView, WithActions):
@@ -101,6 +137,33 @@ class FocusableGridView(QTableView, WithActions):
         self.setSelectionBehavior(QAbstractItemView.SelectItems)
         self.setSelectionMode(QAbstractItemView.SingleSelection)
 
+        self._prefetch_timer = QtCore.QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(100)
+        self._prefetch_timer.timeout.connect(self._prefetch_next_page)
+
+        self.verticalScrollBar().valueChanged.connect(lambda _: self._prefetch_timer.start())
+
+    def setModel(self, model: QtCore.QAbstractItemModel) -> None:
+        super().setModel(model)
+        model.modelReset.connect(self._prefetch_timer.start)
+        model.layoutChanged.connect(lambda *_: self._prefetch_timer.start())
+        self._prefetch_timer.start()
+
+    def _prefetch_next_page(self) -> None:
+        model = self.model()
+        if model is None or not self._image_height:
+            return
+
+        first_row = self.rowAt(self.viewport().height() - 1)
+        if first_row < 0:
+            return
+
+        page_rows = max(1, self.viewport().height() // self._image_height + 1)
+        for row in range(first_row + 1, min(first_row + 1 + page_rows, model.rowCount())):
+            for column in range(model.columnCount()):
+                self._delegate.request(model.index(row, column), PriorityClass.PREFETCH)
+
     def currentChanged(self, current: QtCore.QModelIndex, previous: QtCore.QModelIndex) -> None:
         self.scrollTo(current)
         cubeable = self.model().get_item(current)
@@ -0,0 +1,126 @@
+import io
+import json
+import threading
+import unittest
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from mtgimg.interface import ImageRequest
+from mtgorp.models.interfaces import Printing
+from PIL import Image
+from promise import Promise
+
+from deckeditor.utils.remoteimages import BatchingImageClient
+
+
+def _png(color: str) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (2, 3), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class _StandInImageServer(ThreadingHTTPServer):
+    def __init__(self, supported: bool = True):
+        super().__init__(("localhost", 0), _StandInHandler)
+        self.supported = supported
+        self.requests = []
+
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.server_address[1]}"
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if not self.server.supported or self.path != BatchingImageClient.BATCH_PATH:
+            self.send_error(404)
+            return
+
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(payload)
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as f:
+            for index, image in enumerate(payload["images"]):
+                if image["id"] >= 0:
+                    f.writestr(str(index), _png("red" if image["back"] else "blue"))
+
+        content = archive.getvalue()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class _FallbackImageClient(object):
+    def __init__(self):
+        self.requested = []
+
+    def get_image(self, image_request=None):
+        self.requested.append(image_request)
+        return Promise.resolve("fallback")
+
+
+def _request(printing_id: int, back: bool = False) -> ImageRequest:
+    return ImageRequest(mock.Mock(spec=Printing, id=printing_id), back=back)
+
+
+class BatchingImageClientTestCase(unittest.TestCase):
+    def _start(self, supported: bool = True):
+        server = _StandInImageServer(supported)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        fallback = _FallbackImageClient()
+        client = BatchingImageClient(fallback, server.url, window=0.1)
+        self.addCleanup(client.stop)
+
+        return server, fallback, client
+
+    def test_concurrent_requests_are_coalesced_into_one_batch(self):
+        server, fallback, client = self._start()
+        front, back = _request(1), _request(2, back=True)
+
+        promises = [client.get_image(image_request=image_request) for image_request in (front, back, front)]
+
+        self.assertEqual(
+            [promise.get(5).getpixel((0, 0)) for promise in promises],
+            [(0, 0, 255), (255, 0, 0), (0, 0, 255)],
+        )
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual([image["id"] for image in server.requests[0]["images"]], [1, 2])
+        self.assertEqual(fallback.requested, [])
+        self.assertTrue(client.supported)
+
+    def test_missing_images_fall_back(self):
+        server, fallback, client = self._start()
+        missing = _request(-1)
+
+        promises = [client.get_image(image_request=image_request) for image_request in (_request(1), missing)]
+
+        self.assertEqual(promises[1].get(5), "fallback")
+        self.assertEqual(promises[0].get(5).getpixel((0, 0)), (0, 0, 255))
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(fallback.requested, [missing])
+
+    def test_unsupported_server_falls_back_to_single_fetches(self):
+        server, fallback, client = self._start(supported=False)
+        first, second, third = _request(1), _request(2), _request(3)
+
+        promises = [client.get_image(image_request=image_request) for image_request in (first, second)]
+
+        self.assertEqual([promise.get(5) for promise in promises], ["fallback", "fallback"])
+        self.assertFalse(client.supported)
+        self.assertEqual(client.get_image(image_request=third).get(5), "fallback")
+        self.assertEqual(fallback.requested, [first, second, third])
+        self.assertEqual(server.requests, [])
+
+
+if __name__ == "__main__":
+    unittest.main()